@@ -20,22 +20,16 @@ os.environ['OPENCV_VIDEOIO_PRIORITY_FFMPEG'] = '0'
 # --------------------------------------------------------------------
 import streamlit as st
 import sys
+import threading
+from importlib.util import find_spec
 
-# === DEEPFACE AGGIUNTO E IMPORTATO QUI ===
-# L'importazione avviene DOPO i fix ambientali e PRIMA che Streamlit
-# avvii la logica dell'applicazione.
-try:
-    from deepface import DeepFace
-    DEEPFACE_AVAILABLE = True
-except ImportError as e:
-    DEEPFACE_AVAILABLE = False
-    print(f"DeepFace import error: {e}")
+# DeepFace (and with it TensorFlow) is only imported when inference first
+# needs it or by the background preload below, so pages that never run the
+# model start without paying for it. Here we only check it is installed.
+DEEPFACE_AVAILABLE = find_spec("deepface") is not None
+if not DEEPFACE_AVAILABLE:
+    print("DeepFace import error: No module named 'deepface'")
     st.warning("DeepFace not available - using demo mode")
-except Exception as e:
-    DEEPFACE_AVAILABLE = False
-    print(f"DeepFace initialization error: {e}")
-    st.warning("DeepFace not available - using demo mode")
-# ========================================
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -48,6 +42,23 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource(show_spinner=False)
+def start_background_preload() -> threading.Thread:
+    """
+    Import DeepFace and warm up the emotion model once per process, off the
+    script thread so the first page renders without waiting for TensorFlow
+    """
+    def preload():
+        try:
+            from src.model_registry import warm_up_models
+            warm_up_models()
+        except Exception as e:
+            print(f"Model warm-up error: {e}")
+    
+    thread = threading.Thread(target=preload, name="model-preload", daemon=True)
+    thread.start()
+    return thread
+
 # Main navigation
 def main():
     st.sidebar.title("Marketing New product recognition")
@@ -58,30 +69,45 @@ def main():
         [
             "📊 Project Summary",
             "😀 Emotion Detection", 
+            "🎥 Live Detection",
+            "🗂️ Batch Processing",
             "📈 Data Analysis",
             "🎯 Model Performance"
         ]
     )
     
-    # Route to appropriate page
-    if page == "📊 Project Summary":
-        from app_pages.project_summary import show_project_summary
-        show_project_summary()
-    elif page == "😀 Emotion Detection":
-        try:
-            # L'importazione di emotion_detection qui DEVE ora funzionare.
-            from app_pages.emotion_detection import show_emotion_detection
-            show_emotion_detection()
-        except ImportError:
-            st.warning("⚠️ Using demo version due to import issues")
-            from app_pages.emotion_detection_demo import show_emotion_detection_demo
-            show_emotion_detection_demo()
-    elif page == "📈 Data Analysis":
-        from app_pages.data_analysis import show_data_analysis
-        show_data_analysis()
-    elif page == "🎯 Model Performance":
-        from app_pages.model_performance import show_model_performance
-        show_model_performance()
+    # Route to appropriate page; the sidebar shows how long each run takes
+    from app_pages.session_cache import rerun_timer
+    with rerun_timer(page):
+        if page == "📊 Project Summary":
+            from app_pages.project_summary import show_project_summary
+            show_project_summary()
+        elif page == "😀 Emotion Detection":
+            try:
+                # L'importazione di emotion_detection qui DEVE ora funzionare.
+                from app_pages.emotion_detection import show_emotion_detection
+                show_emotion_detection()
+            except ImportError:
+                st.warning("⚠️ Using demo version due to import issues")
+                from app_pages.emotion_detection_demo import show_emotion_detection_demo
+                show_emotion_detection_demo()
+        elif page == "🎥 Live Detection":
+            from app_pages.live_detection import show_live_detection
+            show_live_detection()
+        elif page == "🗂️ Batch Processing":
+            from app_pages.batch_processing import show_batch_processing
+            show_batch_processing()
+        elif page == "📈 Data Analysis":
+            from app_pages.data_analysis import show_data_analysis
+            show_data_analysis()
+        elif page == "🎯 Model Performance":
+            from app_pages.model_performance import show_model_performance
+            show_model_performance()
+    
+    # Preload once the UI is up (EMOTION_PRELOAD=0 disables it)
+    if (DEEPFACE_AVAILABLE and not os.environ.get("EMOTION_SERVICE_URL")
+            and os.environ.get("EMOTION_PRELOAD", "1") != "0"):
+        start_background_preload()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+import streamlit as st
+import pandas as pd
+
+from app_pages.emotion_detection import DEEPFACE_AVAILABLE, get_predictor
+from src.batch_jobs import RUNNING, BatchJob, iter_uploads
+
+# Seconds between refreshes of the results area while a job runs
+REFRESH_SECONDS = 1.0
+
+def show_batch_processing():
+    st.title("🗂️ Batch Processing")
+    
+    st.markdown("""
+    Upload many images, or zip archives of images, to analyze them together.
+    Processing runs in the background: results appear below as each batch
+    finishes, and a run can be cancelled at any time.
+    """)
+    
+    if not DEEPFACE_AVAILABLE:
+        st.warning("⚠️ DeepFace not available - batch processing needs the emotion model")
+        return
+    
+    job = st.session_state.get("batch_job")
+    running = job is not None and job.state == RUNNING
+    
+    uploaded_files = st.file_uploader(
+        "Choose image files or zip archives",
+        type=["jpg", "jpeg", "png", "zip"],
+        accept_multiple_files=True,
+        disabled=running
+    )
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        if st.button("🚀 Start batch", type="primary", disabled=running or not uploaded_files):
+            # Read uploads on the script thread; the worker never touches Streamlit objects
+            items = list(iter_uploads([(upload.name, upload.getvalue()) for upload in uploaded_files]))
+            if not items:
+                st.error("❌ No images found in the uploaded files")
+            else:
+                st.session_state["batch_job"] = BatchJob(get_predictor(), items).start()
+                st.rerun()
+    with col2:
+        if st.button("⏹️ Cancel", disabled=not running):
+            job.cancel()
+    
+    if job is None:
+        return
+    if job.done:
+        show_job_results(job)
+        if job.snapshot()["rows"]:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("⬇️ Download Parquet", job.to_parquet_bytes(), "emotion_results.parquet",
+                                   mime="application/octet-stream")
+            with col2:
+                st.download_button("⬇️ Download CSV", job.to_csv_bytes(), "emotion_results.csv",
+                                   mime="text/csv")
+    else:
+        show_job_progress(job)
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def show_job_progress(job: BatchJob):
+    # Only this fragment reruns on the timer; once the job ends, one full
+    # rerun re-enables the uploader and shows the downloads
+    if job.done:
+        st.rerun()
+    show_job_results(job)
+
+def show_job_results(job: BatchJob):
+    snapshot = job.snapshot()
+    total = max(snapshot["total"], 1)
+    st.progress(snapshot["processed"] / total,
+                text=f"{snapshot['processed']}/{snapshot['total']} images · {snapshot['state']} · "
+                     f"{snapshot['elapsed']:.1f}s")
+    
+    if snapshot["error"]:
+        st.error(f"❌ Batch failed: {snapshot['error']}")
+    
+    insights = snapshot["insights"]
+    if insights:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Faces analyzed", insights["successful_predictions"])
+        with col2:
+            st.metric("Most common emotion", insights["most_common_emotion"].title())
+        with col3:
+            st.metric("Average confidence", f"{insights['average_confidence']:.1f}%")
+        st.bar_chart(insights["emotion_distribution"])
+    
+    if snapshot["rows"]:
+        results = pd.DataFrame(snapshot["rows"])
+        st.dataframe(results[["name", "success", "face_count", "dominant_emotion", "confidence", "error"]],
+                     use_container_width=True, hide_index=True)
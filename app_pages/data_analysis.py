@@ -7,6 +7,8 @@ from PIL import Image
 import requests
 from io import BytesIO
 
+from app_pages.session_cache import cached_figure
+
 def show_data_analysis():
     st.title("📈 Data Analysis")
     
@@ -35,21 +37,24 @@ def show_data_analysis():
     st.subheader("🎭 Emotion Distribution")
     
     # Create distribution chart
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars = ax.bar(emotions, sample_counts, color=['#FFD700', '#4169E1', '#DC143C', '#FF69B4', '#8B4513', '#32CD32', '#808080'])
-    ax.set_title('Distribution of Emotions in Dataset', fontsize=16, fontweight='bold')
-    ax.set_xlabel('Emotion Categories', fontsize=12)
-    ax.set_ylabel('Number of Images', fontsize=12)
-    ax.tick_params(axis='x', rotation=45)
-    
-    # Add value labels on bars
-    for bar, count in zip(bars, sample_counts):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height + 20,
-                f'{count}', ha='center', va='bottom', fontweight='bold')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    def distribution_figure():
+        fig, ax = plt.subplots(figsize=(10, 6))
+        bars = ax.bar(emotions, sample_counts, color=['#FFD700', '#4169E1', '#DC143C', '#FF69B4', '#8B4513', '#32CD32', '#808080'])
+        ax.set_title('Distribution of Emotions in Dataset', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Emotion Categories', fontsize=12)
+        ax.set_ylabel('Number of Images', fontsize=12)
+        ax.tick_params(axis='x', rotation=45)
+        
+        # Add value labels on bars
+        for bar, count in zip(bars, sample_counts):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 20,
+                    f'{count}', ha='center', va='bottom', fontweight='bold')
+        
+        plt.tight_layout()
+        return fig
+    
+    cached_figure("emotion_distribution", [emotions, sample_counts], distribution_figure)
     
     # Data Quality Metrics
     st.subheader("🔍 Data Quality Analysis")
@@ -70,12 +75,15 @@ def show_data_analysis():
     correlation_data = np.random.rand(7, 7)
     correlation_df = pd.DataFrame(correlation_data, index=emotions, columns=emotions)
     
-    fig, ax = plt.subplots(figsize=(8, 6))
-    sns.heatmap(correlation_df, annot=True, cmap='coolwarm', center=0, 
-                square=True, ax=ax, cbar_kws={'shrink': 0.8})
-    ax.set_title('Emotion Correlation Matrix', fontsize=14, fontweight='bold')
-    plt.tight_layout()
-    st.pyplot(fig)
+    def correlation_figure():
+        fig, ax = plt.subplots(figsize=(8, 6))
+        sns.heatmap(correlation_df, annot=True, cmap='coolwarm', center=0, 
+                    square=True, ax=ax, cbar_kws={'shrink': 0.8})
+        ax.set_title('Emotion Correlation Matrix', fontsize=14, fontweight='bold')
+        plt.tight_layout()
+        return fig
+    
+    cached_figure("emotion_correlation", [correlation_data, emotions], correlation_figure)
     
     # Data Insights
     st.subheader("💡 Key Insights")
@@ -104,24 +112,27 @@ def show_data_analysis():
     st.dataframe(performance_data, use_container_width=True)
     
     # Performance visualization
-    fig, ax = plt.subplots(figsize=(12, 6))
-    x = np.arange(len(emotions))
-    width = 0.25
-    
-    ax.bar(x - width, performance_data['Precision'], width, label='Precision', alpha=0.8)
-    ax.bar(x, performance_data['Recall'], width, label='Recall', alpha=0.8)
-    ax.bar(x + width, performance_data['F1-Score'], width, label='F1-Score', alpha=0.8)
-    
-    ax.set_xlabel('Emotion Categories')
-    ax.set_ylabel('Score')
-    ax.set_title('Model Performance Metrics by Emotion')
-    ax.set_xticks(x)
-    ax.set_xticklabels(emotions, rotation=45)
-    ax.legend()
-    ax.set_ylim(0, 1)
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    def performance_figure():
+        fig, ax = plt.subplots(figsize=(12, 6))
+        x = np.arange(len(emotions))
+        width = 0.25
+        
+        ax.bar(x - width, performance_data['Precision'], width, label='Precision', alpha=0.8)
+        ax.bar(x, performance_data['Recall'], width, label='Recall', alpha=0.8)
+        ax.bar(x + width, performance_data['F1-Score'], width, label='F1-Score', alpha=0.8)
+        
+        ax.set_xlabel('Emotion Categories')
+        ax.set_ylabel('Score')
+        ax.set_title('Model Performance Metrics by Emotion')
+        ax.set_xticks(x)
+        ax.set_xticklabels(emotions, rotation=45)
+        ax.legend()
+        ax.set_ylim(0, 1)
+        
+        plt.tight_layout()
+        return fig
+    
+    cached_figure("dataset_performance", [performance_data], performance_figure)
     
     # Conclusions
     st.subheader("📋 Data Analysis Conclusions")
@@ -1,11 +1,31 @@
 import streamlit as st
-from PIL import Image
 import numpy as np
+import os
 import time
+from importlib.util import find_spec
+from typing import Dict
+
+from app_pages.session_cache import get_session_cache
+from src.ingest import ingest_image
+from src.ui_cache import content_key
+
+# When set, inference runs in the shared service (src.inference_server)
+SERVICE_URL = os.environ.get("EMOTION_SERVICE_URL")
 
 # Try to import DeepFace, handle gracefully if not available
 try:
-    from deepface import DeepFace
+    if SERVICE_URL:
+        from src.inference_client import RemoteEmotionPredictor
+    else:
+        # Only check DeepFace is installed; it loads on first inference
+        if find_spec("deepface") is None:
+            raise ImportError("No module named 'deepface'")
+        from src.metrics import start_metrics_server
+        from src.model_registry import get_model_registry, warm_up_models
+        from src.model_utils import EmotionPredictor
+        from src.prediction_cache import PredictionCache
+    from src.admission import AdmissionController, AdmittedPredictor, Overloaded
+    from src.model_utils import draw_face_boxes
     DEEPFACE_AVAILABLE = True
 except ImportError as e:
     st.error(f"DeepFace import error: {str(e)}")
@@ -14,12 +34,138 @@ except Exception as e:
     st.error(f"DeepFace error: {str(e)}")
     DEEPFACE_AVAILABLE = False
 
+@st.cache_resource(show_spinner="Loading emotion model...")
+def get_predictor():
+    """
+    Load and warm up the emotion model once per process, shared by all sessions
+    
+    Local inference goes through one admission queue, so concurrent
+    sessions take turns on the model (EMOTION_MAX_CONCURRENCY at a time,
+    EMOTION_MAX_QUEUE waiting) instead of oversubscribing the CPU.
+    """
+    if SERVICE_URL:
+        # The service batches and queues requests itself
+        return RemoteEmotionPredictor(SERVICE_URL)
+    
+    warm_up_models()
+    cache = PredictionCache(
+        max_entries=int(os.environ.get("EMOTION_CACHE_SIZE", "512")),
+        disk_dir=os.environ.get("EMOTION_CACHE_DIR")
+    )
+    admission = AdmissionController(
+        max_concurrency=int(os.environ.get("EMOTION_MAX_CONCURRENCY", "1")),
+        max_queue=int(os.environ.get("EMOTION_MAX_QUEUE", "8")),
+        max_wait_seconds=float(os.environ.get("EMOTION_MAX_WAIT_SECONDS", "30"))
+    )
+    predictor = AdmittedPredictor(EmotionPredictor(cache=cache), admission)
+    if os.environ.get("EMOTION_METRICS_PORT"):
+        start_metrics_server(int(os.environ["EMOTION_METRICS_PORT"]),
+                             lambda: predictor.metrics.metrics() + admission.metrics())
+    return predictor
+
+def show_face_analysis(pixels: np.ndarray, ingested, result: Dict, analysis_key: str):
+    """
+    Show per-face emotions, the annotated image and business insights
+    """
+    faces = result["faces"]
+    insights = result["insights"]
+    if "error" in insights:
+        # Every detected face was filtered out, so there is nothing to summarize
+        st.warning("⚠️ No usable face found. Try a clearer, front-facing photo with a larger face.")
+        return
+    original_faces = ingested.restore_regions(result)["faces"]
+    
+    st.success(f"✅ Analysis completed successfully! {result['face_count']} face(s) detected")
+    annotated = get_session_cache("results").get_or_compute(f"boxes:{analysis_key}",
+                                                            lambda: draw_face_boxes(pixels, faces))
+    st.image(annotated, caption="Detected Faces", channels="BGR", use_column_width=True)
+    
+    # Display results
+    st.subheader("🎭 Detected Emotions")
+    
+    # Emoji mapping
+    emoji_map = {
+        "happy": "😀",
+        "sad": "😢", 
+        "angry": "😡",
+        "surprise": "😮",
+        "fear": "😨",
+        "disgust": "🤢",
+        "neutral": "😐"
+    }
+    
+    for index, (face, original) in enumerate(zip(faces, original_faces), start=1):
+        emotions = face["emotions"]
+        with st.expander(f"Face {index}: {emoji_map.get(face['dominant_emotion'], '🙂')} "
+                         f"{face['dominant_emotion'].title()} ({face['confidence']:.2f}%)",
+                         expanded=len(faces) == 1):
+            region = original["region"]
+            st.caption(f"Box at ({region['x']}, {region['y']}), "
+                       f"{region['w']}x{region['h']} px in the original image")
+            # Create columns for better layout
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("### Emotion Scores")
+                for emotion, score in emotions.items():
+                    emoji = emoji_map.get(emotion, "🙂")
+                    st.write(f"{emoji} **{emotion.title()}**: {score:.2f}%")
+            
+            with col2:
+                st.markdown("### Visual Representation")
+                st.bar_chart(emotions)
+    
+    # Dominant emotion across all faces
+    dominant_emotion = insights["most_common_emotion"]
+    
+    st.info(f"""
+    🎯 **Dominant Emotion**: {emoji_map.get(dominant_emotion, "🙂")} {dominant_emotion.title()} 
+    across {result['face_count']} face(s), average confidence {insights['average_confidence']:.2f}%
+    """)
+    
+    if len(faces) > 1:
+        st.markdown("### Emotion Distribution")
+        st.bar_chart(insights["emotion_distribution"])
+    
+    # Business insights
+    st.subheader("💼 Business Insights")
+    if dominant_emotion in ["happy", "surprise"]:
+        st.success("😊 **Positive Sentiment**: Customer appears satisfied and engaged")
+    elif dominant_emotion in ["sad", "angry", "fear"]:
+        st.warning("😟 **Negative Sentiment**: Customer may need immediate attention")
+    else:
+        st.info("😐 **Neutral Sentiment**: Customer shows standard engagement level")
+
 def show_emotion_detection():
     st.title("😀 Emotion Detection")
     
     # Show DeepFace status
     if DEEPFACE_AVAILABLE:
-        st.success("✅ DeepFace is available and ready to use!")
+        predictor = get_predictor()
+        if SERVICE_URL:
+            st.success(f"✅ Using the inference service at {SERVICE_URL}")
+        else:
+            st.success("✅ DeepFace is available and ready to use!")
+            with st.expander("⏱️ Model warm-up, cache and stage latency"):
+                for name, timing in get_model_registry().timings().items():
+                    st.write(f"**{name}**: loaded in {timing['load_seconds']:.2f}s, "
+                             f"warm-up {timing['warmup_seconds']:.2f}s")
+                stats = predictor.cache.stats()
+                st.write(f"**Prediction cache**: {stats['hits']} hits, {stats['misses']} misses, "
+                         f"{stats['evictions']} evictions ({stats['entries']}/{stats['max_entries']} entries)")
+                pipeline = predictor.metrics.snapshot()
+                for stage, summary in pipeline["stages"].items():
+                    st.write(f"**{stage.title()}**: p50 {summary['p50'] * 1000:.1f} ms, "
+                             f"p95 {summary['p95'] * 1000:.1f} ms ({summary['count']} samples)")
+                if pipeline["errors"]:
+                    st.write("**Errors**: " + ", ".join(f"{name} × {int(count)}"
+                                                        for name, count in pipeline["errors"].items()))
+                load = predictor.admission.stats()
+                st.write(f"**Admission**: {load['in_flight']}/{load['max_concurrency']} running, "
+                         f"{load['queue_depth']}/{load['max_queue']} queued, "
+                         f"estimated wait {load['estimated_wait_seconds']:.1f}s, "
+                         f"p95 queue wait {load['queue_wait_seconds']['p95']:.2f}s; "
+                         + ", ".join(f"{outcome} × {int(count)}" for outcome, count in load["outcomes"].items()))
     else:
         st.warning("⚠️ DeepFace not available - using demo mode")
     
@@ -36,12 +182,32 @@ def show_emotion_detection():
     )
     
     if uploaded_file is not None:
-        # Display uploaded image
-        image = Image.open(uploaded_file)
-        st.image(image, caption="Uploaded Image", use_column_width=True)
+        # The decoded upload and its analysis are kept per upload hash, so
+        # reruns triggered by other widgets neither decode nor analyze again
+        results = get_session_cache("results")
+        upload_key = content_key(uploaded_file.getvalue())
+        # Decode straight to detection resolution; a 40 MP photo is never
+        # expanded to full size (EMOTION_MAX_DETECT_SIDE sets the limit).
+        # BGR, as on the batch page and in the service, so the model sees the
+        # same pixels and cache / near-duplicate keys match across them
+        try:
+            ingested = results.get_or_compute(f"ingest:{upload_key}", lambda: ingest_image(uploaded_file, bgr=True))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        pixels = ingested.pixels
+        caption = "Uploaded Image"
+        if ingested.downscaled:
+            caption += (f" (analyzed at {pixels.shape[1]}x{pixels.shape[0]}, "
+                        f"original {ingested.original_size[0]}x{ingested.original_size[1]})")
+        st.image(pixels, caption=caption, channels="BGR", use_column_width=True)
+        
+        analysis_key = f"faces:{upload_key}"
+        result = results.get(analysis_key)
         
         # Analyze emotions
-        if st.button("🔍 Analyze Emotions", type="primary"):
+        analyze = st.button("🔍 Analyze Emotions", type="primary")
+        if analyze:
             # Debug information
             st.info(f"DeepFace Available: {DEEPFACE_AVAILABLE}")
             
@@ -49,80 +215,37 @@ def show_emotion_detection():
                 st.error("❌ DeepFace is not available. Please check the installation.")
                 st.info("This is a demo version. In production, ensure DeepFace is properly installed.")
                 return
-                
-            with st.spinner("Analyzing emotions..."):
-                try:
-                    # Perform emotion analysis
-                    result = DeepFace.analyze(
-                        np.array(image), 
-                        actions=['emotion'], 
-                        enforce_detection=False
-                    )
-                    
-                    # Extract results
-                    emotions = result[0]["emotion"]
-                    
-                    st.success("✅ Analysis completed successfully!")
-                    
-                    # Display results
-                    st.subheader("🎭 Detected Emotions")
-                    
-                    # Emoji mapping
-                    emoji_map = {
-                        "happy": "😀",
-                        "sad": "😢", 
-                        "angry": "😡",
-                        "surprise": "😮",
-                        "fear": "😨",
-                        "disgust": "🤢",
-                        "neutral": "😐"
-                    }
-                    
-                    # Create columns for better layout
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("### Emotion Scores")
-                        for emotion, score in emotions.items():
-                            emoji = emoji_map.get(emotion, "🙂")
-                            st.write(f"{emoji} **{emotion.title()}**: {score:.2f}%")
-                    
-                    with col2:
-                        st.markdown("### Visual Representation")
-                        st.bar_chart(emotions)
-                    
-                    # Dominant emotion
-                    dominant_emotion = max(emotions, key=emotions.get)
-                    dominant_score = emotions[dominant_emotion]
-                    
-                    st.info(f"""
-                    🎯 **Dominant Emotion**: {emoji_map.get(dominant_emotion, "🙂")} {dominant_emotion.title()} 
-                    with {dominant_score:.2f}% confidence
-                    """)
-                    
-                    # Business insights
-                    st.subheader("💼 Business Insights")
-                    if dominant_emotion in ["happy", "surprise"]:
-                        st.success("😊 **Positive Sentiment**: Customer appears satisfied and engaged")
-                    elif dominant_emotion in ["sad", "angry", "fear"]:
-                        st.warning("😟 **Negative Sentiment**: Customer may need immediate attention")
-                    else:
-                        st.info("😐 **Neutral Sentiment**: Customer shows standard engagement level")
-                    
-                except Exception as e:
-                    st.error(f"❌ Error during analysis: {str(e)}")
-                    st.info("Please ensure the image contains a clear, detectable face.")
+        
+        # An earlier analysis of the same upload stays on screen across reruns
+        if analyze or result is not None:
+            try:
+                if result is None:
+                    with st.spinner("Analyzing emotions..."):
+                        # Detect every face once and classify them in one batch
+                        result = predictor.predict_faces(pixels)
+                    if not result["success"]:
+                        raise RuntimeError(result["error"])
+                    results.put(analysis_key, result)
+                show_face_analysis(pixels, ingested, result, analysis_key)
+            except Overloaded as e:
+                st.warning(f"⏳ The emotion model is busy ({e.queue_depth} requests queued). "
+                           f"Please try again in about {max(e.retry_after, 1):.0f}s.")
+            except Exception as e:
+                st.error(f"❌ Error during analysis: {str(e)}")
+                st.info("Please ensure the image contains a clear, detectable face.")
+    
     
     # Additional features
     st.markdown("---")
     st.subheader("📋 Analysis Features")
     
     features = [
-        "✅ Real-time emotion detection",
+        "✅ Real-time emotion detection (live camera on the Live Detection page)",
         "✅ 7 emotion categories supported", 
+        "✅ Multi-face detection with bounding boxes",
         "✅ Confidence scoring for each emotion",
         "✅ Business sentiment insights",
-        "✅ Batch processing capability"
+        "✅ Batch processing (see the Batch Processing page)"
     ]
     
     for feature in features:
@@ -0,0 +1,186 @@
+import os
+import tempfile
+import time
+from importlib.util import find_spec
+from typing import Tuple
+
+import cv2
+import streamlit as st
+
+from app_pages.emotion_detection import DEEPFACE_AVAILABLE, SERVICE_URL, get_predictor
+from src.live_stream import LiveEmotionAnalyzer, play_video
+
+# Browser camera streaming is optional (pip install streamlit-webrtc)
+WEBRTC_AVAILABLE = find_spec("streamlit_webrtc") is not None
+
+# Frames per second sent to the browser when playing a video file
+DISPLAY_FPS = 15
+# Widest frame sent to the browser when playing a video file
+DISPLAY_WIDTH = 960
+# Seconds between refreshes of the live readout
+STATS_SECONDS = 1.0
+
+RESOLUTIONS = [320, 480, 640, 960, 1280]
+
+def show_live_detection():
+    st.title("🎥 Live Detection")
+    
+    st.markdown("""
+    Analyze a live camera feed in real time. Only the newest frame is
+    analyzed: when the model falls behind, older frames are dropped rather
+    than queued, and the resolution is lowered while results miss the
+    latency budget. A video file can stand in for the camera.
+    """)
+    
+    if not DEEPFACE_AVAILABLE:
+        st.warning("⚠️ DeepFace not available - live detection needs the emotion model")
+        return
+    if SERVICE_URL:
+        st.info("ℹ️ Live detection runs the model in this process; it is not available with EMOTION_SERVICE_URL")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        budget_ms = st.slider("Latency budget (ms)", 100, 1000,
+                              int(os.environ.get("EMOTION_LIVE_BUDGET_MS", "300")), step=50)
+    with col2:
+        max_side = st.selectbox("Max resolution (px)", RESOLUTIONS, index=RESOLUTIONS.index(640))
+    with col3:
+        detect_every = st.slider("Detect faces every n frames", 1, 30, 5,
+                                 help="Faces are tracked between detections")
+    analyzer = get_analyzer((budget_ms, max_side, detect_every))
+    
+    source = st.radio("Source", ["Browser camera", "Video file"], horizontal=True)
+    if source == "Browser camera":
+        show_camera(analyzer)
+    else:
+        show_video_file(analyzer)
+
+def get_analyzer(settings: Tuple[int, int, int]) -> LiveEmotionAnalyzer:
+    """
+    The session's analyzer, replaced when the settings change
+    """
+    current = st.session_state.get("live_analyzer")
+    if current is not None and st.session_state.get("live_settings") == settings:
+        return current
+    if current is not None:
+        current.stop()
+    
+    budget_ms, max_side, detect_every = settings
+    analyzer = LiveEmotionAnalyzer(get_predictor(), budget_ms, max_side=max_side, detect_every=detect_every)
+    st.session_state["live_analyzer"] = analyzer
+    st.session_state["live_settings"] = settings
+    return analyzer
+
+def show_camera(analyzer: LiveEmotionAnalyzer):
+    if not WEBRTC_AVAILABLE:
+        st.warning("⚠️ Browser camera streaming needs streamlit-webrtc (pip install streamlit-webrtc). "
+                   "A video file can be used instead.")
+        return
+    
+    import av
+    from streamlit_webrtc import WebRtcMode, webrtc_streamer
+    
+    def on_frame(frame: "av.VideoFrame") -> "av.VideoFrame":
+        # Runs on the WebRTC thread for every frame; never waits for the model
+        image = frame.to_ndarray(format="bgr24")
+        analyzer.submit(image)
+        return av.VideoFrame.from_ndarray(analyzer.annotate(image), format="bgr24")
+    
+    context = webrtc_streamer(
+        key="live-emotion",
+        mode=WebRtcMode.SENDRECV,
+        video_frame_callback=on_frame,
+        media_stream_constraints={"video": True, "audio": False},
+        rtc_configuration={"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]},
+        async_processing=True
+    )
+    if context.state.playing:
+        analyzer.start()
+        show_live_stats(analyzer)
+    else:
+        analyzer.stop()
+
+def show_video_file(analyzer: LiveEmotionAnalyzer):
+    uploaded_file = st.file_uploader("Video file standing in for the camera", type=["mp4", "avi", "mov", "mkv"])
+    default_path = os.environ.get("EMOTION_LIVE_VIDEO")
+    if uploaded_file is None and not default_path:
+        st.info("Upload a video file, or set EMOTION_LIVE_VIDEO to a local video path")
+        return
+    if uploaded_file is None:
+        st.caption(f"Playing {default_path} (EMOTION_LIVE_VIDEO)")
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        play = st.button("▶️ Play", type="primary")
+    with col2:
+        # Any interaction reruns the page, which ends playback
+        st.button("⏹️ Stop")
+    if not play:
+        return
+    
+    frame_area = st.empty()
+    stats_area = st.empty()
+    last_display = last_stats = 0.0
+    
+    def on_frame(frame):
+        nonlocal last_display, last_stats
+        now = time.monotonic()
+        if now - last_display < 1 / DISPLAY_FPS:
+            return
+        last_display = now
+        annotated = analyzer.annotate(frame)
+        if annotated.shape[1] > DISPLAY_WIDTH:
+            height = round(annotated.shape[0] * DISPLAY_WIDTH / annotated.shape[1])
+            annotated = cv2.resize(annotated, (DISPLAY_WIDTH, height), interpolation=cv2.INTER_AREA)
+        frame_area.image(annotated, channels="BGR")
+        if now - last_stats >= STATS_SECONDS:
+            last_stats = now
+            with stats_area.container():
+                show_stats(analyzer)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = default_path
+        if uploaded_file is not None:
+            path = os.path.join(directory, os.path.basename(uploaded_file.name))
+            with open(path, "wb") as f:
+                f.write(uploaded_file.getvalue())
+        
+        analyzer.start()
+        try:
+            play_video(path, analyzer, on_frame)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        finally:
+            analyzer.stop()
+    
+    with stats_area.container():
+        show_stats(analyzer)
+    st.success("✅ Playback finished")
+
+@st.fragment(run_every=STATS_SECONDS)
+def show_live_stats(analyzer: LiveEmotionAnalyzer):
+    show_stats(analyzer)
+
+def show_stats(analyzer: LiveEmotionAnalyzer):
+    stats = analyzer.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Analyzed FPS", f"{stats['processed_fps']:.1f}")
+    with col2:
+        st.metric("Latency", f"{stats['latency_ms']:.0f} ms")
+    with col3:
+        st.metric("Dropped frames", f"{stats['drop_rate']:.0%}")
+    with col4:
+        st.metric("Resolution", f"{stats['side']}px")
+    st.caption(f"Camera {stats['input_fps']:.1f} fps · latency p50 {stats['latency_p50_ms']:.0f} ms, "
+               f"p95 {stats['latency_p95_ms']:.0f} ms · budget {stats['budget_ms']:.0f} ms · "
+               f"{stats['over_budget']}/{stats['processed']} results over budget")
+    
+    latest = analyzer.latest()
+    if latest is not None and latest["faces"]:
+        st.write(" · ".join(f"**Face {index}**: {face['dominant_emotion'].title()} ({face['confidence']:.0f}%)"
+                            for index, face in enumerate(latest["faces"], start=1)))
+    if analyzer.error:
+        st.error(f"❌ Live analysis error: {analyzer.error}")
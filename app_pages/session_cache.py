@@ -0,0 +1,63 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+import streamlit as st
+
+from src.ui_cache import TTLCache, content_key, render_figure
+
+# Per-session budgets (EMOTION_UI_CACHE_MB=0 turns caching off, e.g. to
+# measure rerun latency without it)
+CACHE_LIMITS = {
+    # Decoded uploads and analysis results, keyed by upload hash
+    "results": {"max_bytes": 128 * 1024 * 1024, "ttl_seconds": 30 * 60},
+    # Rendered PNG figures, keyed by the data that produced them
+    "figures": {"max_bytes": 32 * 1024 * 1024, "ttl_seconds": 10 * 60},
+}
+
+# Rerun durations kept per page for the sidebar readout
+RERUN_HISTORY = 50
+
+def get_session_cache(name: str) -> TTLCache:
+    """
+    The named cache of the current browser session, created on first use
+    """
+    caches = st.session_state.setdefault("_ui_caches", {})
+    if name not in caches:
+        limits = dict(CACHE_LIMITS[name])
+        budget_mb = os.environ.get("EMOTION_UI_CACHE_MB")
+        if budget_mb is not None:
+            limits["max_bytes"] = int(float(budget_mb) * 1024 * 1024)
+        caches[name] = TTLCache(**limits)
+    return caches[name]
+
+def cached_figure(name: str, data: Iterable, build: Callable, **image_kwargs):
+    """
+    Show a matplotlib figure, rendering it only when its data changes
+    
+    Args:
+        name: Figure identity within the app
+        data: Everything the figure depends on (arrays, frames, options)
+        build: Zero-argument function returning the matplotlib Figure
+        image_kwargs: Passed to st.image
+    """
+    key = content_key(name, *data)
+    png = get_session_cache("figures").get_or_compute(key, lambda: render_figure(build()))
+    st.image(png, use_container_width=True, **image_kwargs)
+
+@contextmanager
+def rerun_timer(page: str):
+    """
+    Time one run of a page script and show recent latency in the sidebar
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        history = st.session_state.setdefault("_rerun_seconds", {}).setdefault(page, [])
+        history.append(time.perf_counter() - start)
+        del history[:-RERUN_HISTORY]
+        ordered = sorted(history)
+        st.sidebar.caption(f"⏱️ Last run {history[-1] * 1000:.0f} ms · "
+                           f"median {ordered[len(ordered) // 2] * 1000:.0f} ms over {len(history)} runs")
@@ -0,0 +1,120 @@
+"""
+Admission Control Load Benchmark
+
+Simulates many Streamlit sessions clicking "Analyze" at once: each user
+thread sends predict_faces requests back to back to one shared
+EmotionPredictor. It runs once with every thread calling the model directly
+(the previous behaviour) and once through an AdmissionController at each
+concurrency limit, and reports throughput, latency percentiles of the
+completed requests and how many were turned away with a wait estimate.
+
+Usage:
+    python -m benchmarks.bench_admission --users 16 --requests 6 --concurrency 1 2
+"""
+
+import argparse
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+from benchmarks.synthetic import make_face_images
+from src.admission import AdmissionController, AdmittedPredictor, Overloaded
+from src.model_utils import EmotionPredictor
+
+def run_load(predictor, images: List[np.ndarray], users: int, requests: int) -> Dict:
+    """
+    Drive a predictor from concurrent user threads
+    
+    Args:
+        predictor: Object with predict_faces(image)
+        images: Images the users pick from
+        users: Concurrent user threads
+        requests: Requests per user
+    
+    Returns:
+        Throughput, latency percentiles and rejection count
+    """
+    latencies, retry_afters = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(users)
+    
+    def user(index: int):
+        barrier.wait()
+        for request in range(requests):
+            image = images[(index * requests + request) % len(images)]
+            start = time.perf_counter()
+            try:
+                predictor.predict_faces(image)
+            except Overloaded as e:
+                with lock:
+                    retry_afters.append(e.retry_after)
+                # A user told to come back later waits that long
+                time.sleep(min(e.retry_after, 1.0))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+    
+    threads = [threading.Thread(target=user, args=(index,)) for index in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "completed": len(latencies),
+        "rejected": len(retry_afters),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)) if len(latencies) else 0.0,
+        "p95_ms": float(np.percentile(latencies_ms, 95)) if len(latencies) else 0.0,
+        "max_ms": float(latencies_ms.max()) if len(latencies) else 0.0,
+        "mean_retry_after": float(np.mean(retry_afters)) if retry_afters else 0.0,
+    }
+
+def run_benchmark(users: int, requests: int, concurrency: List[int], max_queue: int,
+                  max_wait: Optional[float]) -> List[Dict]:
+    """
+    Compare unlimited concurrent calls with admission control
+    
+    Args:
+        users: Concurrent user threads
+        requests: Requests per user
+        concurrency: Concurrency limits to try
+        max_queue: Waiting requests allowed
+        max_wait: Longest estimated or actual wait before rejecting
+    
+    Returns:
+        One result row per configuration
+    """
+    images = make_face_images(32)
+    predictor = EmotionPredictor()
+    # Load weights outside the timed region
+    predictor.batch_predict_faces(images[:2])
+    
+    rows = [dict(run_load(predictor, images, users, requests), config="unlimited")]
+    for limit in concurrency:
+        controller = AdmissionController(limit, max_queue, max_wait)
+        row = run_load(AdmittedPredictor(predictor, controller), images, users, requests)
+        rows.append(dict(row, config=f"admission x{limit}, queue {max_queue}"))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=6, help="Requests per user")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--max-queue", type=int, default=8)
+    parser.add_argument("--max-wait", type=float, default=10.0)
+    args = parser.parse_args()
+    
+    print(f"{'configuration':<24} {'done':>5} {'rejected':>9} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'max ms':>8} {'retry s':>8}")
+    for row in run_benchmark(args.users, args.requests, args.concurrency, args.max_queue, args.max_wait):
+        print(f"{row['config']:<24} {row['completed']:>5} {row['rejected']:>9} {row['requests_per_second']:>7.1f} "
+              f"{row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f} {row['max_ms']:>8.0f} {row['mean_retry_after']:>8.2f}")
+
+if __name__ == "__main__":
+    main()
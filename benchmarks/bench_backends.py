@@ -0,0 +1,107 @@
+"""
+Inference Backend Benchmark
+
+Compares the Keras model with the exported ONNX Runtime and TFLite models
+(float32 and int8) on preprocessed synthetic faces. Each backend runs in a
+fresh spawned process so load time and peak RSS are not polluted by the
+others; RSS is what a worker would need just to serve that backend.
+
+Export the models first:
+    python -m src.backends export --output-dir models
+
+Usage:
+    python -m benchmarks.bench_backends --model-dir models --batch-sizes 1 32
+"""
+
+import argparse
+import resource
+import sys
+import time
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+import numpy as np
+
+from src.backends import BACKENDS
+
+def _measure(backend_name: str, model_dir: Optional[str], batch_sizes: List[int],
+             iterations: int, num_threads: int, seed: int) -> List[Dict]:
+    from src.backends import load_backend
+    from src.model_utils import face_to_model_input
+    from benchmarks.synthetic import make_face_images
+    
+    faces = np.stack([face_to_model_input(image)
+                      for image in make_face_images(max(batch_sizes), (96, 96), seed=seed)])
+    
+    start = time.perf_counter()
+    backend = load_backend(backend_name, model_dir, num_threads=num_threads)
+    backend.predict(faces[:1])
+    load_seconds = time.perf_counter() - start
+    
+    rows = []
+    for batch_size in batch_sizes:
+        batch = faces[:batch_size]
+        backend.predict(batch)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            backend.predict(batch)
+            timings.append(time.perf_counter() - start)
+        timings_ms = np.array(timings) * 1000
+        rows.append({
+            "backend": backend_name,
+            "batch_size": batch_size,
+            "load_seconds": load_seconds,
+            "p50_ms": float(np.percentile(timings_ms, 50)),
+            "p95_ms": float(np.percentile(timings_ms, 95)),
+            "faces_per_second": batch_size / (timings_ms.mean() / 1000),
+            # ru_maxrss is kilobytes on Linux
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        })
+    return rows
+
+def run_benchmark(backends: List[str], model_dir: Optional[str], batch_sizes: List[int],
+                  iterations: int = 50, num_threads: int = 1, seed: int = 42) -> List[Dict]:
+    """
+    Benchmark each backend in its own process
+    
+    Args:
+        backends: Backend names to compare
+        model_dir: Directory holding the exported models
+        batch_sizes: Batch sizes to time
+        iterations: Timed predict calls per batch size
+        num_threads: Inference threads for ONNX Runtime and TFLite
+        seed: Random seed for the synthetic faces
+    
+    Returns:
+        One result row per backend and batch size
+    """
+    rows = []
+    context = get_context("spawn")
+    for name in backends:
+        with context.Pool(1) as pool:
+            try:
+                rows.extend(pool.apply(_measure, (name, model_dir, batch_sizes,
+                                                  iterations, num_threads, seed)))
+            except Exception as e:
+                print(f"Skipping {name}: {e}", file=sys.stderr)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--model-dir", default=None)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+    
+    rows = run_benchmark(args.backends, args.model_dir, args.batch_sizes, args.iterations, args.threads)
+    print(f"{'backend':<12} {'batch':>6} {'load s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'faces/s':>9} {'RSS MB':>8}")
+    for row in rows:
+        print(f"{row['backend']:<12} {row['batch_size']:>6} {row['load_seconds']:>8.2f} "
+              f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['faces_per_second']:>9.0f} "
+              f"{row['peak_rss_mb']:>8.0f}")
+
+if __name__ == "__main__":
+    main()
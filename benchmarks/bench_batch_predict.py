@@ -0,0 +1,67 @@
+"""
+Batch Prediction Throughput Benchmark
+
+Compares the per-image predict_emotion loop with the tensor-batched
+batch_predict path across batch sizes and reports images per second.
+
+Usage:
+    python -m benchmarks.bench_batch_predict --images 256 --batch-sizes 1 8 32 64
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+from benchmarks.synthetic import make_face_images
+from src.model_utils import EmotionPredictor
+
+def run_benchmark(num_images: int, batch_sizes: List[int], detector_backend: str) -> List[Dict]:
+    """
+    Measure throughput of batch_predict for each batch size
+    
+    Args:
+        num_images: Number of synthetic images to score
+        batch_sizes: Batch sizes to compare
+        detector_backend: DeepFace detector backend
+        
+    Returns:
+        One result row per configuration
+    """
+    images = make_face_images(num_images)
+    predictor = EmotionPredictor(detector_backend=detector_backend)
+    
+    # Load weights outside the timed region
+    predictor.batch_predict(images[:2])
+    
+    rows = []
+    start = time.perf_counter()
+    for image in images:
+        predictor.predict_emotion(image)
+    elapsed = time.perf_counter() - start
+    rows.append({"mode": "per-image", "batch_size": 1, "seconds": elapsed,
+                 "images_per_second": num_images / elapsed})
+    
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        predictor.batch_predict(images, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        rows.append({"mode": "batched", "batch_size": batch_size, "seconds": elapsed,
+                     "images_per_second": num_images / elapsed})
+    
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=256)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--detector", default="opencv",
+                        help="DeepFace detector backend ('skip' isolates the model forward pass)")
+    args = parser.parse_args()
+    
+    print(f"{'mode':<10} {'batch':>6} {'seconds':>9} {'img/s':>9}")
+    for row in run_benchmark(args.images, args.batch_sizes, args.detector):
+        print(f"{row['mode']:<10} {row['batch_size']:>6} {row['seconds']:>9.2f} "
+              f"{row['images_per_second']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+API Collection Benchmark
+
+Serves a paginated JSON endpoint from a local stub HTTP server with a fixed
+per-request latency and an optional share of 503 responses, then compares
+the old one-connection-per-page sequential loop with EmotionDataCollector
+at several worker counts and rate limits. Reports pages and records per
+second, request and retry counts.
+
+Usage:
+    python -m benchmarks.bench_collection --pages 200 --latency-ms 50 --workers 1 4 16
+    python -m benchmarks.bench_collection --error-rate 0.1 --rate-limit 100
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from src.data_collection import EmotionDataCollector
+
+EMOTIONS = ['happy', 'sad', 'angry', 'surprise', 'fear', 'disgust', 'neutral']
+
+def start_stub_server(total_pages: int, page_size: int, latency: float, error_rate: float,
+                      seed: int = 42) -> ThreadingHTTPServer:
+    """
+    Start a paginated /samples endpoint on a free local port
+    
+    Args:
+        total_pages: Pages before the endpoint returns empty pages
+        page_size: Records per page
+        latency: Seconds each request takes
+        error_rate: Share of requests answered with 503
+        seed: Random seed for injected errors
+    
+    Returns:
+        Running server; call shutdown() when done
+    """
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this, Nagle
+        # plus delayed ACKs add ~40 ms to every keep-alive response
+        disable_nagle_algorithm = True
+        
+        def do_GET(self):
+            time.sleep(latency)
+            with rng_lock:
+                fail = rng.random() < error_rate
+            if fail:
+                body = b'{"error": "unavailable"}'
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+            else:
+                page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+                records = [] if page > total_pages else [
+                    {"id": f"sample_{page:05d}_{i:03d}", "emotion": EMOTIONS[(page + i) % len(EMOTIONS)],
+                     "confidence": 0.9, "page": page}
+                    for i in range(page_size)
+                ]
+                body = json.dumps({"data": records}).encode()
+                self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_baseline(base_url: str, output_path: str) -> Dict:
+    # The previous behaviour: a fresh connection per page, one page at a time
+    start = time.perf_counter()
+    pages = records = requests_made = 0
+    with open(output_path, 'w') as f:
+        page = 1
+        while True:
+            requests_made += 1
+            try:
+                response = requests.get(f"{base_url}/samples", params={"page": page}, timeout=30)
+                response.raise_for_status()
+                data = response.json()["data"]
+            except requests.RequestException:
+                data = None
+            if data == []:
+                break
+            if data:
+                for record in data:
+                    f.write(json.dumps(record) + "\n")
+                pages += 1
+                records += len(data)
+            page += 1
+    elapsed = time.perf_counter() - start
+    return {"pages": pages, "records": records, "failed_pages": [], "requests": requests_made,
+            "retries": 0, "seconds": elapsed, "records_per_second": records / elapsed}
+
+def run_benchmark(pages: int, page_size: int, latency: float, workers: List[int],
+                  rate_limits: List[Optional[float]], error_rate: float = 0.0) -> List[Dict]:
+    """
+    Time the baseline loop and the collector against one stub server
+    
+    Args:
+        pages: Pages served by the stub
+        page_size: Records per page
+        latency: Stub latency per request in seconds
+        workers: Collector worker counts to try
+        rate_limits: Requests per second to try (None for unlimited)
+        error_rate: Share of stub requests that fail with 503
+    
+    Returns:
+        One result row per configuration
+    """
+    server = start_stub_server(pages, page_size, latency, error_rate)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = os.path.join(directory, "samples.jsonl")
+            if error_rate == 0:
+                rows.append(dict(run_baseline(base_url, output_path), config="requests.get loop"))
+            for worker_count in workers:
+                for rate_limit in rate_limits:
+                    collector = EmotionDataCollector(base_url=base_url, max_workers=worker_count,
+                                                     rate_limit=rate_limit, backoff=0.05)
+                    stats = collector.collect_to_file("samples", output_path)
+                    limit = f"{rate_limit:g}/s" if rate_limit else "unlimited"
+                    rows.append(dict(stats, config=f"collector x{worker_count}, {limit}"))
+    finally:
+        server.shutdown()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rate-limit", type=float, nargs="+", default=[0],
+                        help="Requests per second; 0 for unlimited")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    args = parser.parse_args()
+    
+    rate_limits = [limit or None for limit in args.rate_limit]
+    rows = run_benchmark(args.pages, args.page_size, args.latency_ms / 1000, args.workers,
+                         rate_limits, args.error_rate)
+    print(f"{'configuration':<30} {'pages':>6} {'records/s':>10} {'pages/s':>8} {'requests':>9} "
+          f"{'retries':>8} {'failed':>7}")
+    for row in rows:
+        print(f"{row['config']:<30} {row['pages']:>6} {row['records_per_second']:>10.0f} "
+              f"{row['pages'] / row['seconds']:>8.1f} {row['requests']:>9} {row['retries']:>8} "
+              f"{len(row['failed_pages']):>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Face Shard Load Benchmark
+
+Writes a synthetic labeled face set as JPEGs in <dir>/<emotion>/<image>
+layout, converts it to memory-mapped shards, then times one pass over the
+data the old way (read + decode + preprocess every JPEG) and from shards
+(sequential batches and shuffled batches, as for evaluation and training).
+
+Usage:
+    python -m benchmarks.bench_face_shards --images 20000 --size 96 --batch-size 256
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+import numpy as np
+import cv2
+
+from benchmarks.synthetic import make_face_image
+from src.face_shards import FaceShardDataset, build_shards
+from src.insights import DEFAULT_EMOTIONS
+from src.model_utils import preprocess_batch
+
+def write_jpegs(directory: str, count: int, size: int, seed: int = 42) -> List[str]:
+    """
+    Write labeled synthetic face crops
+    
+    Args:
+        directory: Output root
+        count: Number of images
+        size: Image side in pixels
+        seed: Random seed
+    
+    Returns:
+        Paths of the written images
+    """
+    rng = np.random.default_rng(seed)
+    paths = []
+    for index in range(count):
+        label = DEFAULT_EMOTIONS[index % len(DEFAULT_EMOTIONS)]
+        os.makedirs(os.path.join(directory, label), exist_ok=True)
+        path = os.path.join(directory, label, f"{index:06d}.jpg")
+        cv2.imwrite(path, make_face_image(rng, (size, size)), [cv2.IMWRITE_JPEG_QUALITY, 90])
+        paths.append(path)
+    return paths
+
+def decode_pass(paths: List[str], batch_size: int) -> float:
+    # What every epoch or evaluation pass costs without shards
+    start = time.perf_counter()
+    for begin in range(0, len(paths), batch_size):
+        images = [cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in paths[begin:begin + batch_size]]
+        preprocess_batch(images)[..., np.newaxis]
+    return time.perf_counter() - start
+
+def shard_pass(dataset: FaceShardDataset, batch_size: int, shuffle: bool) -> float:
+    start = time.perf_counter()
+    for faces, labels in dataset.iter_batches(batch_size, shuffle=shuffle, seed=0):
+        pass
+    return time.perf_counter() - start
+
+def run_benchmark(images: int, size: int, batch_size: int, repeat: int = 3) -> Dict:
+    """
+    Build shards from synthetic JPEGs and compare pass throughput
+    
+    Args:
+        images: Number of faces
+        size: JPEG side in pixels
+        batch_size: Faces per batch
+        repeat: Passes per strategy (the best is reported)
+    
+    Returns:
+        Build time, on-disk sizes and images/s per strategy
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        image_dir = os.path.join(directory, "images")
+        shard_dir = os.path.join(directory, "shards")
+        paths = write_jpegs(image_dir, images, size)
+        
+        start = time.perf_counter()
+        build_shards(image_dir, shard_dir)
+        build_seconds = time.perf_counter() - start
+        dataset = FaceShardDataset(shard_dir)
+        
+        timings = {
+            "decode JPEGs": min(decode_pass(paths, batch_size) for _ in range(repeat)),
+            "shards, sequential": min(shard_pass(dataset, batch_size, False) for _ in range(repeat)),
+            "shards, shuffled": min(shard_pass(dataset, batch_size, True) for _ in range(repeat)),
+        }
+        return {
+            "images": images,
+            "build_seconds": build_seconds,
+            "jpeg_mb": sum(os.path.getsize(path) for path in paths) / 1e6,
+            "shard_mb": sum(os.path.getsize(os.path.join(shard_dir, name))
+                            for name in os.listdir(shard_dir)) / 1e6,
+            "images_per_second": {name: images / seconds for name, seconds in timings.items()},
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=96, help="Side of the synthetic JPEG crops")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    result = run_benchmark(args.images, args.size, args.batch_size, args.repeat)
+    print(f"{result['images']} faces: JPEGs {result['jpeg_mb']:.1f} MB, shards {result['shard_mb']:.1f} MB, "
+          f"built in {result['build_seconds']:.2f}s")
+    baseline = result["images_per_second"]["decode JPEGs"]
+    for name, rate in result["images_per_second"].items():
+        print(f"  {name:<20} {rate:>12.0f} images/s  ({rate / baseline:.1f}x)")
+
+if __name__ == "__main__":
+    main()
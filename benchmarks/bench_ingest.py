@@ -0,0 +1,112 @@
+"""
+Upload Ingest Benchmark
+
+Compares full-resolution decoding (Image.open + np.array, as the page used
+to do) with ingest_image's reduced decoding, for JPEG and PNG uploads of
+increasing size. Each measurement runs in a fresh process and reports the
+extra peak RSS over the process's state before decoding, plus decode and
+face detection latency (OpenCV Haar cascade, no TensorFlow).
+
+Usage:
+    python -m benchmarks.bench_ingest --megapixels 2 12 40 --max-side 1280
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+from multiprocessing import get_context
+from typing import Dict, List
+import numpy as np
+import cv2
+
+from benchmarks.synthetic import make_face_image
+
+def _write_upload(directory: str, megapixels: float, fmt: str, seed: int) -> str:
+    width = int(round((megapixels * 1e6 * 4 / 3) ** 0.5))
+    height = int(round(width * 3 / 4))
+    image = make_face_image(np.random.default_rng(seed), (height, width))
+    path = os.path.join(directory, f"{megapixels:g}mp.{fmt}")
+    cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, 90] if fmt == "jpg" else [])
+    return path
+
+def _measure(path: str, strategy: str, max_side: int, detect: bool) -> Dict:
+    from io import BytesIO
+    from PIL import Image
+    from src.backends import OpenCVFaceDetector
+    from src.ingest import ingest_image
+    
+    with open(path, 'rb') as f:
+        upload = BytesIO(f.read())
+    detector = OpenCVFaceDetector()
+    detector.extract_faces(np.zeros((64, 64, 3), dtype=np.uint8))
+    # ru_maxrss is kilobytes on Linux
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    start = time.perf_counter()
+    if strategy == "full decode":
+        pixels = np.array(Image.open(upload).convert("RGB"))
+    else:
+        pixels = ingest_image(upload, max_side).pixels
+    decode_seconds = time.perf_counter() - start
+    
+    detect_seconds = 0.0
+    if detect:
+        start = time.perf_counter()
+        detector.extract_faces(pixels)
+        detect_seconds = time.perf_counter() - start
+    
+    return {
+        "decoded_shape": f"{pixels.shape[1]}x{pixels.shape[0]}",
+        "decode_seconds": decode_seconds,
+        "detect_seconds": detect_seconds,
+        "extra_peak_rss_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+    }
+
+def run_benchmark(megapixels: List[float], formats: List[str], max_side: int,
+                  detect: bool = True, seed: int = 42) -> List[Dict]:
+    """
+    Measure decode memory and latency per image size, format and strategy
+    
+    Args:
+        megapixels: Upload sizes to generate
+        formats: Encodings to test ("jpg", "png")
+        max_side: Detection resolution for ingest_image
+        detect: Also time face detection on the decoded pixels
+        seed: Random seed for the synthetic uploads
+    
+    Returns:
+        One result row per size, format and strategy
+    """
+    rows = []
+    context = get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in megapixels:
+            for fmt in formats:
+                path = _write_upload(directory, size, fmt, seed)
+                for strategy in ("full decode", "ingest_image"):
+                    with context.Pool(1) as pool:
+                        row = pool.apply(_measure, (path, strategy, max_side, detect))
+                    row.update({"megapixels": size, "format": fmt, "strategy": strategy,
+                                "file_mb": os.path.getsize(path) / 1e6})
+                    rows.append(row)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[2, 12, 40])
+    parser.add_argument("--formats", nargs="+", default=["jpg", "png"], choices=["jpg", "png"])
+    parser.add_argument("--max-side", type=int, default=1280)
+    parser.add_argument("--no-detect", action="store_true", help="Only time decoding")
+    args = parser.parse_args()
+    
+    rows = run_benchmark(args.megapixels, args.formats, args.max_side, detect=not args.no_detect)
+    print(f"{'MP':>5} {'fmt':>4} {'strategy':<13} {'decoded':>11} {'decode s':>9} "
+          f"{'detect s':>9} {'+RSS MB':>8}")
+    for row in rows:
+        print(f"{row['megapixels']:>5g} {row['format']:>4} {row['strategy']:<13} {row['decoded_shape']:>11} "
+              f"{row['decode_seconds']:>9.3f} {row['detect_seconds']:>9.3f} {row['extra_peak_rss_mb']:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Live Stream Latency Benchmark
+
+Plays a synthetic clip at its frame rate as a stand-in camera and compares
+two consumers on the same predictor: one that queues every frame and
+analyzes them in order (latency grows without bound once inference is
+slower than the camera), and LiveEmotionAnalyzer, which only analyzes the
+newest frame and lowers the resolution to meet its latency budget. Reports
+analyzed FPS, end-to-end latency percentiles and dropped frames.
+
+Usage:
+    python -m benchmarks.bench_live_stream --frames 240 --height 720 --budget-ms 200
+"""
+
+import argparse
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.synthetic import write_synthetic_clip
+from src.live_stream import LiveEmotionAnalyzer, play_video
+from src.model_utils import EmotionPredictor
+from src.video_pipeline import VideoEmotionPipeline
+
+class _QueueAll:
+    """
+    Baseline consumer: every frame is queued and analyzed in arrival order
+    """
+    
+    def __init__(self, predictor: EmotionPredictor, detect_every: int):
+        self.pipeline = VideoEmotionPipeline(predictor, detect_every=detect_every)
+        self.frames: queue.Queue = queue.Queue()
+        self.latencies: List[float] = []
+        self.finished: List[float] = []
+    
+    def submit(self, frame: np.ndarray):
+        self.frames.put((time.monotonic(), frame))
+    
+    def run(self):
+        arrivals = []
+        
+        def frames():
+            while True:
+                item = self.frames.get()
+                if item is None:
+                    return
+                arrivals.append(item[0])
+                yield item[1]
+        
+        for _ in self.pipeline.process(frames()):
+            now = time.monotonic()
+            self.finished.append(now)
+            self.latencies.append(now - arrivals[-1])
+
+def _summary(latencies: List[float], finished: List[float], played: int, processed: int) -> Dict:
+    latencies_ms = np.array(latencies) * 1000
+    span = finished[-1] - finished[0] if len(finished) > 1 else 0.0
+    return {
+        "processed": processed,
+        "dropped": played - processed,
+        "fps": (len(finished) - 1) / span if span else 0.0,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95))
+    }
+
+def run_benchmark(clip_path: str, budget_ms: float, max_side: int, detect_every: int) -> List[Dict]:
+    """
+    Stream the clip through both consumers
+    
+    Args:
+        clip_path: Video file standing in for the camera
+        budget_ms: LiveEmotionAnalyzer latency budget
+        max_side: Longest frame side LiveEmotionAnalyzer starts analyzing at
+            (the full clip size, so only the budget lowers it)
+        detect_every: Face detection interval for both consumers
+    
+    Returns:
+        One result row per consumer
+    """
+    predictor = EmotionPredictor()
+    # Load weights outside the timed region
+    VideoEmotionPipeline(predictor).process(clip_path).__next__()
+    
+    baseline = _QueueAll(predictor, detect_every)
+    worker = threading.Thread(target=baseline.run)
+    worker.start()
+    played = play_video(clip_path, baseline)
+    baseline.frames.put(None)
+    worker.join()
+    rows = [dict(_summary(baseline.latencies, baseline.finished, played, len(baseline.latencies)),
+                 consumer="queue every frame")]
+    
+    # A window covering the whole clip makes stats() summarize every frame
+    analyzer = LiveEmotionAnalyzer(predictor, budget_ms, max_side=max_side, detect_every=detect_every,
+                                   window=10 ** 6).start()
+    played = play_video(clip_path, analyzer)
+    analyzer.stop()
+    stats = analyzer.stats()
+    rows.append({
+        "consumer": f"newest frame, {budget_ms:.0f} ms budget",
+        "processed": stats["processed"],
+        "dropped": played - stats["processed"],
+        "fps": stats["processed_fps"],
+        "p50_ms": stats["latency_p50_ms"],
+        "p95_ms": stats["latency_p95_ms"],
+        "side": stats["side"]
+    })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=240)
+    parser.add_argument("--height", type=int, default=720, help="Clip height; width is 16:9")
+    parser.add_argument("--budget-ms", type=float, default=200.0)
+    parser.add_argument("--detect-every", type=int, default=1)
+    args = parser.parse_args()
+    
+    size = (args.height, args.height * 16 // 9)
+    with tempfile.TemporaryDirectory() as tmp:
+        clip_path = write_synthetic_clip(os.path.join(tmp, "clip.avi"), args.frames, size)
+        rows = run_benchmark(clip_path, args.budget_ms, max(size), args.detect_every)
+    
+    print(f"{'consumer':<30} {'analyzed':>8} {'dropped':>8} {'fps':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in rows:
+        print(f"{row['consumer']:<30} {row['processed']:>8} {row['dropped']:>8} {row['fps']:>6.1f} "
+              f"{row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f}")
+    print(f"newest-frame analysis ended at {rows[-1]['side']}px")
+
+if __name__ == "__main__":
+    main()
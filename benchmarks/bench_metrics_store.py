@@ -0,0 +1,115 @@
+"""
+Metrics Store Query Benchmark
+
+Fills a temporary metrics store with synthetic hourly confusion matrices
+for several model versions, then times what the Model Performance page does
+on each render: summing the matrices in a time range, deriving metrics and
+the per-day trend. The page budget is well under a second for a year.
+
+Usage:
+    python -m benchmarks.bench_metrics_store --days 365 --versions 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+import numpy as np
+
+from src.evaluation import ConfusionMatrix
+from src.insights import DEFAULT_EMOTIONS
+from src.metrics_store import DAY_SECONDS, MetricsStore
+
+HOUR_SECONDS = 3600
+
+def populate(store: MetricsStore, days: int, versions: int, predictions_per_hour: int = 5000,
+             seed: int = 42) -> float:
+    """
+    Record one synthetic evaluation per hour
+    
+    Args:
+        store: Store to fill
+        days: Days of history per version
+        versions: Number of model versions
+        predictions_per_hour: Rows behind each hourly matrix
+        seed: Random seed
+    
+    Returns:
+        Seconds spent writing
+    """
+    rng = np.random.default_rng(seed)
+    classes = len(DEFAULT_EMOTIONS)
+    # Mostly-diagonal cell probabilities, i.e. a roughly 75% accurate model
+    probabilities = np.full((classes, classes), 0.25 / (classes * (classes - 1)))
+    np.fill_diagonal(probabilities, 0.75 / classes)
+    end = store.bucket_start(time.time())
+    hours = np.arange(end - days * DAY_SECONDS, end, HOUR_SECONDS)
+    
+    start = time.perf_counter()
+    for version in range(versions):
+        cells = rng.multinomial(predictions_per_hour, probabilities.ravel(), size=len(hours))
+        buckets = {}
+        for hour, counts in zip(hours.tolist(), cells):
+            confusion = ConfusionMatrix(DEFAULT_EMOTIONS)
+            confusion.matrix = counts.reshape(classes, classes)
+            buckets[hour] = confusion
+        store.record_buckets(buckets, f"v{version + 1}")
+    return time.perf_counter() - start
+
+def time_render(store: MetricsStore, model_version: str, days: int, repeat: int = 20) -> Dict:
+    # The data the page needs for one render of the chosen range
+    end = time.time()
+    start = end - days * DAY_SECONDS
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        confusion = store.query(model_version, start, end)
+        confusion.metrics()
+        store.trend(model_version, start, end, resolution_seconds=DAY_SECONDS)
+        timings.append(time.perf_counter() - began)
+    timings_ms = np.array(timings) * 1000
+    return {
+        "range_days": days,
+        "predictions": confusion.total,
+        "p50_ms": float(np.percentile(timings_ms, 50)),
+        "p95_ms": float(np.percentile(timings_ms, 95)),
+    }
+
+def run_benchmark(days: int, versions: int, ranges: List[int]) -> Dict:
+    """
+    Populate a temporary store and time range queries
+    
+    Args:
+        days: Days of hourly history per version
+        versions: Number of model versions
+        ranges: Query ranges in days
+    
+    Returns:
+        Write time, file size and one timing row per range
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        store = MetricsStore(os.path.join(directory, "evaluation.db"), bucket_seconds=HOUR_SECONDS)
+        write_seconds = populate(store, days, versions)
+        return {
+            "write_seconds": write_seconds,
+            "file_mb": os.path.getsize(store.path) / 1e6,
+            "queries": [time_render(store, "v1", days_in_range) for days_in_range in ranges],
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--versions", type=int, default=3)
+    parser.add_argument("--ranges", type=int, nargs="+", default=[7, 30, 365])
+    args = parser.parse_args()
+    
+    result = run_benchmark(args.days, args.versions, args.ranges)
+    print(f"Wrote {args.days} days x 24 hourly buckets x {args.versions} versions in "
+          f"{result['write_seconds']:.2f}s ({result['file_mb']:.1f} MB)")
+    print(f"{'range days':>10} {'predictions':>12} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in result["queries"]:
+        print(f"{row['range_days']:>10} {row['predictions']:>12} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+
+if __name__ == "__main__":
+    main()
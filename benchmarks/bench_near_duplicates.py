@@ -0,0 +1,169 @@
+"""
+Near-duplicate Index Benchmark
+
+Part one times Hamming radius lookups in the multi-index HammingIndex
+against a brute-force popcount scan at growing index sizes, checking that
+both return the same matches. Part two scores a stream of jittered
+near-duplicate frames (noise and brightness changes on a few distinct
+images) with and without a NearDuplicateIndex and reports the dedup rate,
+wall time, estimated time saved and agreement with the un-deduplicated
+predictions.
+
+Usage:
+    python -m benchmarks.bench_near_duplicates --sizes 10000 100000 1000000 --queries 1000
+    python -m benchmarks.bench_near_duplicates --frames 512 --unique 32 --skip-lookup
+"""
+
+import argparse
+import time
+from typing import Dict, List
+import numpy as np
+
+from benchmarks.synthetic import make_face_image
+from src.model_utils import EmotionPredictor
+from src.near_duplicates import HASH_BITS, HammingIndex, NearDuplicateIndex
+
+def make_queries(rng: np.random.Generator, codes: np.ndarray, count: int, max_distance: int) -> np.ndarray:
+    # Half are stored codes with up to max_distance flipped bits, half random
+    queries = rng.integers(0, 2 ** 64, size=count, dtype=np.uint64)
+    near = queries[:count // 2]
+    near[:] = codes[rng.integers(0, len(codes), size=len(near))]
+    for row in range(len(near)):
+        for bit in rng.choice(HASH_BITS, size=rng.integers(0, max_distance + 1), replace=False):
+            near[row] ^= np.uint64(1) << np.uint64(bit)
+    return queries
+
+def run_lookup_benchmark(sizes: List[int], queries: int, max_distance: int, seed: int = 42) -> List[Dict]:
+    """
+    Time multi-index and brute-force radius queries at several index sizes
+    
+    Args:
+        sizes: Number of stored hashes per run
+        queries: Queries per run
+        max_distance: Query radius
+        seed: Random seed
+    
+    Returns:
+        One result row per size
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for size in sizes:
+        codes = rng.integers(0, 2 ** 64, size=size, dtype=np.uint64)
+        index = HammingIndex(max_distance)
+        start = time.perf_counter()
+        index.add_many(codes)
+        build_seconds = time.perf_counter() - start
+        batch = make_queries(rng, codes, queries, max_distance)
+        
+        start = time.perf_counter()
+        fast = [index.query(int(code)) for code in batch]
+        fast_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        slow = [index.brute_force(int(code)) for code in batch]
+        slow_seconds = time.perf_counter() - start
+        
+        rows.append({
+            "size": size,
+            "build_seconds": build_seconds,
+            "index_us": fast_seconds / queries * 1e6,
+            "scan_us": slow_seconds / queries * 1e6,
+            "matches": sum(len(ids) for ids, _ in fast),
+            "identical": all(np.array_equal(a[0], b[0]) for a, b in zip(fast, slow))
+        })
+    return rows
+
+def make_stream(frames: int, unique: int, seed: int = 42) -> List[np.ndarray]:
+    """
+    Frames that repeat a few distinct images with sensor noise and exposure jitter
+    
+    Args:
+        frames: Stream length
+        unique: Distinct underlying images
+        seed: Random seed
+    
+    Returns:
+        uint8 BGR frames
+    """
+    rng = np.random.default_rng(seed)
+    originals = [make_face_image(rng, (240, 320)) for _ in range(unique)]
+    stream = []
+    for _ in range(frames):
+        base = originals[rng.integers(0, unique)].astype(np.int16)
+        jitter = rng.normal(0, 3, size=base.shape) + rng.uniform(-8, 8)
+        stream.append(np.clip(base + jitter, 0, 255).astype(np.uint8))
+    return stream
+
+def run_stream_benchmark(frames: int, unique: int, max_distance: int, batch_size: int,
+                         detector_backend: str) -> Dict:
+    """
+    Score a near-duplicate stream with and without the index
+    
+    Args:
+        frames: Stream length
+        unique: Distinct underlying images
+        max_distance: Dedup Hamming distance
+        batch_size: Images per batch_predict call
+        detector_backend: DeepFace detector backend
+    
+    Returns:
+        Timings, index stats and prediction agreement
+    """
+    stream = make_stream(frames, unique)
+    plain = EmotionPredictor(detector_backend=detector_backend)
+    dedup = NearDuplicateIndex(max_distance)
+    deduplicated = EmotionPredictor(detector_backend=detector_backend, dedup=dedup)
+    # Load weights outside the timed region
+    plain.batch_predict(make_stream(2, 2, seed=0))
+    
+    def score(predictor):
+        start = time.perf_counter()
+        results = []
+        for begin in range(0, len(stream), batch_size):
+            results.extend(predictor.batch_predict(stream[begin:begin + batch_size]))
+        return results, time.perf_counter() - start
+    
+    baseline, baseline_seconds = score(plain)
+    reused, dedup_seconds = score(deduplicated)
+    scored = [(a, b) for a, b in zip(baseline, reused) if a["success"] and b["success"]]
+    return {
+        "frames": frames,
+        "baseline_seconds": baseline_seconds,
+        "dedup_seconds": dedup_seconds,
+        "stats": dedup.stats(),
+        "agreement": np.mean([a["dominant_emotion"] == b["dominant_emotion"] for a, b in scored]) if scored else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--distance", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=512)
+    parser.add_argument("--unique", type=int, default=32, help="Distinct images behind the frame stream")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--detector", default="opencv")
+    parser.add_argument("--skip-lookup", action="store_true")
+    parser.add_argument("--skip-stream", action="store_true")
+    args = parser.parse_args()
+    
+    if not args.skip_lookup:
+        print(f"{'hashes':>9} {'build s':>8} {'index us':>9} {'scan us':>9} {'speedup':>8} {'matches':>8} identical")
+        for row in run_lookup_benchmark(args.sizes, args.queries, args.distance):
+            print(f"{row['size']:>9} {row['build_seconds']:>8.2f} {row['index_us']:>9.1f} {row['scan_us']:>9.1f} "
+                  f"{row['scan_us'] / row['index_us']:>7.1f}x {row['matches']:>8} {row['identical']}")
+    
+    if not args.skip_stream:
+        result = run_stream_benchmark(args.frames, args.unique, args.distance, args.batch_size, args.detector)
+        stats = result["stats"]
+        print(f"\n{result['frames']} frames of {args.unique} images: "
+              f"{result['baseline_seconds']:.2f}s plain, {result['dedup_seconds']:.2f}s with dedup "
+              f"({result['baseline_seconds'] / result['dedup_seconds']:.1f}x), "
+              f"{result['agreement']:.1%} same dominant emotion")
+        for mode, summary in stats["modes"].items():
+            print(f"  {mode:<9} {summary['hits']}/{summary['lookups']} reused ({summary['hit_rate']:.1%}), "
+                  f"~{summary['seconds_saved']:.2f}s saved")
+        print(f"  hashing {stats['hash_seconds']:.2f}s, net ~{stats['net_seconds_saved']:.2f}s saved")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Preprocessing Micro-benchmark
+
+Compares the per-image preprocess_image loop with preprocess_batch and a
+buffer-reusing BatchPreprocessor at 1k and 100k images. Large runs stream
+the same 1k-image source batch repeatedly so memory stays bounded.
+
+Usage:
+    python -m benchmarks.bench_preprocess --counts 1000 100000 --size 64 64
+"""
+
+import argparse
+import time
+from typing import Dict, List
+import numpy as np
+
+from src.model_utils import BatchPreprocessor, preprocess_batch, preprocess_image
+
+SOURCE_BATCH = 1000
+
+def run_benchmark(counts: List[int], size: List[int], seed: int = 42) -> List[Dict]:
+    """
+    Time each preprocessing strategy for each image count
+    
+    Args:
+        counts: Total numbers of images to preprocess
+        size: Source image (height, width)
+        seed: Random seed
+        
+    Returns:
+        One result row per strategy and count
+    """
+    rng = np.random.default_rng(seed)
+    source = rng.integers(0, 256, size=(SOURCE_BATCH, size[0], size[1], 3), dtype=np.uint8)
+    reusable = BatchPreprocessor()
+    
+    strategies = {
+        "preprocess_image loop": lambda batch: np.stack([preprocess_image(image) for image in batch]),
+        "preprocess_batch": preprocess_batch,
+        "BatchPreprocessor": reusable,
+    }
+    
+    rows = []
+    for count in counts:
+        for name, run in strategies.items():
+            start = time.perf_counter()
+            remaining = count
+            while remaining > 0:
+                run(source[:min(remaining, SOURCE_BATCH)])
+                remaining -= SOURCE_BATCH
+            elapsed = time.perf_counter() - start
+            rows.append({"strategy": name, "images": count, "seconds": elapsed,
+                         "images_per_second": count / elapsed})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--size", type=int, nargs=2, default=[64, 64], metavar=("HEIGHT", "WIDTH"))
+    args = parser.parse_args()
+    
+    print(f"{'strategy':<24} {'images':>8} {'seconds':>9} {'img/s':>11}")
+    for row in run_benchmark(args.counts, args.size):
+        print(f"{row['strategy']:<24} {row['images']:>8} {row['seconds']:>9.3f} "
+              f"{row['images_per_second']:>11.0f}")
+
+if __name__ == "__main__":
+    main()
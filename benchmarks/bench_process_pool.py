@@ -0,0 +1,70 @@
+"""
+Process Pool Scaling Benchmark
+
+Scores the same synthetic images with 1..N worker processes and reports
+throughput and speed-up over a single worker.
+
+Usage:
+    python -m benchmarks.bench_process_pool --images 512 --max-workers 8
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, List
+
+from benchmarks.synthetic import make_face_images
+from src.parallel import ProcessPoolPredictor
+
+def run_benchmark(num_images: int, worker_counts: List[int], tf_threads: int,
+                  chunk_size: int, detector_backend: str) -> List[Dict]:
+    """
+    Measure throughput for each worker count
+    
+    Args:
+        num_images: Number of synthetic images to score
+        worker_counts: Pool sizes to compare
+        tf_threads: TensorFlow intra-op threads per worker
+        chunk_size: Images per shared-memory chunk
+        detector_backend: DeepFace detector backend
+        
+    Returns:
+        One result row per worker count
+    """
+    images = make_face_images(num_images)
+    rows = []
+    
+    for num_workers in worker_counts:
+        with ProcessPoolPredictor(num_workers=num_workers, tf_threads=tf_threads,
+                                  chunk_size=chunk_size,
+                                  detector_backend=detector_backend) as predictor:
+            predictor.warm_up()
+            start = time.perf_counter()
+            predictor.batch_predict(images)
+            elapsed = time.perf_counter() - start
+        rows.append({"workers": num_workers, "seconds": elapsed,
+                     "images_per_second": num_images / elapsed})
+    
+    baseline = rows[0]["images_per_second"]
+    for row in rows:
+        row["speedup"] = row["images_per_second"] / baseline
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=512)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tf-threads", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--detector", default="opencv")
+    args = parser.parse_args()
+    
+    worker_counts = list(range(1, args.max_workers + 1))
+    print(f"{'workers':>7} {'seconds':>9} {'img/s':>9} {'speedup':>8}")
+    for row in run_benchmark(args.images, worker_counts, args.tf_threads,
+                             args.chunk_size, args.detector):
+        print(f"{row['workers']:>7} {row['seconds']:>9.2f} {row['images_per_second']:>9.1f} "
+              f"{row['speedup']:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Streamlit Rerun Latency Benchmark
+
+Runs the Data Analysis and Model Performance pages headless with
+Streamlit's AppTest, once to populate the session and then repeatedly, as
+happens on every widget interaction, and reports the first-run and median
+rerun latency. Model Performance reads a temporary metrics store filled
+with 90 days of synthetic hourly results. Each page is measured with the
+session caches disabled (EMOTION_UI_CACHE_MB=0) and enabled.
+
+Usage:
+    python -m benchmarks.bench_reruns --reruns 10
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+PAGES = {
+    "Data Analysis": "from app_pages.data_analysis import show_data_analysis\nshow_data_analysis()",
+    "Model Performance": "from app_pages.model_performance import show_model_performance\nshow_model_performance()",
+}
+
+def time_page(script: str, reruns: int, cache_mb: Optional[str]) -> Dict:
+    """
+    Time the first run and later reruns of one page in a fresh session
+    
+    Args:
+        script: Page script source
+        reruns: Reruns after the first run
+        cache_mb: EMOTION_UI_CACHE_MB for this session ("0" disables
+            caching, None keeps the page defaults)
+    
+    Returns:
+        first_ms and median/p95 rerun_ms
+    """
+    from streamlit.testing.v1 import AppTest
+    
+    if cache_mb is None:
+        os.environ.pop("EMOTION_UI_CACHE_MB", None)
+    else:
+        os.environ["EMOTION_UI_CACHE_MB"] = cache_mb
+    app = AppTest.from_string(script, default_timeout=120)
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    timings_ms = np.array(timings) * 1000
+    return {
+        "first_ms": first * 1000,
+        "rerun_ms": float(np.median(timings_ms)),
+        "rerun_p95_ms": float(np.percentile(timings_ms, 95)),
+    }
+
+def run_benchmark(reruns: int) -> List[Dict]:
+    """
+    Measure every page with caching off and on
+    
+    Args:
+        reruns: Reruns per session
+    
+    Returns:
+        One row per page and cache setting
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        # Must be set before the page module reads DEFAULT_STORE_PATH
+        os.environ["EMOTION_METRICS_STORE"] = os.path.join(directory, "evaluation.db")
+        from benchmarks.bench_metrics_store import populate
+        from src.metrics_store import MetricsStore
+        populate(MetricsStore(os.environ["EMOTION_METRICS_STORE"]), days=90, versions=1)
+        
+        rows = []
+        for page, script in PAGES.items():
+            # Warm imports and module-level caches outside the measured sessions
+            time_page(script, 1, "0")
+            for label, cache_mb in (("off", "0"), ("on", None)):
+                result = time_page(script, reruns, cache_mb)
+                rows.append(dict(result, page=page, cache=label))
+        return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+    
+    print(f"{'page':<20} {'cache':>6} {'first ms':>9} {'rerun ms':>9} {'p95 ms':>8}")
+    for row in run_benchmark(args.reruns):
+        print(f"{row['page']:<20} {row['cache']:>6} {row['first_ms']:>9.0f} {row['rerun_ms']:>9.0f} "
+              f"{row['rerun_p95_ms']:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Cold-start Import Benchmark
+
+Measures what each Streamlit page costs to import in a fresh interpreter,
+on top of Streamlit itself: wall time, peak RSS, whether TensorFlow got
+pulled in, and the slowest modules according to ``python -X importtime``.
+Run it before and after touching top-level imports.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --modules app app_pages.data_analysis --repeat 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+PAGES = [
+    "app",
+    "app_pages.project_summary",
+    "app_pages.emotion_detection",
+    "app_pages.emotion_detection_demo",
+    "app_pages.data_analysis",
+    "app_pages.model_performance",
+]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports streamlit first so page timings exclude it, then reports as JSON
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+try:
+    import streamlit
+except ImportError:
+    pass
+baseline = time.perf_counter() - start
+start = time.perf_counter()
+error = None
+try:
+    __import__({module!r})
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+print(json.dumps({{
+    "streamlit_seconds": baseline,
+    "import_seconds": time.perf_counter() - start,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "tensorflow_loaded": "tensorflow" in sys.modules,
+    "error": error,
+}}))
+"""
+
+def _slowest_packages(importtime_log: str) -> Dict[str, float]:
+    # Lines look like "import time:   self_us | cumulative_us | <2 spaces per level>name".
+    # A package's cost is its largest cumulative time at any depth, i.e.
+    # the import that first pulled it in.
+    packages = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0.0), int(cumulative_us) / 1000)
+    return packages
+
+def measure_module(module: str, repeat: int = 3, top: int = 5) -> Dict:
+    """
+    Import one module in fresh interpreters and report its cost
+    
+    Args:
+        module: Dotted module name, importable from the repository root
+        repeat: Fresh interpreters to average over
+        top: Number of slowest imports to list
+    
+    Returns:
+        Median import time, peak RSS, TensorFlow flag and slowest packages
+    """
+    env = dict(os.environ, STREAMLIT_GLOBAL_SHOW_WARNING_ON_DIRECT_EXECUTION="false")
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-c", PROBE.format(module=module)],
+                                   cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    
+    # Modules Streamlit and interpreter start-up load anyway are left out
+    preamble = "import importlib.util; importlib.util.find_spec('streamlit') and __import__('streamlit')"
+    baseline = subprocess.run([sys.executable, "-X", "importtime", "-c", preamble],
+                              cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    traced = subprocess.run([sys.executable, "-X", "importtime", "-c", f"{preamble}; import {module}"],
+                            cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    already_loaded = _slowest_packages(baseline.stderr)
+    packages = {name: ms for name, ms in _slowest_packages(traced.stderr).items()
+                if name not in already_loaded and name != module.split(".")[0]}
+    slowest = [{"package": name, "cumulative_ms": ms}
+               for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]]
+    
+    runs.sort(key=lambda run: run["import_seconds"])
+    median = runs[len(runs) // 2]
+    return dict(median, module=module, slowest=slowest)
+
+def run_benchmark(modules: List[str], repeat: int = 3, top: int = 5) -> List[Dict]:
+    """
+    Measure import cost for each page
+    
+    Args:
+        modules: Dotted module names
+        repeat: Fresh interpreters per module
+        top: Number of slowest imports to list per module
+    
+    Returns:
+        One result row per module
+    """
+    return [measure_module(module, repeat, top) for module in modules]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=PAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+    
+    rows = run_benchmark(args.modules, args.repeat, args.top)
+    print(f"{'module':<34} {'import s':>9} {'RSS MB':>8} {'TF':>4}  slowest packages")
+    for row in rows:
+        slowest = ", ".join(f"{entry['package']} {entry['cumulative_ms']:.0f}ms" for entry in row["slowest"][:3])
+        print(f"{row['module']:<34} {row['import_seconds']:>9.3f} {row['peak_rss_mb']:>8.0f} "
+              f"{'yes' if row['tensorflow_loaded'] else 'no':>4}  {row['error'] or slowest}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Video Pipeline Throughput Benchmark
+
+Runs VideoEmotionPipeline over a generated synthetic clip and reports
+processed frames per second for several detection intervals, to check
+real-time throughput on CPU-only machines.
+
+Usage:
+    python -m benchmarks.bench_video_pipeline --frames 300 --detect-every 1 5 15
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import cv2
+
+from benchmarks.synthetic import write_synthetic_clip
+from src.model_utils import EmotionPredictor
+from src.video_pipeline import VideoEmotionPipeline
+
+def run_benchmark(clip_path: str, detect_intervals: List[int], frame_step: int,
+                  detector_backend: str) -> List[Dict]:
+    """
+    Measure pipeline throughput for each detection interval
+    
+    Args:
+        clip_path: Video file to process
+        detect_intervals: Values of detect_every to compare
+        frame_step: Keep every n-th frame
+        detector_backend: DeepFace detector backend
+        
+    Returns:
+        One result row per detection interval
+    """
+    predictor = EmotionPredictor(detector_backend=detector_backend)
+    # Load weights outside the timed region
+    predictor.predict_faces(_first_frame(clip_path))
+    
+    rows = []
+    for detect_every in detect_intervals:
+        pipeline = VideoEmotionPipeline(predictor, frame_step=frame_step, detect_every=detect_every)
+        start = time.perf_counter()
+        frames = sum(1 for _ in pipeline.process(clip_path))
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "detect_every": detect_every,
+            "frames": frames,
+            "detections": pipeline.stats["detections"],
+            "frames_per_second": frames / elapsed
+        })
+    return rows
+
+def _first_frame(clip_path: str):
+    capture = cv2.VideoCapture(clip_path)
+    _, frame = capture.read()
+    capture.release()
+    return frame
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--frame-step", type=int, default=1)
+    parser.add_argument("--detect-every", type=int, nargs="+", default=[1, 5, 15])
+    parser.add_argument("--detector", default="opencv")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        clip_path = write_synthetic_clip(os.path.join(tmp, "clip.avi"), args.frames)
+        print(f"{'detect_every':>12} {'frames':>7} {'detections':>10} {'fps':>8}")
+        for row in run_benchmark(clip_path, args.detect_every, args.frame_step, args.detector):
+            print(f"{row['detect_every']:>12} {row['frames']:>7} {row['detections']:>10} "
+                  f"{row['frames_per_second']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
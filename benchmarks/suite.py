@@ -0,0 +1,243 @@
+"""
+Hot-path Benchmark Suite
+
+Times predict_emotion, batch_predict, preprocess_image,
+get_emotion_insights and ModelEvaluator.calculate_metrics on seeded
+synthetic inputs, fully offline. Each case runs in a fresh spawned process
+so its peak RSS is its own. Results are written as JSON and can be
+compared against a stored baseline; the exit status is non-zero when any
+case regresses by more than the threshold.
+
+Usage:
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --baseline baseline.json --threshold 0.15
+    python -m benchmarks.suite --cases preprocess_image get_emotion_insights --save-baseline baseline.json
+"""
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+from importlib import metadata
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+from benchmarks.synthetic import make_face_images
+
+SEED = 42
+EMOTIONS = ['happy', 'sad', 'angry', 'surprise', 'fear', 'disgust', 'neutral']
+
+def _synthetic_predictions(count: int, rng: np.random.Generator) -> List[Dict]:
+    predictions = []
+    for scores in rng.dirichlet(np.ones(len(EMOTIONS)), size=count) * 100:
+        emotions = dict(zip(EMOTIONS, scores.tolist()))
+        dominant = max(emotions, key=emotions.get)
+        predictions.append({"emotions": emotions, "dominant_emotion": dominant,
+                            "confidence": emotions[dominant], "success": True})
+    return predictions
+
+def _setup_predict_emotion() -> Tuple[Callable, int]:
+    from src.model_utils import EmotionPredictor
+    images = make_face_images(16, seed=SEED)
+    predictor = EmotionPredictor()
+    state = {"index": 0}
+    
+    def run():
+        predictor.predict_emotion(images[state["index"] % len(images)])
+        state["index"] += 1
+    return run, 1
+
+def _setup_batch_predict() -> Tuple[Callable, int]:
+    from src.model_utils import EmotionPredictor
+    images = make_face_images(32, seed=SEED)
+    predictor = EmotionPredictor()
+    return lambda: predictor.batch_predict(images), len(images)
+
+def _setup_preprocess_image() -> Tuple[Callable, int]:
+    from src.model_utils import preprocess_image
+    image = make_face_images(1, seed=SEED)[0]
+    return lambda: preprocess_image(image), 1
+
+def _setup_get_emotion_insights() -> Tuple[Callable, int]:
+    from src.model_utils import EmotionPredictor
+    predictions = _synthetic_predictions(10000, np.random.default_rng(SEED))
+    predictor = EmotionPredictor()
+    return lambda: predictor.get_emotion_insights(predictions), len(predictions)
+
+def _setup_calculate_metrics() -> Tuple[Callable, int]:
+    from src.model_utils import ModelEvaluator
+    rng = np.random.default_rng(SEED)
+    y_true = rng.choice(EMOTIONS, size=10000).tolist()
+    # Roughly 70% accurate predictions
+    y_pred = [label if keep else str(rng.choice(EMOTIONS))
+              for label, keep in zip(y_true, rng.random(len(y_true)) < 0.7)]
+    evaluator = ModelEvaluator()
+    return lambda: evaluator.calculate_metrics(y_true, y_pred), len(y_true)
+
+# name -> (setup, default iterations); setup returns (run, items per call)
+CASES = {
+    "predict_emotion": (_setup_predict_emotion, 50),
+    "batch_predict": (_setup_batch_predict, 10),
+    "preprocess_image": (_setup_preprocess_image, 2000),
+    "get_emotion_insights": (_setup_get_emotion_insights, 20),
+    "calculate_metrics": (_setup_calculate_metrics, 20),
+}
+
+def _run_case(name: str, iterations: int, warmup: int) -> Dict:
+    setup, _ = CASES[name]
+    run, items = setup()
+    for _ in range(warmup):
+        run()
+    
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        run()
+        timings[i] = time.perf_counter() - start
+    
+    timings_ms = timings * 1000
+    return {
+        "case": name,
+        "iterations": iterations,
+        "items_per_call": items,
+        "p50_ms": float(np.percentile(timings_ms, 50)),
+        "p95_ms": float(np.percentile(timings_ms, 95)),
+        "p99_ms": float(np.percentile(timings_ms, 99)),
+        "mean_ms": float(timings_ms.mean()),
+        "items_per_second": items * iterations / float(timings.sum()),
+        # ru_maxrss is kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+def environment() -> Dict:
+    """
+    Describe the machine and library versions behind a result set
+    
+    Returns:
+        Environment metadata
+    """
+    versions = {}
+    for package in ("numpy", "opencv-python-headless", "deepface", "tensorflow", "scikit-learn"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "processor": platform.processor(), "packages": versions}
+
+def run_suite(cases: List[str], iterations: Optional[int] = None, warmup: int = 3) -> Dict:
+    """
+    Run benchmark cases, each in its own process
+    
+    Args:
+        cases: Case names from CASES
+        iterations: Timed calls per case (defaults per case when omitted)
+        warmup: Untimed calls before timing starts
+    
+    Returns:
+        Results keyed by case, with environment metadata; a case that
+        crashed is recorded as {"error": message}
+    """
+    results = {}
+    context = get_context("spawn")
+    for name in cases:
+        with context.Pool(1) as pool:
+            try:
+                results[name] = pool.apply(_run_case, (name, iterations or CASES[name][1], warmup))
+            except Exception as e:
+                print(f"Case {name} failed: {e}", file=sys.stderr)
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(),
+            "results": results}
+
+def compare_to_baseline(current: Dict, baseline: Dict, threshold: float = 0.10,
+                        cases: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Compare a result set against a baseline
+    
+    A case regresses when its p50 or p95 latency grows, or its throughput
+    drops, by more than the threshold fraction. A baseline case that failed
+    or is missing from the current run also counts as regressed.
+    
+    Args:
+        current: Result set from run_suite
+        baseline: Stored result set
+        threshold: Allowed relative slowdown (0.10 = 10%)
+        cases: Cases that were run; baseline cases left out on purpose are
+            not reported missing (all baseline cases when omitted)
+    
+    Returns:
+        One comparison row per baseline case that was expected to run
+    """
+    rows = []
+    for name, reference in baseline.get("results", {}).items():
+        if "error" in reference:
+            continue
+        result = current["results"].get(name)
+        if result is None:
+            # Cases removed from CASES are missing even when not selected
+            if cases is not None and name not in cases and name in CASES:
+                continue
+            rows.append({"case": name, "changes": {}, "regressed": True, "error": "missing from this run"})
+            continue
+        if "error" in result:
+            rows.append({"case": name, "changes": {}, "regressed": True, "error": result["error"]})
+            continue
+        changes = {
+            "p50_ms": result["p50_ms"] / reference["p50_ms"] - 1,
+            "p95_ms": result["p95_ms"] / reference["p95_ms"] - 1,
+            "items_per_second": reference["items_per_second"] / result["items_per_second"] - 1,
+        }
+        rows.append({"case": name, "changes": changes,
+                     "regressed": any(change > threshold for change in changes.values())})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--iterations", type=int, default=None, help="Override per-case iteration counts")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown")
+    parser.add_argument("--save-baseline", default=None, help="Also write the results as a new baseline")
+    args = parser.parse_args()
+    
+    report = run_suite(args.cases, args.iterations, args.warmup)
+    
+    print(f"{'case':<22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'items/s':>11} {'RSS MB':>8}")
+    for name, row in report["results"].items():
+        if "error" in row:
+            print(f"{name:<22} FAILED {row['error']}")
+            continue
+        print(f"{name:<22} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f} "
+              f"{row['items_per_second']:>11.1f} {row['peak_rss_mb']:>8.0f}")
+    
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        comparison = compare_to_baseline(report, baseline, args.threshold, args.cases)
+        report["comparison"] = comparison
+        print(f"\nAgainst {args.baseline} (threshold {args.threshold:.0%}):")
+        for row in comparison:
+            changes = ", ".join(f"{key} {value:+.1%}" for key, value in row["changes"].items())
+            if "error" in row:
+                changes = row["error"]
+            print(f"  {row['case']:<22} {'REGRESSED' if row['regressed'] else 'ok':<10} {changes}")
+        if any(row["regressed"] for row in comparison):
+            sys.exit(1)
+    
+    # A crashing case fails the run even without a baseline
+    if any("error" in row for row in report["results"].values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
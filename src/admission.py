@@ -0,0 +1,251 @@
+"""
+Admission Control for Emotion Recognition System
+
+This module puts a shared predictor behind a bounded FIFO queue with a
+concurrency limit, for processes where many threads (e.g. Streamlit
+sessions) call the model directly. At most max_concurrency calls run at
+once, so TensorFlow threads do not oversubscribe the CPU and memory stays
+bounded. When the queue is full, or the estimated wait exceeds the limit,
+requests are rejected straight away with the wait estimate instead of
+piling up. The estimate comes from a moving average of the service time
+per image.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .metrics import Counter, Gauge, Histogram
+
+class Overloaded(RuntimeError):
+    """
+    Raised when a request is not admitted; retry_after estimates the wait
+    """
+    
+    def __init__(self, reason: str, queue_depth: int, retry_after: float):
+        super().__init__(f"Inference is overloaded ({reason}): {queue_depth} requests queued, "
+                         f"estimated wait {retry_after:.1f}s")
+        self.reason = reason
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+class AdmissionSlot:
+    """
+    A held concurrency slot; set model_units to the images the model
+    actually scored (0 when the call was served from a cache)
+    """
+    
+    def __init__(self, units: int):
+        self.units = units
+        self.model_units = units
+
+class AdmissionController:
+    """
+    Bounded FIFO queue in front of a concurrency limit
+    """
+    
+    # Weight of the newest service time in the moving average
+    SMOOTHING = 0.2
+    
+    def __init__(self, max_concurrency: int = 1, max_queue: int = 8,
+                 max_wait_seconds: Optional[float] = 30.0, seconds_per_image: float = 0.5,
+                 prefix: str = "emotion"):
+        """
+        Args:
+            max_concurrency: Requests allowed to run at once
+            max_queue: Requests allowed to wait; more are rejected
+            max_wait_seconds: Reject when the estimated wait is longer, and
+                give up on waiters after this long (None waits indefinitely)
+            seconds_per_image: Service time assumed until requests have been timed
+            prefix: Metric name prefix
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.prefix = prefix
+        self._condition = threading.Condition()
+        self._running = 0
+        self._running_units = 0
+        # Waiting requests in arrival order, each a one-item list of units
+        self._waiting: deque = deque()
+        self._unit_seconds = seconds_per_image
+        self._timed = False
+        
+        self.outcomes = Counter(f"{prefix}_admission_total", "Inference requests by admission outcome",
+                                label="outcome")
+        self.queue_wait = Histogram(f"{prefix}_admission_wait_seconds", "Time admitted requests waited")
+        self.service_time = Histogram(f"{prefix}_admission_service_seconds", "Time admitted requests ran")
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiting)
+    
+    @property
+    def in_flight(self) -> int:
+        return self._running
+    
+    def estimated_wait(self) -> float:
+        """
+        Seconds a new request would wait before starting
+        
+        Returns:
+            Estimate from queued and running work
+        """
+        with self._condition:
+            return self._estimate()
+    
+    def _estimate(self) -> float:
+        if self._running < self.max_concurrency and not self._waiting:
+            return 0.0
+        queued_units = self._running_units + sum(ticket[0] for ticket in self._waiting)
+        return queued_units * self._unit_seconds / self.max_concurrency
+    
+    @contextmanager
+    def admit(self, units: int = 1):
+        """
+        Hold a concurrency slot for the duration of the block
+        
+        Only calls that report model work update the seconds-per-image
+        estimate, so cache hits finishing in microseconds do not drag it down.
+        
+        Args:
+            units: Images the request scores, to weight the wait estimate
+        
+        Yields:
+            AdmissionSlot whose model_units the caller may lower
+        
+        Raises:
+            Overloaded: If the queue is full, the estimated wait is above
+                max_wait_seconds or the request waited that long
+        """
+        slot = AdmissionSlot(max(units, 1))
+        enqueued = time.perf_counter()
+        self._enter(slot.units)
+        started = time.perf_counter()
+        self.queue_wait.observe(started - enqueued)
+        try:
+            yield slot
+        finally:
+            self._exit(slot, time.perf_counter() - started)
+    
+    def _reject(self, outcome: str, reason: str, estimate: float):
+        self.outcomes.inc(label_value=outcome)
+        raise Overloaded(reason, len(self._waiting), estimate)
+    
+    def _enter(self, units: int):
+        with self._condition:
+            if self._running < self.max_concurrency and not self._waiting:
+                self._start(units)
+                return
+            
+            estimate = self._estimate()
+            if len(self._waiting) >= self.max_queue:
+                self._reject("rejected_queue_full", "queue full", estimate)
+            if self.max_wait_seconds is not None and estimate > self.max_wait_seconds:
+                self._reject("rejected_wait", "estimated wait too long", estimate)
+            
+            ticket = [units]
+            self._waiting.append(ticket)
+            deadline = None if self.max_wait_seconds is None else time.monotonic() + self.max_wait_seconds
+            while self._waiting[0] is not ticket or self._running >= self.max_concurrency:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self._condition.notify_all()
+                    self._reject("timed_out", "timed out waiting", self._estimate())
+                self._condition.wait(remaining)
+            self._waiting.popleft()
+            self._start(units)
+            # The next waiter may fit as well when the limit is above one
+            self._condition.notify_all()
+    
+    def _start(self, units: int):
+        self._running += 1
+        self._running_units += units
+        self.outcomes.inc(label_value="admitted")
+    
+    def _exit(self, slot: AdmissionSlot, seconds: float):
+        self.service_time.observe(seconds)
+        with self._condition:
+            self._running -= 1
+            self._running_units -= slot.units
+            if slot.model_units > 0:
+                sample = seconds / slot.model_units
+                if not self._timed:
+                    self._unit_seconds = sample
+                    self._timed = True
+                else:
+                    self._unit_seconds += self.SMOOTHING * (sample - self._unit_seconds)
+            self._condition.notify_all()
+    
+    def stats(self) -> Dict:
+        """
+        Current load and admission history
+        
+        Returns:
+            Limits, in-flight and queued requests, the wait estimate,
+            outcomes and queue wait / service time summaries
+        """
+        with self._condition:
+            in_flight, queue_depth, estimate = self._running, len(self._waiting), self._estimate()
+            unit_seconds = self._unit_seconds
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queue_depth": queue_depth,
+            "estimated_wait_seconds": estimate,
+            "seconds_per_image": unit_seconds,
+            "outcomes": self.outcomes.values(),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "service_seconds": self.service_time.snapshot()
+        }
+    
+    def metrics(self) -> List:
+        return [
+            self.outcomes,
+            Gauge(f"{self.prefix}_admission_queue_depth", "Requests waiting for a slot", lambda: self.queue_depth),
+            Gauge(f"{self.prefix}_admission_in_flight", "Requests running", lambda: self.in_flight),
+            self.queue_wait,
+            self.service_time,
+        ]
+
+class AdmittedPredictor:
+    """
+    Predictor wrapper that routes every call through an AdmissionController
+    
+    Other attributes (cache, metrics, ...) are those of the wrapped predictor.
+    """
+    
+    def __init__(self, predictor, controller: AdmissionController):
+        self.predictor = predictor
+        self.admission = controller
+    
+    def predict_emotion(self, image):
+        return self._call(1, self.predictor.predict_emotion, image)
+    
+    def batch_predict(self, images, batch_size: Optional[int] = None):
+        return self._call(len(images), self.predictor.batch_predict, images, batch_size)
+    
+    def predict_faces(self, image):
+        return self._call(1, self.predictor.predict_faces, image)
+    
+    def batch_predict_faces(self, images):
+        return self._call(len(images), self.predictor.batch_predict_faces, images)
+    
+    def _call(self, units: int, method, *args):
+        # Predictors that count their model work tell cache hits apart
+        model_images = getattr(self.predictor, "model_images", None)
+        with self.admission.admit(units) as slot:
+            before = model_images() if model_images else 0
+            result = method(*args)
+            if model_images:
+                slot.model_units = model_images() - before
+        return result
+    
+    def __getattr__(self, name):
+        return getattr(self.predictor, name)
@@ -0,0 +1,374 @@
+"""
+Inference Backends for Emotion Recognition System
+
+This module abstracts the emotion classifier behind a small backend
+interface. Besides the original Keras model loaded through DeepFace, the
+model can be exported to ONNX and TFLite (each with an int8-quantized
+variant) and run on onnxruntime or the standalone TFLite interpreter,
+neither of which imports TensorFlow.
+
+Usage:
+    python -m src.backends export --output-dir models/ [--calibration-dir data/heldout]
+    python -m src.backends parity --model-dir models/ --data-dir data/heldout
+"""
+
+import argparse
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import cv2
+
+# Backend name -> exported file inside the model directory
+BACKEND_FILES = {
+    "onnx": "emotion.onnx",
+    "onnx-int8": "emotion.int8.onnx",
+    "tflite": "emotion.tflite",
+    "tflite-int8": "emotion.int8.tflite",
+}
+BACKENDS = ["keras"] + list(BACKEND_FILES)
+DEFAULT_MODEL_DIR = os.environ.get("EMOTION_MODEL_DIR", "models")
+INPUT_SHAPE = (48, 48, 1)
+
+class EmotionBackend:
+    """
+    Runs the emotion classifier on preprocessed (N, 48, 48, 1) batches
+    """
+    
+    name = "base"
+    requires_tensorflow = False
+    
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            batch: float32 faces of shape (N, 48, 48, 1) in [0, 1]
+            
+        Returns:
+            Softmax probabilities of shape (N, 7)
+        """
+        raise NotImplementedError
+
+class KerasBackend(EmotionBackend):
+    """
+    The original DeepFace Keras model, shared through the model registry
+    """
+    
+    name = "keras"
+    requires_tensorflow = True
+    
+    def __init__(self, model_name: str = "emotion"):
+        from .model_registry import get_model_registry
+        self.model = get_model_registry().get(model_name).model
+    
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict_on_batch(batch)).reshape(len(batch), -1)
+
+class OnnxBackend(EmotionBackend):
+    """
+    onnxruntime inference session on CPU
+    """
+    
+    def __init__(self, path: str, num_threads: int = 0, name: str = "onnx"):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("onnxruntime is required for the ONNX backends: pip install onnxruntime")
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.name = name
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+    
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch.astype(np.float32, copy=False)})[0]
+
+class TFLiteBackend(EmotionBackend):
+    """
+    TFLite interpreter, quantizing inputs and outputs for int8 models
+    """
+    
+    def __init__(self, path: str, num_threads: Optional[int] = None, name: str = "tflite"):
+        Interpreter = load_tflite_interpreter()
+        self.name = name
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+    
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        if self._batch_size != len(batch):
+            self.interpreter.resize_tensor_input(self.input["index"], batch.shape)
+            self.interpreter.allocate_tensors()
+            self._batch_size = len(batch)
+        
+        scale, zero_point = self.input["quantization"]
+        if self.input["dtype"] != np.float32:
+            info = np.iinfo(self.input["dtype"])
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+        self.interpreter.set_tensor(self.input["index"], batch.astype(self.input["dtype"]))
+        self.interpreter.invoke()
+        
+        output = self.interpreter.get_tensor(self.output["index"])
+        if self.output["dtype"] != np.float32:
+            scale, zero_point = self.output["quantization"]
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+def load_tflite_interpreter():
+    """
+    Find a TFLite interpreter, preferring runtimes that do not load TensorFlow
+    
+    Returns:
+        Interpreter class
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    # Last resort: works everywhere TensorFlow is installed, but imports it
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+def load_backend(name: str = "keras", model_dir: Optional[str] = None,
+                 model_name: str = "emotion", num_threads: Optional[int] = None) -> EmotionBackend:
+    """
+    Create a backend by name
+    
+    Args:
+        name: One of BACKENDS
+        model_dir: Directory with exported models (defaults to EMOTION_MODEL_DIR or models/)
+        model_name: Registry model name for the keras backend
+        num_threads: Intra-op threads for ONNX/TFLite backends
+        
+    Returns:
+        Ready-to-use backend
+    """
+    if name == "keras":
+        return KerasBackend(model_name)
+    if name not in BACKEND_FILES:
+        raise ValueError(f"Unknown backend '{name}'. Options: {', '.join(BACKENDS)}")
+    
+    path = os.path.join(model_dir or DEFAULT_MODEL_DIR, BACKEND_FILES[name])
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Exported model not found: {path}. Run: python -m src.backends export")
+    if name.startswith("onnx"):
+        return OnnxBackend(path, num_threads or 0, name)
+    return TFLiteBackend(path, num_threads, name)
+
+class OpenCVFaceDetector:
+    """
+    Haar cascade face detector that returns DeepFace.extract_faces-style
+    results without importing DeepFace or TensorFlow (no eye alignment)
+    """
+    
+    def __init__(self, scale_factor: float = 1.1, min_neighbors: int = 10):
+        path = os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        self.cascade = cv2.CascadeClassifier(path)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+    
+    def extract_faces(self, image: np.ndarray) -> List[Dict]:
+        """
+        Detect and crop faces, falling back to the whole image like DeepFace
+        
+        Args:
+            image: Input image (H, W, 3)
+            
+        Returns:
+            Face objects with uint8 crops in the input channel order
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        boxes, _, scores = self.cascade.detectMultiScale3(
+            gray, self.scale_factor, self.min_neighbors, outputRejectLevels=True
+        )
+        
+        faces = []
+        for (x, y, w, h), score in zip(boxes, scores):
+            faces.append({
+                "face": image[y:y + h, x:x + w],
+                "facial_area": {"x": int(x), "y": int(y), "w": int(w), "h": int(h)},
+                "confidence": float(score)
+            })
+        
+        if not faces:
+            height, width = image.shape[:2]
+            faces.append({
+                "face": image,
+                "facial_area": {"x": 0, "y": 0, "w": width, "h": height},
+                "confidence": 0.0
+            })
+        return faces
+
+def load_labeled_faces(data_dir: str, limit: Optional[int] = None) -> Tuple[np.ndarray, List[str]]:
+    """
+    Load a held-out set laid out as <data_dir>/<emotion>/<image>, or face shards
+    
+    Args:
+        data_dir: Directory with one subdirectory per emotion label, or a
+            directory written by face_shards (read without decoding)
+        limit: Maximum images per label
+        
+    Returns:
+        Model-ready (N, 48, 48, 1) batch and the label of each image
+    """
+    from .face_shards import INDEX_NAME, FaceShardDataset, to_model_input
+    from .model_utils import preprocess_batch
+    
+    if os.path.exists(os.path.join(data_dir, INDEX_NAME)):
+        dataset = FaceShardDataset(data_dir)
+        codes = dataset.labels
+        rows = np.arange(len(dataset))
+        if limit is not None:
+            rows = np.sort(np.concatenate([np.flatnonzero(codes == code)[:limit]
+                                           for code in range(len(dataset.label_names))]))
+        faces, codes = dataset.take(rows)
+        if not len(faces):
+            raise ValueError(f"No labeled images found in {data_dir}")
+        return to_model_input(faces), [dataset.label_names[code] for code in codes]
+    
+    images, labels = [], []
+    for label in sorted(os.listdir(data_dir)):
+        label_dir = os.path.join(data_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir))[:limit]:
+            image = cv2.imread(os.path.join(label_dir, name), cv2.IMREAD_GRAYSCALE)
+            if image is not None:
+                images.append(image)
+                labels.append(label)
+    
+    if not images:
+        raise ValueError(f"No labeled images found in {data_dir}")
+    return preprocess_batch(images)[..., np.newaxis], labels
+
+def check_parity(candidate: EmotionBackend, reference: EmotionBackend, batch: np.ndarray,
+                 labels: Optional[List[str]] = None, batch_size: int = 64) -> Dict:
+    """
+    Compare a backend against the reference model on a held-out batch
+    
+    Args:
+        candidate: Backend under test
+        reference: Reference backend (normally keras)
+        batch: (N, 48, 48, 1) faces
+        labels: Optional ground-truth emotion labels
+        batch_size: Faces per forward pass
+        
+    Returns:
+        Top-1 agreement, probability error and, with labels, both accuracies
+    """
+    from .model_utils import MODEL_EMOTION_LABELS
+    
+    def run(backend):
+        return np.concatenate([backend.predict(batch[i:i + batch_size])
+                               for i in range(0, len(batch), batch_size)])
+    
+    expected, actual = run(reference), run(candidate)
+    report = {
+        "backend": candidate.name,
+        "samples": len(batch),
+        "top1_agreement": float(np.mean(expected.argmax(1) == actual.argmax(1))),
+        "max_abs_prob_diff": float(np.max(np.abs(expected - actual))),
+        "mean_abs_prob_diff": float(np.mean(np.abs(expected - actual)))
+    }
+    if labels is not None:
+        truth = np.array([MODEL_EMOTION_LABELS.index(label) if label in MODEL_EMOTION_LABELS else -1
+                          for label in labels])
+        report["reference_accuracy"] = float(np.mean(expected.argmax(1) == truth))
+        report["accuracy"] = float(np.mean(actual.argmax(1) == truth))
+    return report
+
+def export_backends(output_dir: str = DEFAULT_MODEL_DIR, calibration: Optional[np.ndarray] = None,
+                    model_name: str = "emotion") -> Dict[str, str]:
+    """
+    Export the Keras emotion model to ONNX and TFLite, float32 and int8
+    
+    Needs TensorFlow and tf2onnx (export time only); int8 ONNX also needs
+    onnxruntime. Full-integer TFLite quantization is calibrated on the
+    given faces, or on random faces if none are supplied.
+    
+    Args:
+        output_dir: Directory to write models into
+        calibration: (N, 48, 48, 1) faces for int8 calibration
+        model_name: Registry model name
+        
+    Returns:
+        Backend name -> written path
+    """
+    import tensorflow as tf
+    from .model_registry import get_model_registry
+    
+    model = get_model_registry().get(model_name, warm_up=False).model
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {name: os.path.join(output_dir, file) for name, file in BACKEND_FILES.items()}
+    
+    if calibration is None:
+        calibration = np.random.default_rng(42).random((200,) + INPUT_SHAPE, dtype=np.float32)
+    
+    # ONNX float32 (traced from a function, which works for the legacy
+    # tf-keras model DeepFace builds) and dynamically quantized int8
+    import tf2onnx
+    signature = [tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name="input")]
+    forward = tf.function(lambda x: model(x, training=False), input_signature=signature)
+    tf2onnx.convert.from_function(forward, input_signature=signature, opset=13, output_path=paths["onnx"])
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(paths["onnx"], paths["onnx-int8"], weight_type=QuantType.QInt8)
+    
+    # TFLite float32
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    _write_bytes(paths["tflite"], converter.convert())
+    
+    # TFLite full-integer int8
+    def representative_dataset():
+        for face in calibration:
+            yield [face[np.newaxis].astype(np.float32)]
+    
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    _write_bytes(paths["tflite-int8"], converter.convert())
+    
+    for name, path in paths.items():
+        print(f"Exported {name}: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    return paths
+
+def _write_bytes(path: str, data: bytes):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser("export", help="Export ONNX and TFLite models")
+    export_parser.add_argument("--output-dir", default=DEFAULT_MODEL_DIR)
+    export_parser.add_argument("--calibration-dir", help="Labeled faces used for int8 calibration")
+    
+    parity_parser = subparsers.add_parser("parity", help="Compare exported backends with keras")
+    parity_parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    parity_parser.add_argument("--data-dir", required=True, help="Held-out set as <dir>/<emotion>/<image>")
+    parity_parser.add_argument("--backends", nargs="+", default=list(BACKEND_FILES))
+    
+    args = parser.parse_args()
+    if args.command == "export":
+        calibration = load_labeled_faces(args.calibration_dir, limit=50)[0] if args.calibration_dir else None
+        export_backends(args.output_dir, calibration)
+    else:
+        batch, labels = load_labeled_faces(args.data_dir)
+        reference = load_backend("keras")
+        for name in args.backends:
+            report = check_parity(load_backend(name, args.model_dir), reference, batch, labels)
+            print(", ".join(f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+                            for key, value in report.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Background Batch Jobs for Emotion Recognition System
+
+This module scores a set of uploaded images (or zip archives of images) on
+a background thread, so a Streamlit page can queue the work and keep
+rerunning without waiting for inference. Results and aggregate insights
+are published as each batch finishes, a run can be cancelled between
+batches, and the finished table exports to Parquet or CSV.
+"""
+
+import io
+import threading
+import time
+import zipfile
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .admission import Overloaded
+from .ingest import DEFAULT_MAX_SIDE, ingest_image
+from .insights import EmotionAggregator
+from .prediction_batch import MODEL_EMOTION_LABELS
+from .score_dataset import IMAGE_EXTENSIONS
+
+PENDING, RUNNING, COMPLETED, CANCELLED, FAILED = "pending", "running", "completed", "cancelled", "failed"
+
+RESULT_COLUMNS = (["name", "success", "face_count", "dominant_emotion", "confidence"]
+                  + [f"emotion_{label}" for label in MODEL_EMOTION_LABELS] + ["error"])
+
+def iter_uploads(uploads: Sequence[Tuple[str, bytes]]) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    """
+    Expand uploaded files into individual images
+    
+    Zip archives are opened in memory and their image entries yielded as
+    "<archive>/<entry>"; entries are only decompressed when loaded. An
+    archive that cannot be opened is yielded once, with a loader that
+    raises zipfile.BadZipFile, so it becomes a failed row.
+    
+    Args:
+        uploads: (file name, file bytes) pairs
+    
+    Yields:
+        (name, load_bytes) tuples
+    """
+    for name, data in uploads:
+        if name.lower().endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(data))
+            except zipfile.BadZipFile as e:
+                yield name, lambda error=e: _raise(error)
+                continue
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    yield f"{name}/{info.filename}", lambda archive=archive, info=info: archive.read(info)
+        else:
+            yield name, lambda data=data: data
+
+def _raise(error: Exception):
+    raise error
+
+def _result_row(name: str, result: Dict) -> Dict:
+    row = {"name": name, "success": bool(result["success"]), "face_count": result.get("face_count", 0),
+           "dominant_emotion": None, "confidence": np.nan, "error": result.get("error")}
+    faces = result.get("faces") or []
+    if faces:
+        # Image-level scores are the mean over its faces
+        dominant = result["insights"]["most_common_emotion"]
+        row["dominant_emotion"] = dominant
+        row["confidence"] = float(np.mean([face["confidence"] for face in faces]))
+        for label in MODEL_EMOTION_LABELS:
+            row[f"emotion_{label}"] = float(np.mean([face["emotions"][label] for face in faces]))
+    elif result["success"]:
+        row["error"] = "No face detected"
+    return row
+
+class BatchJob:
+    """
+    Scores images with predict_faces on a background thread
+    
+    The predictor only needs batch_predict_faces, so both EmotionPredictor
+    and RemoteEmotionPredictor work. All public reads go through snapshot(),
+    which is safe to call from the script thread while the job runs.
+    """
+    
+    def __init__(self, predictor, items: Sequence[Tuple[str, Callable[[], bytes]]],
+                 batch_size: int = 16, max_side: Optional[int] = DEFAULT_MAX_SIDE):
+        """
+        Args:
+            predictor: Object with batch_predict_faces(images)
+            items: (name, load_bytes) pairs, e.g. from iter_uploads()
+            batch_size: Images decoded and scored together
+            max_side: Longest side images are decoded at for detection
+        """
+        self.predictor = predictor
+        self.items = list(items)
+        self.batch_size = batch_size
+        self.max_side = max_side
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self._rows: List[Dict] = []
+        self._aggregator = EmotionAggregator()
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+    
+    @property
+    def total(self) -> int:
+        return len(self.items)
+    
+    @property
+    def done(self) -> bool:
+        return self.state in (COMPLETED, CANCELLED, FAILED)
+    
+    def start(self) -> "BatchJob":
+        """
+        Start processing on a daemon thread
+        
+        Returns:
+            self, for chaining
+        """
+        if self._thread is None:
+            self.state = RUNNING
+            self._started_at = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name="batch-job", daemon=True)
+            self._thread.start()
+        return self
+    
+    def cancel(self):
+        """
+        Stop after the batch in flight; results so far are kept
+        """
+        self._cancel.set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the job finishes
+        
+        Args:
+            timeout: Seconds to wait at most
+        
+        Returns:
+            Whether the job has finished
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done
+    
+    def _run(self):
+        try:
+            for begin in range(0, self.total, self.batch_size):
+                if self._cancel.is_set():
+                    self.state = CANCELLED
+                    return
+                self._process(self.items[begin:begin + self.batch_size])
+            with self._lock:
+                finished = len(self._rows) == self.total
+            self.state = COMPLETED if finished else CANCELLED
+        except Exception as e:
+            self.error = str(e)
+            self.state = FAILED
+        finally:
+            self._finished_at = time.perf_counter()
+    
+    def _process(self, batch: Sequence[Tuple[str, Callable[[], bytes]]]):
+        rows: List[Optional[Dict]] = [None] * len(batch)
+        pixels, positions = [], []
+        for position, (name, load_bytes) in enumerate(batch):
+            try:
+                pixels.append(ingest_image(io.BytesIO(load_bytes()), self.max_side, bgr=True).pixels)
+                positions.append(position)
+            except zipfile.BadZipFile as e:
+                rows[position] = _result_row(name, {"success": False, "error": f"Invalid zip archive: {e}"})
+            except ValueError:
+                # Same message score_dataset records; PIL's names the BytesIO object
+                rows[position] = _result_row(name, {"success": False, "error": "Could not decode image"})
+        
+        results = self._predict(pixels) if pixels else []
+        if results is None:
+            # Cancelled while waiting for the model
+            return
+        faces = []
+        for position, result in zip(positions, results):
+            rows[position] = _result_row(batch[position][0], result)
+            faces.extend(result.get("faces") or [])
+        
+        with self._lock:
+            self._rows.extend(rows)
+            self._aggregator.update_many(faces)
+    
+    def _predict(self, pixels: List[np.ndarray]) -> Optional[List[Dict]]:
+        # A shared, admission-controlled predictor may turn batches away
+        # under load; background jobs wait their turn instead of failing
+        while True:
+            try:
+                return self.predictor.batch_predict_faces(pixels)
+            except Overloaded as e:
+                if self._cancel.wait(min(max(e.retry_after, 0.5), 5.0)):
+                    return None
+    
+    def snapshot(self) -> Dict:
+        """
+        Progress, results so far and live insights
+        
+        Returns:
+            state, processed, total, elapsed seconds, rows (copies),
+            insights over all faces so far and error
+        """
+        with self._lock:
+            rows = list(self._rows)
+            insights = self._aggregator.insights() if self._aggregator.successful else None
+        end = self._finished_at or time.perf_counter()
+        return {
+            "state": self.state,
+            "processed": len(rows),
+            "total": self.total,
+            "elapsed": end - self._started_at if self._started_at else 0.0,
+            "rows": rows,
+            "insights": insights,
+            "error": self.error
+        }
+    
+    def to_frame(self):
+        """
+        Results so far as a DataFrame with RESULT_COLUMNS
+        """
+        import pandas as pd
+        with self._lock:
+            rows = list(self._rows)
+        return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    
+    def to_parquet_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        self.to_frame().to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    
+    def to_csv_bytes(self) -> bytes:
+        return self.to_frame().to_csv(index=False).encode("utf-8")
@@ -2,27 +2,107 @@
 Data Collection Module for Emotion Recognition System
 
 This module handles data collection from external sources and APIs
-for the emotion recognition system.
+for the emotion recognition system. API calls share one pooled session,
+are paced by a token-bucket rate limit and retried with jittered
+exponential backoff; paginated endpoints are fetched by a bounded number
+of threads and streamed to disk as JSON Lines while pages arrive.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import numpy as np
 from PIL import Image
 import os
 import json
-from typing import List, Dict, Optional
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import time
 
+# Worth retrying: throttling and transient server or gateway errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second, bursts up to `capacity`
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1.0):
+        """
+        Block until `tokens` are available, then take them
+        
+        Args:
+            tokens: Tokens to take
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_seconds = (tokens - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+class APIError(Exception):
+    """
+    A request that still failed after all retries
+    """
+
 class EmotionDataCollector:
     """
     Collects emotion data from various external sources
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.example.com",
+                 max_workers: int = 8, rate_limit: Optional[float] = 10.0, burst: Optional[float] = None,
+                 max_retries: int = 5, backoff: float = 0.5, max_backoff: float = 30.0,
+                 timeout: float = 30.0):
+        """
+        Args:
+            api_key: Bearer token sent with every request
+            base_url: API root; endpoints are joined onto it
+            max_workers: Concurrent page requests (and pooled connections)
+            rate_limit: Requests per second across all workers (None for unlimited)
+            burst: Requests allowed back to back before the rate applies
+            max_retries: Retries per request after the first attempt
+            backoff: Base delay in seconds, doubled on each retry
+            max_backoff: Upper bound on a single retry delay
+            timeout: Per-request timeout in seconds
+        """
         self.api_key = api_key
-        self.base_url = "https://api.example.com"  # Replace with actual API
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(rate_limit, burst) if rate_limit else None
         
+        # One keep-alive pool sized for the workers, instead of a new
+        # connection (and TLS handshake) per call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+        
+        self._lock = threading.Lock()
+        self.requests_made = 0
+        self.retries = 0
+        self.failed_pages: List[int] = []
+    
     def collect_from_api(self, endpoint: str, params: Dict) -> Dict:
         """
         Collect data from external API endpoint
@@ -30,27 +110,184 @@ class EmotionDataCollector:
         Args:
             endpoint: API endpoint URL
             params: Query parameters
-            
+        
         Returns:
             API response data
         """
         try:
-            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
-            response = requests.get(f"{self.base_url}/{endpoint}", 
-                                  params=params, headers=headers, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            return self.fetch(endpoint, params)
+        except APIError as e:
             print(f"Error collecting data from API: {e}")
             return {}
     
+    def fetch(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        """
+        GET an endpoint with rate limiting and retries
+        
+        Args:
+            endpoint: Path relative to base_url
+            params: Query parameters
+        
+        Returns:
+            Decoded JSON response
+        
+        Raises:
+            APIError: If the request fails with a non-retryable status or
+                runs out of retries
+        """
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            with self._lock:
+                self.requests_made += 1
+            
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            except (requests.RequestException, ValueError) as e:
+                raise APIError(f"{url}: {e}") from e
+            
+            if attempt == self.max_retries:
+                break
+            with self._lock:
+                self.retries += 1
+            time.sleep(self._retry_delay(attempt, retry_after))
+        
+        raise APIError(f"{url}: {error} after {self.max_retries + 1} attempts")
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after is not None:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter keeps workers that failed together from retrying together
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+    
+    def iter_pages(self, endpoint: str, params: Optional[Dict] = None, page_param: str = "page",
+                   first_page: int = 1, max_pages: Optional[int] = None, records_key: str = "data",
+                   total_pages_key: str = "total_pages") -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Fetch a paginated endpoint with up to max_workers requests in flight
+        
+        Pages are yielded as they complete, not in page order. When the
+        response reports total_pages_key no page past the end is requested;
+        otherwise the first empty page marks the end, at the cost of at most
+        max_workers - 1 requests beyond it. Until the page count is known, a
+        page that fails all retries marks the end the same way.
+        
+        Args:
+            endpoint: Path relative to base_url
+            params: Query parameters shared by every page
+            page_param: Query parameter holding the page number
+            first_page: Number of the first page
+            max_pages: Stop after this many pages
+            records_key: Response field holding the page's records
+            total_pages_key: Response field holding the page count, if any
+        
+        Yields:
+            (page number, records); pages that failed all retries yield an
+            empty list and are listed in self.failed_pages
+        """
+        params = dict(params or {})
+        last_page = first_page + max_pages - 1 if max_pages else None
+        next_page = first_page
+        self.failed_pages = []
+        
+        def fetch_page(page: int):
+            return self.fetch(endpoint, dict(params, **{page_param: page}))
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = {}
+            while in_flight or last_page is None or next_page <= last_page:
+                while len(in_flight) < self.max_workers and (last_page is None or next_page <= last_page):
+                    in_flight[executor.submit(fetch_page, next_page)] = next_page
+                    next_page += 1
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = in_flight.pop(future)
+                    if last_page is not None and page > last_page:
+                        continue
+                    try:
+                        payload = future.result()
+                    except APIError as e:
+                        print(f"Error collecting page {page}: {e}")
+                        self.failed_pages.append(page)
+                        if last_page is None:
+                            # With the end unknown, a failure ends pagination like an
+                            # empty page; a bad key or a down endpoint would never stop
+                            last_page = page - 1
+                        yield page, []
+                        continue
+                    
+                    records = payload.get(records_key, []) if isinstance(payload, dict) else payload
+                    total = payload.get(total_pages_key) if isinstance(payload, dict) else None
+                    if total is not None:
+                        end = first_page + int(total) - 1
+                        last_page = end if last_page is None else min(last_page, end)
+                    elif not records:
+                        end = page - 1
+                        last_page = end if last_page is None else min(last_page, end)
+                    if records:
+                        yield page, records
+    
+    def collect_to_file(self, endpoint: str, output_path: str, params: Optional[Dict] = None,
+                        **page_options) -> Dict:
+        """
+        Stream every record of a paginated endpoint to a JSON Lines file
+        
+        Args:
+            endpoint: Path relative to base_url
+            output_path: JSON Lines file to write
+            params: Query parameters shared by every page
+            **page_options: Passed to iter_pages (page_param, max_pages, ...)
+        
+        Returns:
+            Page, record, request and retry counts plus throughput
+        """
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        start = time.perf_counter()
+        requests_before, retries_before = self.requests_made, self.retries
+        pages = records = 0
+        with open(output_path, 'w') as f:
+            for _, page_records in self.iter_pages(endpoint, params, **page_options):
+                for record in page_records:
+                    f.write(json.dumps(record) + "\n")
+                # Each page reaches disk as it arrives instead of at the end
+                f.flush()
+                pages += bool(page_records)
+                records += len(page_records)
+        elapsed = time.perf_counter() - start
+        
+        return {
+            "pages": pages,
+            "records": records,
+            "failed_pages": sorted(self.failed_pages),
+            "requests": self.requests_made - requests_before,
+            "retries": self.retries - retries_before,
+            "seconds": elapsed,
+            "records_per_second": records / elapsed if elapsed else 0.0
+        }
+    
     def collect_emotion_samples(self, num_samples: int = 100) -> List[Dict]:
         """
         Collect emotion samples from external source
         
         Args:
             num_samples: Number of samples to collect
-            
+        
         Returns:
             List of emotion sample data
         """
@@ -89,7 +326,7 @@ class EmotionDataCollector:
         
         Args:
             data: Collected data
-            
+        
         Returns:
             Quality metrics
         """
@@ -0,0 +1,420 @@
+"""
+Streaming Evaluation for Emotion Recognition System
+
+This module evaluates predictions through a confusion matrix that is
+accumulated chunk by chunk with np.bincount over integer-encoded labels.
+Accuracy, precision, recall, F1 and the classification report are all
+derived from the matrix, so memory stays O(classes^2) whatever the number
+of predictions, and matrices from parallel shards are merged by addition.
+Bootstrap confidence intervals resample the matrix cells directly instead
+of the rows, which is equivalent and independent of the row count.
+
+Usage:
+    python -m src.evaluation logged/*.parquet --true-column label --workers 8
+    python -m src.evaluation logged/ --bootstrap 1000 --output weekly.json
+    python -m src.evaluation logged/ --store metrics/evaluation.db --model-version v3 --time-column timestamp
+"""
+
+import argparse
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .insights import DEFAULT_EMOTIONS
+
+AVERAGED_METRICS = ("accuracy", "precision", "recall", "f1_score")
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # 0 where the denominator is 0, like sklearn's zero_division default
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator > 0)
+
+def matrix_scores(matrices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-class and averaged metrics for one or more confusion matrices
+    
+    Args:
+        matrices: (..., K, K) counts with true labels on the rows
+    
+    Returns:
+        Arrays over the leading dimensions; per-class ones end in K
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    true_positives = np.diagonal(matrices, axis1=-2, axis2=-1)
+    support = matrices.sum(axis=-1)
+    predicted = matrices.sum(axis=-2)
+    total = support.sum(axis=-1)
+    
+    precision = _safe_divide(true_positives, predicted)
+    recall = _safe_divide(true_positives, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    weights = _safe_divide(support, total[..., None])
+    return {
+        "accuracy": _safe_divide(true_positives.sum(axis=-1), total),
+        "precision": (precision * weights).sum(axis=-1),
+        "recall": (recall * weights).sum(axis=-1),
+        "f1_score": (f1 * weights).sum(axis=-1),
+        "class_precision": precision,
+        "class_recall": recall,
+        "class_f1": f1,
+        "class_support": support,
+        "total": total
+    }
+
+def _bootstrap_chunk(probabilities: np.ndarray, total: int, resamples: int,
+                     seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    # probabilities holds the (K, K) cell frequencies of the observed matrix.
+    # Drawing N rows with replacement only changes how many land in each
+    # cell, so one multinomial draw per resample replaces N random indices
+    rng = np.random.default_rng(seed)
+    cells = rng.multinomial(total, probabilities.ravel(), size=resamples)
+    scores = matrix_scores(cells.reshape((resamples,) + probabilities.shape))
+    return {name: scores[name] for name in AVERAGED_METRICS}
+
+class ConfusionMatrix:
+    """
+    Mergeable confusion matrix accumulated from label chunks
+    """
+    
+    def __init__(self, labels: Optional[Sequence[str]] = None):
+        self.labels = list(labels or DEFAULT_EMOTIONS)
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        # Rows are true labels, columns predicted labels
+        self.matrix = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+        # Pairs left out because either label was missing (e.g. failed predictions)
+        self.skipped = 0
+    
+    def encode(self, labels) -> np.ndarray:
+        """
+        Map labels to indices into self.labels
+        
+        Args:
+            labels: Label strings (None for missing) or integer indices
+        
+        Returns:
+            int64 indices, -1 for missing labels
+        
+        Raises:
+            ValueError: If a label is not one of self.labels
+        """
+        values = np.asarray(labels)
+        if values.dtype.kind in "iu":
+            codes = values.astype(np.int64)
+            if codes.size and (codes.min() < -1 or codes.max() >= len(self.labels)):
+                raise ValueError(f"Label index out of range for {len(self.labels)} classes")
+            return codes
+        
+        import pandas as pd
+        
+        # Hash-based and in C; only the few distinct labels go through Python
+        codes, uniques = pd.factorize(values.ravel())
+        unknown = [label for label in uniques if label not in self._index]
+        if unknown:
+            raise ValueError(f"Unknown labels: {[str(label) for label in unknown[:5]]}")
+        lookup = np.array([self._index[label] for label in uniques] + [-1], dtype=np.int64)
+        # factorize marks None/NaN as -1, which indexes the trailing -1
+        return lookup[codes]
+    
+    def update(self, y_true, y_pred) -> "ConfusionMatrix":
+        """
+        Add a chunk of label pairs
+        
+        Args:
+            y_true: True labels, as strings or indices into self.labels
+            y_pred: Predicted labels, as strings or indices into self.labels
+        
+        Returns:
+            self, for chaining
+        """
+        true_codes = self.encode(y_true)
+        pred_codes = self.encode(y_pred)
+        if len(true_codes) != len(pred_codes):
+            raise ValueError(f"Got {len(true_codes)} true labels but {len(pred_codes)} predictions")
+        
+        valid = (true_codes >= 0) & (pred_codes >= 0)
+        classes = len(self.labels)
+        flat = true_codes[valid] * classes + pred_codes[valid]
+        self.matrix += np.bincount(flat, minlength=classes * classes).reshape(classes, classes)
+        self.skipped += int(len(valid) - np.count_nonzero(valid))
+        return self
+    
+    def update_chunks(self, chunks: Iterable[Tuple[Sequence, Sequence]]) -> "ConfusionMatrix":
+        """
+        Add (y_true, y_pred) chunks, e.g. Parquet row groups
+        
+        Args:
+            chunks: Iterable of label pairs
+        
+        Returns:
+            self, for chaining
+        """
+        for y_true, y_pred in chunks:
+            self.update(y_true, y_pred)
+        return self
+    
+    def merge(self, other: "ConfusionMatrix") -> "ConfusionMatrix":
+        """
+        Fold in a matrix from another shard or process
+        
+        Args:
+            other: Matrix over the same labels
+        
+        Returns:
+            self, for chaining
+        """
+        if other.labels != self.labels:
+            raise ValueError("Cannot merge confusion matrices with different labels")
+        self.matrix += other.matrix
+        self.skipped += other.skipped
+        return self
+    
+    @property
+    def total(self) -> int:
+        return int(self.matrix.sum())
+    
+    def metrics(self) -> Dict:
+        """
+        Metrics in the ModelEvaluator.calculate_metrics format
+        
+        Precision, recall and F1 are support-weighted averages, as with
+        sklearn's average='weighted'; per_class holds the unaveraged values.
+        
+        Returns:
+            Performance metrics
+        """
+        scores = matrix_scores(self.matrix)
+        per_class = {
+            label: {
+                "precision": float(scores["class_precision"][i]),
+                "recall": float(scores["class_recall"][i]),
+                "f1_score": float(scores["class_f1"][i]),
+                "support": int(scores["class_support"][i])
+            }
+            for i, label in enumerate(self.labels)
+        }
+        return {
+            "accuracy": float(scores["accuracy"]),
+            "precision": float(scores["precision"]),
+            "recall": float(scores["recall"]),
+            "f1_score": float(scores["f1_score"]),
+            "support": self.total,
+            "per_class": per_class
+        }
+    
+    def report(self, digits: int = 2) -> str:
+        """
+        Classification report in sklearn's text layout
+        
+        Args:
+            digits: Decimal places for the scores
+        
+        Returns:
+            Classification report
+        """
+        scores = matrix_scores(self.matrix)
+        width = max(len(label) for label in self.labels + ["weighted avg"])
+        headers = ["precision", "recall", "f1-score", "support"]
+        row_format = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+        
+        report = ("{:>{width}s} " + " {:>9}" * 4).format("", *headers, width=width) + "\n\n"
+        for i, label in enumerate(self.labels):
+            report += row_format.format(label, scores["class_precision"][i], scores["class_recall"][i],
+                                        scores["class_f1"][i], int(scores["class_support"][i]),
+                                        width=width, digits=digits)
+        report += "\n"
+        report += ("{:>{width}s} " + " {:>9}" * 2 + " {:>9.{digits}f} {:>9}\n").format(
+            "accuracy", "", "", scores["accuracy"], self.total, width=width, digits=digits)
+        report += row_format.format("macro avg", scores["class_precision"].mean(), scores["class_recall"].mean(),
+                                    scores["class_f1"].mean(), self.total, width=width, digits=digits)
+        report += row_format.format("weighted avg", scores["precision"], scores["recall"],
+                                    scores["f1_score"], self.total, width=width, digits=digits)
+        return report
+    
+    def bootstrap(self, resamples: int = 1000, confidence: float = 0.95, workers: int = 1,
+                  seed: Optional[int] = None) -> Dict[str, Tuple[float, float]]:
+        """
+        Percentile bootstrap confidence intervals for the averaged metrics
+        
+        Args:
+            resamples: Number of bootstrap resamples
+            confidence: Interval coverage, e.g. 0.95
+            workers: Processes to split the resamples across
+            seed: Random seed for reproducible intervals
+        
+        Returns:
+            Metric name -> (lower, upper)
+        """
+        if self.total == 0:
+            return {name: (0.0, 0.0) for name in AVERAGED_METRICS}
+        
+        probabilities = self.matrix / self.total
+        workers = max(1, min(workers, resamples))
+        sizes = [len(part) for part in np.array_split(np.arange(resamples), workers)]
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        
+        if workers == 1:
+            parts = [_bootstrap_chunk(probabilities, self.total, sizes[0], seeds[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+                parts = list(executor.map(_bootstrap_chunk, [probabilities] * workers,
+                                          [self.total] * workers, sizes, seeds))
+        
+        tail = (1 - confidence) / 2 * 100
+        intervals = {}
+        for name in AVERAGED_METRICS:
+            samples = np.concatenate([part[name] for part in parts])
+            lower, upper = np.percentile(samples, [tail, 100 - tail])
+            intervals[name] = (float(lower), float(upper))
+        return intervals
+    
+    def to_dict(self) -> Dict:
+        return {
+            "labels": self.labels,
+            "matrix": self.matrix.tolist(),
+            "skipped": self.skipped
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ConfusionMatrix":
+        confusion = cls(data["labels"])
+        confusion.matrix = np.asarray(data["matrix"], dtype=np.int64)
+        confusion.skipped = int(data.get("skipped", 0))
+        return confusion
+    
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+    
+    @classmethod
+    def from_json(cls, text: str) -> "ConfusionMatrix":
+        return cls.from_dict(json.loads(text))
+
+def merge_confusion_matrices(matrices: List[ConfusionMatrix]) -> ConfusionMatrix:
+    """
+    Combine matrices from several shards into a new one
+    
+    Args:
+        matrices: Matrices over the same labels
+    
+    Returns:
+        Combined matrix
+    """
+    combined = ConfusionMatrix(matrices[0].labels if matrices else None)
+    for matrix in matrices:
+        combined.merge(matrix)
+    return combined
+
+def evaluate_parquet(path: str, true_column: str = "label", pred_column: str = "dominant_emotion",
+                     labels: Optional[Sequence[str]] = None) -> ConfusionMatrix:
+    """
+    Accumulate a confusion matrix over one Parquet file, a batch at a time
+    
+    Args:
+        path: Parquet file with true and predicted label columns
+        true_column: Column holding the true labels
+        pred_column: Column holding the predicted labels
+        labels: Class labels (defaults to the repository's emotion order)
+    
+    Returns:
+        ConfusionMatrix for the file
+    """
+    import pyarrow.parquet as pq
+    
+    confusion = ConfusionMatrix(labels)
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(columns=[true_column, pred_column]):
+        confusion.update(batch.column(0).to_numpy(zero_copy_only=False),
+                         batch.column(1).to_numpy(zero_copy_only=False))
+    return confusion
+
+def evaluate_shards(paths: Sequence[str], true_column: str = "label", pred_column: str = "dominant_emotion",
+                    labels: Optional[Sequence[str]] = None, workers: int = 1) -> ConfusionMatrix:
+    """
+    Evaluate Parquet shards in parallel and merge their matrices
+    
+    Args:
+        paths: Parquet files
+        true_column: Column holding the true labels
+        pred_column: Column holding the predicted labels
+        labels: Class labels (defaults to the repository's emotion order)
+        workers: Processes to spread the shards across
+    
+    Returns:
+        Merged ConfusionMatrix
+    """
+    count = len(paths)
+    if workers <= 1 or count <= 1:
+        matrices = [evaluate_parquet(path, true_column, pred_column, labels) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, count), mp_context=get_context("spawn")) as executor:
+            matrices = list(executor.map(evaluate_parquet, paths, [true_column] * count,
+                                         [pred_column] * count, [labels] * count))
+    return merge_confusion_matrices(matrices) if matrices else ConfusionMatrix(labels)
+
+def _expand_paths(inputs: List[str]) -> List[str]:
+    paths = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            paths.extend(sorted(glob.glob(os.path.join(entry, "*.parquet"))))
+        else:
+            paths.append(entry)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="Parquet files or directories of Parquet files")
+    parser.add_argument("--true-column", default="label")
+    parser.add_argument("--pred-column", default="dominant_emotion")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--bootstrap", type=int, default=0, help="Bootstrap resamples for confidence intervals")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Write metrics and the confusion matrix as JSON")
+    parser.add_argument("--store", default=None, help="Add the counts to this metrics store (SQLite file)")
+    parser.add_argument("--model-version", default=None, help="Model version to record under in the store")
+    parser.add_argument("--time-column", default=None,
+                        help="Bucket rows by this timestamp column (otherwise recorded at the current time)")
+    parser.add_argument("--bucket-seconds", type=int, default=86400)
+    args = parser.parse_args()
+    if args.store and not args.model_version:
+        parser.error("--store requires --model-version")
+    
+    paths = _expand_paths(args.inputs)
+    buckets = None
+    if args.time_column:
+        from .metrics_store import evaluate_shard_buckets
+        buckets = evaluate_shard_buckets(paths, args.time_column, args.true_column, args.pred_column,
+                                         args.bucket_seconds, workers=args.workers)
+        confusion = merge_confusion_matrices(list(buckets.values()))
+    else:
+        confusion = evaluate_shards(paths, args.true_column, args.pred_column, workers=args.workers)
+    print(confusion.report())
+    if confusion.skipped:
+        print(f"Skipped {confusion.skipped} rows with a missing label")
+    
+    result = {"metrics": confusion.metrics(), "confusion_matrix": confusion.to_dict()}
+    if args.bootstrap:
+        intervals = confusion.bootstrap(args.bootstrap, args.confidence, args.workers, args.seed)
+        result["confidence_intervals"] = intervals
+        print(f"{args.confidence:.0%} bootstrap intervals ({args.bootstrap} resamples):")
+        for name, (lower, upper) in intervals.items():
+            print(f"  {name:<10} {lower:.4f} - {upper:.4f}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    
+    if args.store:
+        from .metrics_store import MetricsStore
+        store = MetricsStore(args.store, args.bucket_seconds)
+        if buckets is not None:
+            store.record_buckets(buckets, args.model_version)
+        else:
+            store.record(confusion, args.model_version)
+        print(f"Recorded {confusion.total} predictions for {args.model_version} in {args.store}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""
+Memory-mapped Face Shards for Emotion Recognition System
+
+This module converts labeled face images into fixed-size shards that are
+read back without decoding. Each shard is a pair of .npy files, a uint8
+(N, 48, 48) array of faces preprocessed like preprocess_image (grayscale,
+resized, left as uint8 so dividing by 255 gives its output) and a uint8
+label array, plus an index.json listing shards, counts and label names.
+Readers memory-map the shards, so opening a dataset costs nothing, rows
+are paged in on demand and slices within a shard are zero-copy views.
+The same format feeds training batches and evaluation.
+
+Usage:
+    python -m src.face_shards build /data/faces shards/            # <dir>/<emotion>/<image>
+    python -m src.face_shards build faces.zip shards/ --labels-csv labels.csv
+    python -m src.face_shards info shards/
+"""
+
+import argparse
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .insights import DEFAULT_EMOTIONS
+
+INDEX_NAME = "index.json"
+FORMAT_VERSION = 1
+DEFAULT_SHARD_SIZE = 65536
+
+class FaceShardWriter:
+    """
+    Buffers preprocessed faces and writes one shard per shard_size rows
+    """
+    
+    def __init__(self, output_dir: str, labels: Optional[Sequence[str]] = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE, target_size: Tuple[int, int] = (48, 48)):
+        """
+        Args:
+            output_dir: Directory for the shards and index
+            labels: Label names; stored labels are indices into this list
+            shard_size: Faces per shard
+            target_size: Face size as (width, height), as for preprocess_image
+        """
+        self.output_dir = output_dir
+        self.labels = list(labels or DEFAULT_EMOTIONS)
+        self._label_index = {label: i for i, label in enumerate(self.labels)}
+        if len(self.labels) > 256:
+            raise ValueError("At most 256 labels fit the uint8 label array")
+        self.shard_size = shard_size
+        self.target_size = target_size
+        self.shards: List[Dict] = []
+        self.count = 0
+        
+        width, height = target_size
+        self._faces = np.empty((shard_size, height, width), dtype=np.uint8)
+        self._codes = np.empty(shard_size, dtype=np.uint8)
+        self._paths: List[str] = []
+        os.makedirs(output_dir, exist_ok=True)
+    
+    def add_image(self, image: np.ndarray, label: str, path: str = ""):
+        """
+        Preprocess and append one face image
+        
+        Args:
+            image: Face crop, grayscale or 3-channel
+            label: One of self.labels
+            path: Source path, kept in the shard's path list
+        """
+        import cv2
+        
+        if image.ndim == 3 and image.shape[-1] == 1:
+            image = image[..., 0]
+        elif image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        if image.dtype != np.uint8:
+            image = np.clip(image, 0, 255).astype(np.uint8)
+        row = len(self._paths)
+        cv2.resize(image, self.target_size, dst=self._faces[row])
+        self._append(row, label, path)
+    
+    def add_encoded(self, data: bytes, label: str, path: str = "") -> bool:
+        """
+        Decode an encoded image straight to grayscale and append it
+        
+        Args:
+            data: JPEG/PNG/... bytes
+            label: One of self.labels
+            path: Source path, kept in the shard's path list
+        
+        Returns:
+            False if the bytes could not be decoded
+        """
+        import cv2
+        
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            return False
+        self.add_image(image, label, path)
+        return True
+    
+    def _append(self, row: int, label: str, path: str):
+        if label not in self._label_index:
+            raise ValueError(f"Unknown label {label!r}; expected one of {self.labels}")
+        self._codes[row] = self._label_index[label]
+        self._paths.append(path)
+        if len(self._paths) == self.shard_size:
+            self.flush()
+    
+    def flush(self):
+        """
+        Write buffered faces as a new shard
+        """
+        count = len(self._paths)
+        if not count:
+            return
+        name = f"shard-{len(self.shards):05d}"
+        np.save(os.path.join(self.output_dir, f"{name}.faces.npy"), self._faces[:count])
+        np.save(os.path.join(self.output_dir, f"{name}.labels.npy"), self._codes[:count])
+        with open(os.path.join(self.output_dir, f"{name}.paths.txt"), 'w') as f:
+            f.write("\n".join(self._paths) + "\n")
+        
+        self.shards.append({"name": name, "count": count})
+        self.count += count
+        self._paths = []
+        self._write_index()
+    
+    def close(self):
+        self.flush()
+        self._write_index()
+    
+    def _write_index(self):
+        width, height = self.target_size
+        index = {
+            "version": FORMAT_VERSION,
+            "image_shape": [height, width],
+            "labels": self.labels,
+            "count": self.count,
+            "shards": self.shards
+        }
+        # Readers only ever see a complete index
+        tmp_path = os.path.join(self.output_dir, f"{INDEX_NAME}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.output_dir, INDEX_NAME))
+    
+    def __enter__(self) -> "FaceShardWriter":
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class FaceShardDataset:
+    """
+    Random-access reader over a directory of face shards
+    """
+    
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, INDEX_NAME), 'r') as f:
+            index = json.load(f)
+        if index.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported face shard version {index.get('version')}")
+        
+        self.directory = directory
+        self.label_names: List[str] = index["labels"]
+        self.image_shape = tuple(index["image_shape"])
+        self._shards = index["shards"]
+        counts = [shard["count"] for shard in self._shards]
+        # offsets[i] is the global index of shard i's first row
+        self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._faces = [None] * len(self._shards)
+        self._labels = None
+    
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+    
+    @property
+    def num_shards(self) -> int:
+        return len(self._shards)
+    
+    def _shard_faces(self, shard: int) -> np.ndarray:
+        if self._faces[shard] is None:
+            path = os.path.join(self.directory, f"{self._shards[shard]['name']}.faces.npy")
+            self._faces[shard] = np.load(path, mmap_mode='r')
+        return self._faces[shard]
+    
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        Label index of every face (one byte each, so loaded eagerly)
+        """
+        if self._labels is None:
+            parts = [np.load(os.path.join(self.directory, f"{shard['name']}.labels.npy"))
+                     for shard in self._shards]
+            self._labels = np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint8)
+        return self._labels
+    
+    def __getitem__(self, key):
+        """
+        Faces and labels by index, slice or index array
+        
+        Returns:
+            (face, label) for an int; (faces, labels) arrays otherwise.
+            Slices inside one shard are views of the memory map.
+        """
+        if isinstance(key, (int, np.integer)):
+            index = int(key) + (len(self) if key < 0 else 0)
+            if not 0 <= index < len(self):
+                raise IndexError("FaceShardDataset index out of range")
+            shard = int(np.searchsorted(self._offsets, index, side='right')) - 1
+            return self._shard_faces(shard)[index - self._offsets[shard]], int(self.labels[index])
+        
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self._contiguous(start, stop), self.labels[start:stop]
+            key = np.arange(start, stop, step)
+        return self.take(key)
+    
+    def _contiguous(self, start: int, stop: int) -> np.ndarray:
+        if stop <= start:
+            return np.empty((0,) + self.image_shape, dtype=np.uint8)
+        first = int(np.searchsorted(self._offsets, start, side='right')) - 1
+        last = int(np.searchsorted(self._offsets, stop - 1, side='right')) - 1
+        if first == last:
+            offset = self._offsets[first]
+            return self._shard_faces(first)[start - offset:stop - offset]
+        parts = []
+        for shard in range(first, last + 1):
+            offset = self._offsets[shard]
+            parts.append(self._shard_faces(shard)[max(start, offset) - offset:
+                                                  min(stop, self._offsets[shard + 1]) - offset])
+        return np.concatenate(parts)
+    
+    def take(self, indices, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gather faces at arbitrary indices
+        
+        Args:
+            indices: Global row indices
+            out: Optional (len(indices), H, W) uint8 output buffer
+        
+        Returns:
+            (faces, labels) in the order of indices
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        indices = np.where(indices < 0, indices + len(self), indices)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError("FaceShardDataset index out of range")
+        if out is None:
+            out = np.empty((len(indices),) + self.image_shape, dtype=np.uint8)
+        
+        shards = np.searchsorted(self._offsets, indices, side='right') - 1
+        for shard in np.unique(shards):
+            rows = np.flatnonzero(shards == shard)
+            # Fancy indexing a memmap reads just those rows
+            out[rows] = self._shard_faces(int(shard))[indices[rows] - self._offsets[shard]]
+        return out, self.labels[indices]
+    
+    def iter_batches(self, batch_size: int = 256, shuffle: bool = False, seed: Optional[int] = None,
+                     normalize: bool = True) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield model-ready batches, e.g. one epoch of training or an evaluation pass
+        
+        Args:
+            batch_size: Faces per batch
+            shuffle: Visit rows in a random order
+            seed: Random seed for the shuffle
+            normalize: Yield (B, H, W, 1) float32 in [0, 1] like preprocess_image;
+                raw (B, H, W) uint8 otherwise
+        
+        Yields:
+            (faces, label indices)
+        """
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle else None
+        for start in range(0, len(self), batch_size):
+            stop = min(start + batch_size, len(self))
+            if order is None:
+                faces, labels = self[start:stop]
+            else:
+                faces, labels = self.take(order[start:stop])
+            yield (to_model_input(faces) if normalize else faces), labels
+
+def to_model_input(faces: np.ndarray) -> np.ndarray:
+    """
+    Convert stored uint8 faces to (N, H, W, 1) float32 model input
+    
+    Args:
+        faces: (N, H, W) uint8 faces from a FaceShardDataset
+    
+    Returns:
+        Faces scaled to [0, 1], matching preprocess_image
+    """
+    return (faces.astype(np.float32) / np.float32(255.0))[..., np.newaxis]
+
+def iter_labeled_images(source: str, labels_csv: Optional[str] = None, path_column: str = "path",
+                        label_column: str = "emotion") -> Iterator[Tuple[str, str, Callable[[], bytes]]]:
+    """
+    Yield labeled encoded images from a directory, zip or tar archive
+    
+    Labels come from labels_csv when given, otherwise from each image's
+    parent directory name (<source>/<emotion>/<image>).
+    
+    Args:
+        source: Directory, .zip or .tar[.gz|.bz2|.xz] path
+        labels_csv: Optional CSV mapping image paths to labels
+        path_column: CSV column with paths relative to source
+        label_column: CSV column with the label
+    
+    Yields:
+        (path, label, load_bytes); images without a label are skipped
+    """
+    from .score_dataset import iter_images
+    
+    mapping = None
+    if labels_csv:
+        import pandas as pd
+        frame = pd.read_csv(labels_csv, usecols=[path_column, label_column], dtype=str)
+        mapping = dict(zip(frame[path_column].map(os.path.normpath), frame[label_column]))
+    
+    for path, load in iter_images(source):
+        if mapping is not None:
+            label = mapping.get(os.path.normpath(path))
+        else:
+            parts = os.path.normpath(path).split(os.sep)
+            label = parts[-2] if len(parts) >= 2 else None
+        if label:
+            yield path, label, load
+
+def build_shards(source: str, output_dir: str, labels_csv: Optional[str] = None,
+                 labels: Optional[Sequence[str]] = None, shard_size: int = DEFAULT_SHARD_SIZE,
+                 **csv_options) -> Dict:
+    """
+    Convert a labeled image set into face shards
+    
+    Args:
+        source: Directory, zip or tar archive of face images
+        output_dir: Directory for the shards and index
+        labels_csv: Optional CSV mapping image paths to labels
+        labels: Label names (defaults to the repository's emotion order)
+        shard_size: Faces per shard
+        **csv_options: path_column / label_column for labels_csv
+    
+    Returns:
+        Counts of written, undecodable and unknown-label images
+    """
+    written = undecodable = unknown = 0
+    with FaceShardWriter(output_dir, labels, shard_size) as writer:
+        known = set(writer.labels)
+        for path, label, load in iter_labeled_images(source, labels_csv, **csv_options):
+            if label not in known:
+                unknown += 1
+                continue
+            if writer.add_encoded(load(), label, path):
+                written += 1
+            else:
+                undecodable += 1
+                print(f"Could not decode {path}")
+    return {"written": written, "undecodable": undecodable, "unknown_label": unknown,
+            "shards": len(writer.shards)}
+
+def evaluate_dataset(dataset: FaceShardDataset, backend, batch_size: int = 256):
+    """
+    Run a backend over every face and accumulate a confusion matrix
+    
+    Args:
+        dataset: Face shards with ground-truth labels
+        backend: Object with predict((B, 48, 48, 1)) -> (B, 7) probabilities
+            in MODEL_EMOTION_LABELS order, e.g. from backends.load_backend
+        batch_size: Faces per forward pass
+    
+    Returns:
+        ConfusionMatrix over the dataset's label names
+    """
+    from .evaluation import ConfusionMatrix
+    from .prediction_batch import MODEL_EMOTION_LABELS
+    
+    confusion = ConfusionMatrix(dataset.label_names)
+    # Model output columns -> dataset label indices
+    remap = confusion.encode(MODEL_EMOTION_LABELS)
+    for faces, labels in dataset.iter_batches(batch_size):
+        predicted = np.argmax(backend.predict(faces), axis=1)
+        confusion.update(labels.astype(np.int64), remap[predicted])
+    return confusion
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    build_parser = subparsers.add_parser("build", help="Convert labeled images into shards")
+    build_parser.add_argument("source", help="Directory, zip or tar archive of face images")
+    build_parser.add_argument("output_dir")
+    build_parser.add_argument("--labels-csv", default=None, help="CSV mapping image paths to labels")
+    build_parser.add_argument("--path-column", default="path")
+    build_parser.add_argument("--label-column", default="emotion")
+    build_parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    
+    info_parser = subparsers.add_parser("info", help="Summarize a shard directory")
+    info_parser.add_argument("directory")
+    
+    args = parser.parse_args()
+    if args.command == "build":
+        result = build_shards(args.source, args.output_dir, args.labels_csv, shard_size=args.shard_size,
+                              path_column=args.path_column, label_column=args.label_column)
+        print(f"Wrote {result['written']} faces in {result['shards']} shards to {args.output_dir} "
+              f"({result['undecodable']} undecodable, {result['unknown_label']} with unknown labels)")
+    else:
+        dataset = FaceShardDataset(args.directory)
+        counts = np.bincount(dataset.labels, minlength=len(dataset.label_names))
+        print(f"{len(dataset)} faces of {dataset.image_shape[1]}x{dataset.image_shape[0]} "
+              f"in {dataset.num_shards} shards")
+        for label, count in zip(dataset.label_names, counts):
+            print(f"  {label:<10} {count}")
+
+if __name__ == "__main__":
+    main()
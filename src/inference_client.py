@@ -0,0 +1,70 @@
+"""
+Inference Client for Emotion Recognition System
+
+This module calls the inference service (src.inference_server) with the
+same interface as EmotionPredictor, so Streamlit pages can use a shared
+remote model instead of loading DeepFace themselves.
+"""
+
+from typing import Dict, List
+import numpy as np
+import cv2
+import requests
+
+class RemoteEmotionPredictor:
+    """
+    EmotionPredictor-compatible client for the inference service
+    """
+    
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache = None
+        self.session = requests.Session()
+    
+    def predict_faces(self, image: np.ndarray) -> Dict:
+        """
+        Predict emotions for every face in an image via the service
+        
+        Args:
+            image: BGR image as numpy array
+        
+        Returns:
+            predict_faces result as returned by the service
+        """
+        # PNG is lossless, so the service sees exactly these pixels
+        ok, encoded = cv2.imencode(".png", np.ascontiguousarray(image))
+        if not ok:
+            return self._failed("Could not encode image")
+        
+        try:
+            response = self.session.post(
+                f"{self.base_url}/predict",
+                data=encoded.tobytes(),
+                headers={"Content-Type": "image/png"},
+                timeout=self.timeout
+            )
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            return self._failed(str(e))
+    
+    def batch_predict_faces(self, images: List[np.ndarray]) -> List[Dict]:
+        return [self.predict_faces(image) for image in images]
+    
+    def stats(self) -> Dict:
+        """
+        Queue depth, batch size and latency summaries from the service
+        """
+        response = self.session.get(f"{self.base_url}/stats", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    @staticmethod
+    def _failed(error: str) -> Dict:
+        return {
+            "faces": [],
+            "face_count": 0,
+            "insights": {"error": error},
+            "success": False,
+            "error": error
+        }
@@ -0,0 +1,254 @@
+"""
+Inference Service for Emotion Recognition System
+
+This module runs EmotionPredictor behind an asynchronous HTTP API. A
+dynamic batcher collects concurrent requests for up to a few milliseconds
+(or until the batch is full) and scores them in one forward pass, so
+concurrent users share the model instead of serializing on it.
+
+Endpoints:
+    POST /predict   encoded image (PNG/JPEG) body -> predict_faces result
+    GET  /metrics   Prometheus text metrics
+    GET  /stats     queue depth, batch size, latency and per-stage summaries as JSON
+    GET  /healthz   liveness check
+
+Usage:
+    python -m src.inference_server --port 8000 --max-batch-size 32 --max-wait-ms 5
+"""
+
+import argparse
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from aiohttp import web
+
+from .backends import BACKENDS
+from .ingest import DEFAULT_MAX_SIDE, IngestedImage, ingest_image
+from .metrics import (
+    DEFAULT_SIZE_BUCKETS, Counter, Gauge, Histogram, get_pipeline_metrics, render_prometheus
+)
+
+class DynamicBatcher:
+    """
+    Groups concurrent requests into batches for a single predict call
+    """
+    
+    def __init__(self, predict_batch: Callable[[List[Any]], List[Dict]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_sizes = Histogram("emotion_batch_size", "Requests per model batch",
+                                     buckets=DEFAULT_SIZE_BUCKETS)
+        self.queue_wait = Histogram("emotion_queue_wait_seconds", "Time requests wait for a batch")
+        self.latency = Histogram("emotion_request_latency_seconds", "End-to-end request latency")
+        self.errors = Counter("emotion_batch_errors_total", "Failed model batches", label="type")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # A single inference thread keeps TensorFlow calls serialized
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+    
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+    
+    async def submit(self, item: Any) -> Dict:
+        """
+        Queue one item and wait for its result
+        
+        Args:
+            item: Input passed to predict_batch as part of a batch
+            
+        Returns:
+            The item's prediction result
+        """
+        future = asyncio.get_running_loop().create_future()
+        enqueued = time.perf_counter()
+        await self._queue.put((item, future, enqueued))
+        try:
+            return await future
+        finally:
+            self.latency.observe(time.perf_counter() - enqueued)
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self.queue_wait.observe(started - enqueued)
+            self.batch_sizes.observe(len(batch))
+            
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.predict_batch, [item for item, _, _ in batch]
+                )
+            except Exception as e:
+                self.errors.inc(label_value=type(e).__name__)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+def decode_image(data: bytes, max_side: Optional[int] = DEFAULT_MAX_SIDE) -> IngestedImage:
+    """
+    Decode an encoded image body, keeping the channel order it was sent in
+    
+    Large images are decoded straight to the detection resolution.
+    
+    Args:
+        data: PNG or JPEG bytes
+        max_side: Longest side to detect at (None keeps full resolution)
+        
+    Returns:
+        Decoded image with its original geometry
+    """
+    try:
+        # Clients encode with OpenCV, so PIL's RGB is their array order reversed
+        return ingest_image(io.BytesIO(data), max_side, bgr=True)
+    except ValueError as e:
+        raise ValueError("Request body is not a decodable image") from e
+
+def create_app(predictor=None, max_batch_size: int = 32, max_wait_ms: float = 5.0,
+               backend: str = "keras", model_dir: Optional[str] = None,
+               max_side: Optional[int] = DEFAULT_MAX_SIDE) -> web.Application:
+    """
+    Build the aiohttp application
+    
+    Args:
+        predictor: EmotionPredictor to serve (created and warmed up if omitted)
+        max_batch_size: Maximum requests per forward pass
+        max_wait_ms: Maximum time to hold a request while a batch fills
+        backend: Inference backend for a newly created predictor
+        model_dir: Directory holding exported ONNX/TFLite models
+        max_side: Longest side images are detected at; regions are reported
+            in original coordinates
+        
+    Returns:
+        Configured application
+    """
+    if predictor is None:
+        from .model_registry import warm_up_models
+        from .model_utils import EmotionPredictor
+        predictor = EmotionPredictor(max_batch_size=max_batch_size, backend=backend, model_dir=model_dir)
+        if backend == "keras":
+            warm_up_models()
+        else:
+            predictor.predict_tensor(np.zeros((1, 48, 48, 1), dtype=np.float32))
+    
+    batcher = DynamicBatcher(predictor.batch_predict_faces, max_batch_size, max_wait_ms)
+    # Remote predictors have no stage metrics of their own
+    pipeline = getattr(predictor, "metrics", None) or get_pipeline_metrics()
+    requests_total = Counter("emotion_requests_total", "Requests by outcome", label="status")
+    metrics = [
+        requests_total,
+        batcher.errors,
+        Gauge("emotion_queue_depth", "Requests waiting for a batch", lambda: batcher.queue_depth),
+        batcher.batch_sizes,
+        batcher.queue_wait,
+        batcher.latency,
+    ] + pipeline.metrics()
+    
+    def timed_decode(body: bytes) -> IngestedImage:
+        with pipeline.sample().stage("decode"):
+            return decode_image(body, max_side)
+    
+    async def predict(request: web.Request) -> web.Response:
+        body = await request.read()
+        try:
+            ingested = await asyncio.get_running_loop().run_in_executor(None, timed_decode, body)
+        except ValueError as e:
+            pipeline.record_error(e)
+            requests_total.inc(label_value="bad_request")
+            return web.json_response({"success": False, "error": str(e)}, status=400)
+        
+        try:
+            result = ingested.restore_regions(await batcher.submit(ingested.pixels))
+        except Exception as e:
+            requests_total.inc(label_value="error")
+            return web.json_response({"success": False, "error": str(e)}, status=500)
+        
+        requests_total.inc(label_value="ok" if result["success"] else "failed")
+        return web.json_response(result)
+    
+    async def metrics_text(request: web.Request) -> web.Response:
+        return web.Response(text=render_prometheus(metrics), content_type="text/plain")
+    
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response({
+            "queue_depth": batcher.queue_depth,
+            "requests": requests_total.values(),
+            "batch_size": batcher.batch_sizes.snapshot(),
+            "queue_wait_seconds": batcher.queue_wait.snapshot(),
+            "latency_seconds": batcher.latency.snapshot(),
+            "pipeline": pipeline.snapshot()
+        })
+    
+    async def healthz(request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+    
+    async def on_startup(app: web.Application):
+        await batcher.start()
+    
+    async def on_cleanup(app: web.Application):
+        await batcher.stop()
+    
+    app = web.Application(client_max_size=200 * 1024 * 1024)
+    app["batcher"] = batcher
+    app.router.add_post("/predict", predict)
+    app.router.add_get("/metrics", metrics_text)
+    app.router.add_get("/stats", stats)
+    app.router.add_get("/healthz", healthz)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Emotion recognition inference service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--backend", default="keras", choices=BACKENDS)
+    parser.add_argument("--model-dir", default=None, help="Directory holding exported ONNX/TFLite models")
+    parser.add_argument("--max-side", type=int, default=DEFAULT_MAX_SIDE,
+                        help="Longest side images are detected at (0 keeps full resolution)")
+    args = parser.parse_args()
+    
+    app = create_app(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                     backend=args.backend, model_dir=args.model_dir, max_side=args.max_side or None)
+    web.run_app(app,
+                host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
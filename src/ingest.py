@@ -0,0 +1,110 @@
+"""
+Image Ingest for Emotion Recognition System
+
+This module decodes uploaded images directly at a bounded detection
+resolution. JPEGs are decoded by libjpeg at 1/2, 1/4 or 1/8 scale (PIL's
+draft mode), so a 40 MP photo never exists at full size in memory; other
+formats are decoded and then reduced. Face boxes found on the reduced image
+are mapped back to original coordinates.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+# Longest side, in pixels, that face detection runs at
+DEFAULT_MAX_SIDE = int(os.environ.get("EMOTION_MAX_DETECT_SIDE", "1280"))
+
+class IngestedImage:
+    """
+    Decoded pixels at detection resolution plus the original geometry
+    """
+    
+    def __init__(self, pixels: np.ndarray, original_size: Tuple[int, int]):
+        self.pixels = pixels
+        # (width, height), as PIL reports sizes
+        self.original_size = original_size
+        height, width = pixels.shape[:2]
+        self.scale = (original_size[0] / width, original_size[1] / height)
+    
+    @property
+    def downscaled(self) -> bool:
+        return self.scale != (1.0, 1.0)
+    
+    def restore_regions(self, result: Dict) -> Dict:
+        """
+        Map the face regions of a predict_faces result to original coordinates
+        
+        Args:
+            result: Result computed on self.pixels
+        
+        Returns:
+            Copy of the result with regions in original image coordinates
+        """
+        if not self.downscaled or not result.get("faces"):
+            return result
+        return dict(result, faces=scale_regions(result["faces"], self.scale))
+
+def scale_regions(faces: List[Dict], scale: Tuple[float, float]) -> List[Dict]:
+    """
+    Rescale face regions
+    
+    Args:
+        faces: Face results with a "region" of x, y, w, h
+        scale: (x, y) multipliers
+    
+    Returns:
+        Copies of the faces with scaled integer regions
+    """
+    sx, sy = scale
+    scaled = []
+    for face in faces:
+        region = face["region"]
+        scaled.append(dict(face, region={
+            "x": int(round(region["x"] * sx)),
+            "y": int(round(region["y"] * sy)),
+            "w": int(round(region["w"] * sx)),
+            "h": int(round(region["h"] * sy))
+        }))
+    return scaled
+
+def ingest_image(source, max_side: Optional[int] = DEFAULT_MAX_SIDE, bgr: bool = False) -> IngestedImage:
+    """
+    Decode an image no larger than needed for face detection
+    
+    Args:
+        source: Path, file-like object (e.g. a Streamlit upload) or PIL image
+        max_side: Longest output side in pixels (None keeps full resolution)
+        bgr: Return BGR pixels (OpenCV order) instead of RGB
+    
+    Returns:
+        IngestedImage with read-only uint8 (H, W, 3) pixels
+    
+    Raises:
+        ValueError: If the data is not a decodable image
+    """
+    try:
+        image = source if isinstance(source, Image.Image) else Image.open(source)
+        original_size = image.size
+        
+        if max_side and max(original_size) > max_side:
+            ratio = max_side / max(original_size)
+            target = (max(1, round(original_size[0] * ratio)), max(1, round(original_size[1] * ratio)))
+            # JPEG only: pick the smallest 1/2^k decode scale that still
+            # covers target. A no-op for formats without reduced decoding.
+            image.draft("RGB", target)
+            if max(image.size) > max_side:
+                image.thumbnail((max_side, max_side), Image.Resampling.BILINEAR)
+        
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        # Wraps the single buffer PIL exports instead of copying it again
+        pixels = np.asarray(image)
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"Could not decode image: {e}") from e
+    
+    if bgr:
+        import cv2
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+    return IngestedImage(pixels, original_size)
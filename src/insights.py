@@ -0,0 +1,198 @@
+"""
+Streaming Insights for Emotion Recognition System
+
+This module provides an incremental, mergeable aggregator for emotion
+predictions. It keeps NumPy counters plus running mean/variance of the
+confidence, so rolling insights over millions of predictions from several
+workers cost O(1) to read instead of rescanning the full history.
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+
+DEFAULT_EMOTIONS = ['happy', 'sad', 'angry', 'surprise', 'fear', 'disgust', 'neutral']
+
+class EmotionAggregator:
+    """
+    Running emotion counts, confidence moments and success rate
+    """
+    
+    def __init__(self, emotions: Optional[Sequence[str]] = None):
+        self.emotions = list(emotions or DEFAULT_EMOTIONS)
+        self._index = {emotion: i for i, emotion in enumerate(self.emotions)}
+        self.counts = np.zeros(len(self.emotions), dtype=np.int64)
+        self.total = 0
+        self.successful = 0
+        self.confidence_mean = 0.0
+        # Sum of squared deviations from the mean (Welford's M2)
+        self.confidence_m2 = 0.0
+    
+    def update(self, prediction: Dict) -> "EmotionAggregator":
+        """
+        Add a single prediction
+        
+        Args:
+            prediction: Result from EmotionPredictor
+            
+        Returns:
+            self, for chaining
+        """
+        self.total += 1
+        if not prediction["success"]:
+            return self
+        
+        self.counts[self._index[prediction["dominant_emotion"]]] += 1
+        self.successful += 1
+        delta = prediction["confidence"] - self.confidence_mean
+        self.confidence_mean += delta / self.successful
+        self.confidence_m2 += delta * (prediction["confidence"] - self.confidence_mean)
+        return self
+    
+    def update_many(self, predictions: Iterable[Dict]) -> "EmotionAggregator":
+        """
+        Add a batch of prediction dicts
+        
+        Args:
+            predictions: Results from EmotionPredictor
+            
+        Returns:
+            self, for chaining
+        """
+        predictions = list(predictions)
+        successful = [p for p in predictions if p["success"]]
+        labels = np.fromiter((self._index[p["dominant_emotion"]] for p in successful),
+                             dtype=np.int64, count=len(successful))
+        confidences = np.fromiter((p["confidence"] for p in successful),
+                                  dtype=np.float64, count=len(successful))
+        return self.update_arrays(labels, confidences, total=len(predictions))
+    
+    def update_batch(self, batch) -> "EmotionAggregator":
+        """
+        Add a PredictionBatch straight from its arrays
+        
+        Args:
+            batch: PredictionBatch from EmotionPredictor.predict_batch
+            
+        Returns:
+            self, for chaining
+        """
+        # Batch label indices follow the model's order, not self.emotions
+        remap = np.array([self._index[label] for label in batch.labels], dtype=np.int64)
+        success = batch.success
+        return self.update_arrays(remap[batch.dominant[success]],
+                                  batch.confidence[success].astype(np.float64), total=len(batch))
+    
+    def update_arrays(self, labels: np.ndarray, confidences: np.ndarray,
+                      total: Optional[int] = None) -> "EmotionAggregator":
+        """
+        Add a batch of successful predictions given as arrays
+        
+        Args:
+            labels: Dominant emotion indices into self.emotions
+            confidences: Confidence of each prediction
+            total: Predictions in the batch including failures (defaults to len(labels))
+            
+        Returns:
+            self, for chaining
+        """
+        count = len(labels)
+        other = EmotionAggregator(self.emotions)
+        other.total = count if total is None else total
+        other.successful = count
+        if count:
+            other.counts = np.bincount(labels, minlength=len(self.emotions)).astype(np.int64)
+            other.confidence_mean = float(np.mean(confidences))
+            other.confidence_m2 = float(np.sum((confidences - other.confidence_mean) ** 2))
+        return self.merge(other)
+    
+    def merge(self, other: "EmotionAggregator") -> "EmotionAggregator":
+        """
+        Fold in another aggregator, e.g. from a different shard or process
+        
+        Args:
+            other: Aggregator over the same emotion labels
+            
+        Returns:
+            self, for chaining
+        """
+        if other.emotions != self.emotions:
+            raise ValueError("Cannot merge aggregators with different emotion labels")
+        
+        combined = self.successful + other.successful
+        if combined:
+            # Chan et al. parallel combination of means and M2
+            delta = other.confidence_mean - self.confidence_mean
+            self.confidence_mean += delta * other.successful / combined
+            self.confidence_m2 += other.confidence_m2 + delta ** 2 * self.successful * other.successful / combined
+        
+        self.counts += other.counts
+        self.total += other.total
+        self.successful = combined
+        return self
+    
+    @property
+    def confidence_variance(self) -> float:
+        return self.confidence_m2 / self.successful if self.successful else 0.0
+    
+    def insights(self) -> Dict:
+        """
+        Insights in the EmotionPredictor.get_emotion_insights format
+        
+        Returns:
+            Insights and statistics
+        """
+        if self.total == 0:
+            return {"error": "No predictions provided"}
+        
+        return {
+            "total_predictions": self.total,
+            "successful_predictions": self.successful,
+            "success_rate": self.successful / self.total,
+            "emotion_distribution": {emotion: int(count) for emotion, count in zip(self.emotions, self.counts)},
+            # argmax keeps the first label on ties, like max() over the dict
+            "most_common_emotion": self.emotions[int(np.argmax(self.counts))],
+            "average_confidence": self.confidence_mean if self.successful else 0
+        }
+    
+    def to_dict(self) -> Dict:
+        return {
+            "emotions": self.emotions,
+            "counts": self.counts.tolist(),
+            "total": self.total,
+            "successful": self.successful,
+            "confidence_mean": self.confidence_mean,
+            "confidence_m2": self.confidence_m2
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EmotionAggregator":
+        aggregator = cls(data["emotions"])
+        aggregator.counts = np.asarray(data["counts"], dtype=np.int64)
+        aggregator.total = int(data["total"])
+        aggregator.successful = int(data["successful"])
+        aggregator.confidence_mean = float(data["confidence_mean"])
+        aggregator.confidence_m2 = float(data["confidence_m2"])
+        return aggregator
+    
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+    
+    @classmethod
+    def from_json(cls, text: str) -> "EmotionAggregator":
+        return cls.from_dict(json.loads(text))
+
+def merge_aggregators(aggregators: List[EmotionAggregator]) -> EmotionAggregator:
+    """
+    Combine aggregators from several shards into a new one
+    
+    Args:
+        aggregators: Aggregators over the same emotion labels
+        
+    Returns:
+        Combined aggregator
+    """
+    combined = EmotionAggregator(aggregators[0].emotions if aggregators else None)
+    for aggregator in aggregators:
+        combined.merge(aggregator)
+    return combined
@@ -0,0 +1,407 @@
+"""
+Live Stream Emotion Analysis for Emotion Recognition System
+
+This module analyzes a live camera feed in real time. Frames arrive on the
+capture thread (a browser WebRTC callback, or a video file standing in for
+the camera) and go into a single-slot buffer that only keeps the newest
+frame, so when inference falls behind, stale frames are dropped instead of
+queueing up latency. A worker thread runs detection, tracking and emotion
+inference (VideoEmotionPipeline) on the newest frame, and the capture
+thread overlays the latest result, FPS and latency on outgoing frames.
+
+End-to-end latency is measured from frame arrival to result. While it stays
+above the latency budget, frames are analyzed at a lower resolution until
+it recovers, and results that missed the budget are not drawn.
+
+Usage:
+    python -m src.live_stream clip.mp4 --budget-ms 300 --output annotated.avi
+"""
+
+import argparse
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import cv2
+
+from .admission import Overloaded
+from .model_utils import EmotionPredictor, draw_face_boxes
+from .video_pipeline import VideoEmotionPipeline, iter_video_frames
+
+class LatestFrame:
+    """
+    Single-slot frame buffer; a new frame replaces one not yet taken
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._arrived = 0.0
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+    
+    def put(self, frame: np.ndarray):
+        with self._condition:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+            self._arrived = time.monotonic()
+            self.received += 1
+            self._condition.notify()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a frame is available
+        
+        Args:
+            timeout: Longest wait in seconds
+        
+        Returns:
+            False on timeout or after close
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._frame is not None or self._closed, timeout)
+            return self._frame is not None and not self._closed
+    
+    def take(self) -> Optional[Tuple[float, np.ndarray]]:
+        """
+        Remove the newest frame
+        
+        Returns:
+            (arrival_monotonic_time, frame), or None if the slot is empty
+        """
+        with self._condition:
+            if self._frame is None:
+                return None
+            item = (self._arrived, self._frame)
+            self._frame = None
+            return item
+    
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+def _rate(times: List[float]) -> float:
+    if len(times) < 2 or times[-1] <= times[0]:
+        return 0.0
+    return (len(times) - 1) / (times[-1] - times[0])
+
+class LiveEmotionAnalyzer:
+    """
+    Real-time emotion analysis of the newest frame of a live stream
+    """
+    
+    # Processing resolution changes by this factor when adapting to the budget
+    SCALE_STEP = 0.75
+    # Processed frames between resolution changes
+    ADAPT_INTERVAL = 10
+    # Weight of the newest latency in the moving average used to adapt
+    SMOOTHING = 0.2
+    
+    def __init__(self, predictor: Optional[EmotionPredictor] = None, latency_budget_ms: float = 300.0,
+                 max_side: int = 640, min_side: int = 240, detect_every: int = 5, window: int = 90):
+        """
+        Args:
+            predictor: Shared predictor; an AdmittedPredictor's queue is
+                honoured one frame at a time
+            latency_budget_ms: Target time from frame arrival to result
+            max_side: Longest frame side analyzed (larger frames are downscaled)
+            min_side: Lowest resolution the budget may push analysis down to
+            detect_every: Run full face detection every n processed frames
+                and track faces in between
+            window: Recent frames used for FPS and latency readouts
+        """
+        self.pipeline = VideoEmotionPipeline(predictor, detect_every=detect_every)
+        self.predictor = self.pipeline.predictor
+        self.latency_budget = latency_budget_ms / 1000
+        self.max_side = max_side
+        self.min_side = min(min_side, max_side)
+        self.side = max_side
+        self.frames = LatestFrame()
+        self._arrivals: deque = deque(maxlen=window)
+        # (finished_at, latency) of recently processed frames
+        self._processed: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._latest: Optional[Dict] = None
+        self._pending: Optional[np.ndarray] = None
+        self._smoothed_latency: Optional[float] = None
+        self._since_adapt = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.processed = 0
+        self.over_budget = 0
+        self.rejected = 0
+        self.error: Optional[str] = None
+    
+    def start(self) -> "LiveEmotionAnalyzer":
+        """
+        Start the inference worker (no-op while it is running)
+        
+        Returns:
+            self, for chaining
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self.frames = LatestFrame()
+        self._thread = threading.Thread(target=self._run, name="live-emotion", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self.frames.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def submit(self, frame: np.ndarray):
+        """
+        Hand the newest camera frame to the worker; never blocks
+        
+        Args:
+            frame: BGR frame
+        """
+        self.frames.put(frame)
+        with self._lock:
+            self._arrivals.append(time.monotonic())
+    
+    def latest(self) -> Optional[Dict]:
+        """
+        Most recent result
+        
+        Returns:
+            faces (regions in input frame coordinates), arrived, latency
+            and side, or None before the first result
+        """
+        with self._lock:
+            return self._latest
+    
+    def _run(self):
+        admission = getattr(self.predictor, "admission", None)
+        results = self.pipeline.process(self._pending_frames())
+        while not self._stop.is_set():
+            if not self.frames.wait(timeout=0.5):
+                continue
+            try:
+                with admission.admit(1) if admission is not None else nullcontext() as slot:
+                    # Take the frame once the model is ours, so it is the newest one
+                    arrived, frame = self.frames.take()
+                    self._pending, scale = self._resize(frame)
+                    result = next(results)
+                    if slot is not None and not result["detected"]:
+                        # Tracked frames skip detection and would understate
+                        # the per-image cost other requests wait for
+                        slot.model_units = 0
+            except Overloaded as e:
+                self.rejected += 1
+                self._stop.wait(min(e.retry_after, 1.0))
+                continue
+            except Exception as e:
+                print(f"Live analysis error: {e}")
+                self.error = str(e)
+                results = self.pipeline.process(self._pending_frames())
+                continue
+            self._record(result, arrived, scale)
+    
+    def _pending_frames(self):
+        # VideoEmotionPipeline pulls exactly one frame per result
+        while True:
+            yield self._pending
+    
+    def _resize(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.side / max(height, width))
+        if scale < 1.0:
+            frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+        return frame, scale
+    
+    def _record(self, result: Dict, arrived: float, scale: float):
+        finished = time.monotonic()
+        latency = finished - arrived
+        faces = []
+        for track in result["tracks"]:
+            face = dict(track)
+            face["region"] = {key: int(round(value / scale)) for key, value in track["region"].items()}
+            faces.append(face)
+        
+        with self._lock:
+            self._latest = {"faces": faces, "arrived": arrived, "latency": latency, "side": self.side}
+            self._processed.append((finished, latency))
+            self.processed += 1
+            if latency > self.latency_budget:
+                self.over_budget += 1
+        self._adapt(latency)
+    
+    def _adapt(self, latency: float):
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency += self.SMOOTHING * (latency - self._smoothed_latency)
+        self._since_adapt += 1
+        if self._since_adapt < self.ADAPT_INTERVAL:
+            return
+        
+        side = self.side
+        if self._smoothed_latency > self.latency_budget:
+            side = max(self.min_side, int(self.side * self.SCALE_STEP))
+        elif self._smoothed_latency < self.latency_budget / 2:
+            side = min(self.max_side, int(self.side / self.SCALE_STEP))
+        if side != self.side:
+            self.side = side
+            self._since_adapt = 0
+            # Track boxes are in the old resolution; detect afresh
+            self.pipeline.redetect()
+    
+    def annotate(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Draw the latest faces and an FPS / latency readout onto a frame
+        
+        Faces are left out when their result missed the latency budget or
+        the stream has produced nothing newer for twice the budget.
+        
+        Args:
+            frame: BGR frame, usually the one just submitted
+        
+        Returns:
+            Annotated copy of the frame
+        """
+        latest = self.latest()
+        faces = []
+        if (latest is not None and latest["latency"] <= self.latency_budget
+                and time.monotonic() - latest["arrived"] <= 2 * self.latency_budget):
+            faces = latest["faces"]
+        annotated = draw_face_boxes(frame, faces)
+        
+        stats = self.stats()
+        text = (f"{stats['processed_fps']:.1f} fps  {stats['latency_ms']:.0f} ms  "
+                f"{stats['side']}px  dropped {stats['drop_rate']:.0%}")
+        scale = max(0.4, min(annotated.shape[:2]) / 720)
+        thickness = max(1, int(2 * scale))
+        (text_width, text_height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        cv2.rectangle(annotated, (0, 0), (text_width + 10, text_height + baseline + 10), (0, 0, 0), -1)
+        color = (0, 200, 0) if stats["latency_ms"] <= self.latency_budget * 1000 else (0, 0, 255)
+        cv2.putText(annotated, text, (5, text_height + 5), cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+        return annotated
+    
+    def stats(self) -> Dict:
+        """
+        Live throughput and latency
+        
+        Returns:
+            Input and processed FPS, last/p50/p95 latency over the recent
+            window, the budget, frame counters and the current resolution
+        """
+        with self._lock:
+            arrivals = list(self._arrivals)
+            finished = [item[0] for item in self._processed]
+            latencies = np.array([item[1] for item in self._processed]) * 1000
+            processed, over_budget = self.processed, self.over_budget
+        received, dropped = self.frames.received, self.frames.dropped
+        return {
+            "input_fps": _rate(arrivals),
+            "processed_fps": _rate(finished),
+            "latency_ms": float(latencies[-1]) if len(latencies) else 0.0,
+            "latency_p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "latency_p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+            "budget_ms": self.latency_budget * 1000,
+            "received": received,
+            "processed": processed,
+            "dropped": dropped,
+            "drop_rate": dropped / received if received else 0.0,
+            "over_budget": over_budget,
+            "rejected": self.rejected,
+            "side": self.side
+        }
+
+def play_video(path: str, analyzer: LiveEmotionAnalyzer, on_frame: Optional[Callable[[np.ndarray], None]] = None,
+               realtime: bool = True, stop: Optional[threading.Event] = None) -> int:
+    """
+    Feed a video file to an analyzer as if it were a live camera
+    
+    Frames are submitted at the file's frame rate; like a camera, frames
+    whose time has passed while the caller was busy are skipped.
+    
+    Args:
+        path: Video file path
+        analyzer: Started LiveEmotionAnalyzer
+        on_frame: Called with each submitted frame, e.g. to display it annotated
+        realtime: Pace frames at the file's frame rate (False submits as fast as possible)
+        stop: Event that ends playback early
+    
+    Returns:
+        Number of frames submitted
+    """
+    submitted = 0
+    start = time.monotonic()
+    for _, timestamp, frame in iter_video_frames(path):
+        if stop is not None and stop.is_set():
+            break
+        if realtime:
+            delay = start + timestamp - time.monotonic()
+            if delay < -0.1:
+                continue
+            if delay > 0:
+                time.sleep(delay)
+        analyzer.submit(frame)
+        if on_frame is not None:
+            on_frame(frame)
+        submitted += 1
+    return submitted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", help="Video file standing in for the camera")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="End-to-end latency budget")
+    parser.add_argument("--max-side", type=int, default=640, help="Longest frame side analyzed")
+    parser.add_argument("--detect-every", type=int, default=5)
+    parser.add_argument("--output", help="Write annotated frames to this video file")
+    args = parser.parse_args()
+    
+    analyzer = LiveEmotionAnalyzer(latency_budget_ms=args.budget_ms, max_side=args.max_side,
+                                   detect_every=args.detect_every)
+    capture = cv2.VideoCapture(args.video)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    capture.release()
+    writer = None
+    last_report = 0.0
+    
+    def on_frame(frame: np.ndarray):
+        nonlocal writer, last_report
+        if args.output:
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = cv2.VideoWriter(args.output, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+            writer.write(analyzer.annotate(frame))
+        if time.monotonic() - last_report >= 1.0:
+            last_report = time.monotonic()
+            stats = analyzer.stats()
+            print(f"{stats['input_fps']:5.1f} fps in, {stats['processed_fps']:5.1f} fps analyzed, "
+                  f"latency {stats['latency_ms']:4.0f} ms (p95 {stats['latency_p95_ms']:4.0f}), "
+                  f"{stats['side']}px, dropped {stats['drop_rate']:.0%}")
+    
+    # Load weights before the clock starts
+    analyzer.predictor.detect_faces(np.zeros((240, 320, 3), dtype=np.uint8))
+    analyzer.start()
+    last_report = time.monotonic()
+    try:
+        frames = play_video(args.video, analyzer, on_frame)
+    finally:
+        analyzer.stop()
+        if writer is not None:
+            writer.release()
+    
+    stats = analyzer.stats()
+    print(f"\n{frames} frames played, {stats['processed']} analyzed, {stats['dropped']} dropped, "
+          f"{stats['over_budget']} over the {stats['budget_ms']:.0f} ms budget; "
+          f"latency p50 {stats['latency_p50_ms']:.0f} ms, p95 {stats['latency_p95_ms']:.0f} ms")
+
+if __name__ == "__main__":
+    main()
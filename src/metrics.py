@@ -0,0 +1,304 @@
+"""
+Metrics for Emotion Recognition System
+
+This module provides lightweight, thread-safe counters, gauges and
+histograms with a Prometheus text exposition, for the inference service
+and other long-running components, plus sampled per-stage timing of the
+prediction hot path.
+"""
+
+import bisect
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+# Finer low end for per-stage timings, some of which take microseconds
+STAGE_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005) + DEFAULT_LATENCY_BUCKETS
+
+# Hot-path stages, in pipeline order
+STAGES = ("decode", "detect", "align", "preprocess", "forward")
+
+class Counter:
+    """
+    Monotonically increasing counter, optionally split by one label
+    """
+    
+    def __init__(self, name: str, description: str, label: Optional[str] = None):
+        self.name = name
+        self.description = description
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, label_value: str = ""):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0.0) + amount
+    
+    def values(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for label_value, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_labels(self.label, label_value)} {value}")
+        return lines
+
+class Gauge:
+    """
+    Point-in-time value read from a callback at scrape time
+    """
+    
+    def __init__(self, name: str, description: str, read: Callable[[], float]):
+        self.name = name
+        self.description = description
+        self.read = read
+    
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} gauge",
+                f"{self.name} {float(self.read())}"]
+
+class Histogram:
+    """
+    Fixed-bucket histogram with approximate quantiles, optionally split by one label
+    """
+    
+    def __init__(self, name: str, description: str,
+                 buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS, label: Optional[str] = None):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.label = label
+        # label value -> [bucket counts, sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, label_value: str = ""):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def label_values(self) -> List[str]:
+        with self._lock:
+            return sorted(self._series)
+    
+    def quantile(self, q: float, label_value: str = "") -> float:
+        """
+        Estimate a quantile by linear interpolation inside its bucket
+        
+        Args:
+            q: Quantile in [0, 1]
+            label_value: Series to read when the histogram is labelled
+            
+        Returns:
+            Estimated value (the largest finite bound for the overflow bucket)
+        """
+        counts, _, total = self._read(label_value)
+        if total == 0:
+            return 0.0
+        
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= rank and count > 0:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+    
+    def snapshot(self, label_value: str = "") -> Dict:
+        _, total, count = self._read(label_value)
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "p50": self.quantile(0.5, label_value),
+            "p95": self.quantile(0.95, label_value),
+            "p99": self.quantile(0.99, label_value)
+        }
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for label_value in self.label_values() or [""]:
+            counts, total, count = self._read(label_value)
+            prefix = _labels(self.label, label_value)[1:-1]
+            prefix = prefix + "," if prefix else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{_labels(self.label, label_value)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label, label_value)} {count}")
+        return lines
+    
+    def _read(self, label_value: str) -> Tuple[List[int], float, int]:
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                return [0] * (len(self.buckets) + 1), 0.0, 0
+            return list(series[0]), series[1], series[2]
+
+def render_prometheus(metrics: Iterable) -> str:
+    """
+    Render metrics in the Prometheus text exposition format
+    
+    Args:
+        metrics: Counter, Gauge or Histogram objects
+        
+    Returns:
+        Exposition text
+    """
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def _labels(label: Optional[str], value: str) -> str:
+    if not label:
+        return ""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'{{{label}="{escaped}"}}'
+
+class StageTimer:
+    """
+    Times the stages of one sampled unit of work into a PipelineMetrics
+    """
+    
+    def __init__(self, histogram: Optional[Histogram]):
+        self.histogram = histogram
+    
+    @property
+    def enabled(self) -> bool:
+        return self.histogram is not None
+    
+    @contextmanager
+    def stage(self, name: str):
+        if self.histogram is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram.observe(time.perf_counter() - start, name)
+    
+    def record(self, name: str, seconds: float):
+        if self.histogram is not None:
+            self.histogram.observe(seconds, name)
+
+# Shared timer for unsampled work, so skipping costs one attribute check
+NULL_TIMER = StageTimer(None)
+
+class PipelineMetrics:
+    """
+    Per-stage latency histograms and error counts for the prediction path
+    
+    Stage timings are sampled: each call to sample() decides, with
+    probability sample_rate, whether the whole unit of work it covers is
+    timed. Errors are always counted.
+    """
+    
+    def __init__(self, sample_rate: float = 1.0, prefix: str = "emotion"):
+        self.sample_rate = sample_rate
+        self.stage_seconds = Histogram(f"{prefix}_stage_seconds", "Time spent per pipeline stage",
+                                       STAGE_LATENCY_BUCKETS, label="stage")
+        self.errors = Counter(f"{prefix}_errors_total", "Failed predictions by exception type", label="type")
+        self._timer = StageTimer(self.stage_seconds)
+    
+    def sample(self) -> StageTimer:
+        """
+        Decide whether to time the next unit of work
+        
+        Returns:
+            A recording timer, or NULL_TIMER when this unit is not sampled
+        """
+        if self.sample_rate >= 1.0 or (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return self._timer
+        return NULL_TIMER
+    
+    def record_error(self, error: Exception):
+        self.errors.inc(label_value=type(error).__name__)
+    
+    def snapshot(self) -> Dict:
+        """
+        Current stage latencies and error counts
+        
+        Returns:
+            Dict with per-stage histogram snapshots, errors by type and the sample rate
+        """
+        return {
+            "sample_rate": self.sample_rate,
+            "stages": {stage: self.stage_seconds.snapshot(stage)
+                       for stage in self.stage_seconds.label_values()},
+            "errors": self.errors.values()
+        }
+    
+    def metrics(self) -> List:
+        return [self.stage_seconds, self.errors]
+
+_pipeline_metrics = None
+_pipeline_metrics_lock = threading.Lock()
+
+def get_pipeline_metrics() -> PipelineMetrics:
+    """
+    Return the process-wide pipeline metrics
+    
+    The sample rate comes from EMOTION_METRICS_SAMPLE_RATE (default 1.0).
+    
+    Returns:
+        Shared PipelineMetrics instance
+    """
+    global _pipeline_metrics
+    if _pipeline_metrics is None:
+        with _pipeline_metrics_lock:
+            if _pipeline_metrics is None:
+                rate = float(os.environ.get("EMOTION_METRICS_SAMPLE_RATE", "1.0"))
+                _pipeline_metrics = PipelineMetrics(sample_rate=rate)
+    return _pipeline_metrics
+
+def start_metrics_server(port: int, metrics: Callable[[], Iterable], host: str = "0.0.0.0"):
+    """
+    Serve /metrics from a daemon thread, for processes without a web server
+    
+    Args:
+        port: Port to listen on
+        metrics: Callable returning the metrics to render on each scrape
+        host: Interface to bind
+        
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus(metrics()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
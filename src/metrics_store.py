@@ -0,0 +1,324 @@
+"""
+Evaluation Metrics Store for Emotion Recognition System
+
+This module keeps evaluation results as confusion matrices per model
+version and time bucket in a SQLite file. Evaluation jobs add their counts
+to the matching buckets, so the store is materialized incrementally, and a
+query over any time range sums a few hundred small matrices instead of
+rescanning raw predictions. Metrics are not additive but confusion counts
+are, so every metric is derived from the summed matrix at read time.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .evaluation import ConfusionMatrix, matrix_scores
+
+DEFAULT_STORE_PATH = os.environ.get("EMOTION_METRICS_STORE", os.path.join("metrics", "evaluation.db"))
+DAY_SECONDS = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS confusion (
+    model_version TEXT NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    labels TEXT NOT NULL,
+    counts BLOB NOT NULL,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (model_version, bucket_start)
+) WITHOUT ROWID
+"""
+
+def bucketed_matrices(y_true, y_pred, timestamps, bucket_seconds: int = DAY_SECONDS,
+                      labels: Optional[Sequence[str]] = None) -> Dict[int, ConfusionMatrix]:
+    """
+    Split label pairs into one confusion matrix per time bucket
+    
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        timestamps: Unix seconds or numpy datetime64 values, one per pair
+        bucket_seconds: Bucket width
+        labels: Class labels (defaults to the repository's emotion order)
+    
+    Returns:
+        Bucket start (Unix seconds) -> ConfusionMatrix
+    """
+    template = ConfusionMatrix(labels)
+    true_codes = template.encode(y_true)
+    pred_codes = template.encode(y_pred)
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind == "M":
+        timestamps = timestamps.astype("datetime64[s]").astype(np.int64)
+    starts = (timestamps.astype(np.int64) // bucket_seconds) * bucket_seconds
+    
+    valid = (true_codes >= 0) & (pred_codes >= 0)
+    buckets, bucket_index = np.unique(starts, return_inverse=True)
+    classes = len(template.labels)
+    cells = classes * classes
+    # One bincount over (bucket, true, pred) covers every bucket at once
+    flat = bucket_index[valid] * cells + true_codes[valid] * classes + pred_codes[valid]
+    counts = np.bincount(flat, minlength=len(buckets) * cells).reshape(len(buckets), classes, classes)
+    skipped = np.bincount(bucket_index[~valid], minlength=len(buckets))
+    
+    matrices = {}
+    for i, start in enumerate(buckets.tolist()):
+        confusion = ConfusionMatrix(template.labels)
+        confusion.matrix = counts[i].astype(np.int64)
+        confusion.skipped = int(skipped[i])
+        matrices[start] = confusion
+    return matrices
+
+class MetricsStore:
+    """
+    Confusion matrices by model version and time bucket, in SQLite
+    """
+    
+    def __init__(self, path: str = DEFAULT_STORE_PATH, bucket_seconds: int = DAY_SECONDS):
+        self.path = path
+        self.bucket_seconds = bucket_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the store usable from Streamlit's threads
+        return sqlite3.connect(self.path, timeout=30)
+    
+    def bucket_start(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds) * self.bucket_seconds
+    
+    def record(self, confusion: ConfusionMatrix, model_version: str,
+               timestamp: Optional[float] = None) -> int:
+        """
+        Add an evaluation's counts to its time bucket
+        
+        Args:
+            confusion: Matrix from an evaluation job
+            model_version: Version of the model that made the predictions
+            timestamp: When the predictions were made (defaults to now)
+        
+        Returns:
+            Start of the bucket the counts went into
+        """
+        start = self.bucket_start(time.time() if timestamp is None else timestamp)
+        self.record_buckets({start: confusion}, model_version)
+        return start
+    
+    def record_buckets(self, matrices: Dict[int, ConfusionMatrix], model_version: str):
+        """
+        Add several buckets' counts in one transaction
+        
+        Args:
+            matrices: Bucket start -> ConfusionMatrix, e.g. from bucketed_matrices
+            model_version: Version of the model that made the predictions
+        
+        Raises:
+            ValueError: If a bucket already holds counts over different labels
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for start, confusion in matrices.items():
+                labels = json.dumps(confusion.labels)
+                row = conn.execute(
+                    "SELECT labels, counts, skipped FROM confusion WHERE model_version = ? AND bucket_start = ?",
+                    (model_version, start)
+                ).fetchone()
+                counts = confusion.matrix.astype(np.int64)
+                skipped = confusion.skipped
+                if row is not None:
+                    if row[0] != labels:
+                        raise ValueError(f"Bucket {start} of {model_version} holds different labels")
+                    counts = counts + np.frombuffer(row[1], dtype=np.int64).reshape(counts.shape)
+                    skipped += row[2]
+                conn.execute(
+                    "INSERT OR REPLACE INTO confusion VALUES (?, ?, ?, ?, ?, ?)",
+                    (model_version, int(start), labels, counts.tobytes(), int(skipped), time.time())
+                )
+    
+    def model_versions(self) -> List[str]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT DISTINCT model_version FROM confusion ORDER BY model_version").fetchall()
+        return [row[0] for row in rows]
+    
+    def time_range(self, model_version: str) -> Optional[Tuple[int, int]]:
+        """
+        First and last bucket recorded for a model version
+        
+        Args:
+            model_version: Model version
+        
+        Returns:
+            (first bucket start, last bucket start), or None if nothing is stored
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT MIN(bucket_start), MAX(bucket_start) FROM confusion WHERE model_version = ?",
+                (model_version,)
+            ).fetchone()
+        return None if row[0] is None else (row[0], row[1])
+    
+    def buckets(self, model_version: str, start: Optional[float] = None,
+                end: Optional[float] = None) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per-bucket matrices in a time range
+        
+        Args:
+            model_version: Model version
+            start: Earliest bucket start to include (Unix seconds)
+            end: Exclusive upper bound on bucket start (Unix seconds)
+        
+        Returns:
+            (labels, bucket starts, (B, K, K) counts, skipped per bucket)
+        """
+        query = "SELECT bucket_start, labels, counts, skipped FROM confusion WHERE model_version = ?"
+        params = [model_version]
+        if start is not None:
+            query += " AND bucket_start >= ?"
+            params.append(int(start))
+        if end is not None:
+            query += " AND bucket_start < ?"
+            params.append(int(end))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query + " ORDER BY bucket_start", params).fetchall()
+        
+        if not rows:
+            return [], np.zeros(0, dtype=np.int64), np.zeros((0, 0, 0), dtype=np.int64), np.zeros(0, dtype=np.int64)
+        if len({row[1] for row in rows}) > 1:
+            raise ValueError(f"Buckets of {model_version} use different labels")
+        
+        labels = json.loads(rows[0][1])
+        classes = len(labels)
+        starts = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        counts = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.int64).reshape(len(rows), classes, classes)
+        skipped = np.fromiter((row[3] for row in rows), dtype=np.int64, count=len(rows))
+        return labels, starts, counts, skipped
+    
+    def query(self, model_version: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> ConfusionMatrix:
+        """
+        Confusion matrix summed over a time range
+        
+        Args:
+            model_version: Model version
+            start: Earliest bucket start to include (Unix seconds)
+            end: Exclusive upper bound on bucket start (Unix seconds)
+        
+        Returns:
+            ConfusionMatrix over the range (empty if nothing is stored)
+        """
+        labels, _, counts, skipped = self.buckets(model_version, start, end)
+        confusion = ConfusionMatrix(labels or None)
+        if len(counts):
+            confusion.matrix = counts.sum(axis=0)
+            confusion.skipped = int(skipped.sum())
+        return confusion
+    
+    def trend(self, model_version: str, start: Optional[float] = None, end: Optional[float] = None,
+              resolution_seconds: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Averaged metrics per bucket over a time range
+        
+        Args:
+            model_version: Model version
+            start: Earliest bucket start to include (Unix seconds)
+            end: Exclusive upper bound on bucket start (Unix seconds)
+            resolution_seconds: Re-bucket to this width first, e.g. a week
+        
+        Returns:
+            Arrays of bucket_start, accuracy, precision, recall, f1_score and support
+        """
+        _, starts, counts, _ = self.buckets(model_version, start, end)
+        if resolution_seconds and len(starts):
+            coarse = (starts // resolution_seconds) * resolution_seconds
+            starts, index = np.unique(coarse, return_inverse=True)
+            summed = np.zeros((len(starts),) + counts.shape[1:], dtype=np.int64)
+            np.add.at(summed, index, counts)
+            counts = summed
+        
+        scores = matrix_scores(counts) if len(starts) else {}
+        return {
+            "bucket_start": starts,
+            "accuracy": scores.get("accuracy", np.zeros(0)),
+            "precision": scores.get("precision", np.zeros(0)),
+            "recall": scores.get("recall", np.zeros(0)),
+            "f1_score": scores.get("f1_score", np.zeros(0)),
+            "support": scores.get("total", np.zeros(0)).astype(np.int64)
+        }
+
+def evaluate_parquet_buckets(path: str, time_column: str, true_column: str = "label",
+                             pred_column: str = "dominant_emotion", bucket_seconds: int = DAY_SECONDS,
+                             labels: Optional[Sequence[str]] = None) -> Dict[int, ConfusionMatrix]:
+    """
+    Per-bucket confusion matrices over one Parquet file, a batch at a time
+    
+    Args:
+        path: Parquet file with label and timestamp columns
+        time_column: Column holding prediction times (timestamp or Unix seconds)
+        true_column: Column holding the true labels
+        pred_column: Column holding the predicted labels
+        bucket_seconds: Bucket width
+        labels: Class labels (defaults to the repository's emotion order)
+    
+    Returns:
+        Bucket start -> ConfusionMatrix
+    """
+    import pyarrow.parquet as pq
+    
+    matrices = {}
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(columns=[true_column, pred_column, time_column]):
+        for start, confusion in bucketed_matrices(batch.column(0).to_numpy(zero_copy_only=False),
+                                                  batch.column(1).to_numpy(zero_copy_only=False),
+                                                  batch.column(2).to_numpy(zero_copy_only=False),
+                                                  bucket_seconds, labels).items():
+            if start in matrices:
+                matrices[start].merge(confusion)
+            else:
+                matrices[start] = confusion
+    return matrices
+
+def evaluate_shard_buckets(paths: Sequence[str], time_column: str, true_column: str = "label",
+                           pred_column: str = "dominant_emotion", bucket_seconds: int = DAY_SECONDS,
+                           labels: Optional[Sequence[str]] = None, workers: int = 1) -> Dict[int, ConfusionMatrix]:
+    """
+    Per-bucket confusion matrices over Parquet shards, evaluated in parallel
+    
+    Args:
+        paths: Parquet files
+        time_column: Column holding prediction times
+        true_column: Column holding the true labels
+        pred_column: Column holding the predicted labels
+        bucket_seconds: Bucket width
+        labels: Class labels (defaults to the repository's emotion order)
+        workers: Processes to spread the shards across
+    
+    Returns:
+        Bucket start -> ConfusionMatrix merged across shards
+    """
+    count = len(paths)
+    arguments = ([time_column] * count, [true_column] * count, [pred_column] * count,
+                 [bucket_seconds] * count, [labels] * count)
+    if workers <= 1 or count <= 1:
+        shards = list(map(evaluate_parquet_buckets, paths, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, count), mp_context=get_context("spawn")) as executor:
+            shards = list(executor.map(evaluate_parquet_buckets, paths, *arguments))
+    
+    merged = {}
+    for shard in shards:
+        for start, confusion in shard.items():
+            if start in merged:
+                merged[start].merge(confusion)
+            else:
+                merged[start] = confusion
+    return merged
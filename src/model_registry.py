@@ -0,0 +1,304 @@
+"""
+Model Registry for Emotion Recognition System
+
+This module keeps a single loaded instance of each DeepFace model per
+process and warms it up with a dummy inference, so the first user request
+after a cold start does not pay for weight loading and graph tracing.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+# DeepFace task for each model that can be registered
+MODEL_TASKS = {
+    "Emotion": "facial_attribute",
+    "Age": "facial_attribute",
+    "Gender": "facial_attribute",
+    "Race": "facial_attribute",
+}
+
+def canonical_model_name(model_name: str) -> str:
+    """
+    Map user-facing names such as "emotion" onto DeepFace model names
+    
+    Args:
+        model_name: Model name in any case
+    
+    Returns:
+        DeepFace model name
+    """
+    for name in MODEL_TASKS:
+        if name.lower() == model_name.lower():
+            return name
+    return model_name
+
+def load_deepface():
+    """
+    Import DeepFace on first use, since importing it loads TensorFlow
+    
+    Returns:
+        The DeepFace module
+    """
+    from deepface import DeepFace
+    return DeepFace
+
+def model_version(model_name: str) -> str:
+    """
+    Identify the weights behind a model name, for cache invalidation
+    
+    Args:
+        model_name: Model name in any case
+    
+    Returns:
+        Version string that changes whenever DeepFace ships new weights
+    """
+    from importlib import metadata
+    
+    try:
+        deepface_version = metadata.version("deepface")
+    except metadata.PackageNotFoundError:
+        deepface_version = "unknown"
+    return f"{canonical_model_name(model_name)}@deepface-{deepface_version}"
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded and warmed-up models
+    """
+    
+    def __init__(self):
+        self._models = {}
+        self._timings = {}
+        self._timed_detectors = set()
+        self._lock = threading.Lock()
+    
+    def get(self, model_name: str = "Emotion", warm_up: bool = True):
+        """
+        Return the loaded model client, loading it on first use
+        
+        Args:
+            model_name: Model name (e.g. "emotion" or "Emotion")
+            warm_up: Run a dummy inference right after loading
+        
+        Returns:
+            DeepFace model client
+        """
+        name = canonical_model_name(model_name)
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self._load(name, warm_up)
+        return self._models[name]
+    
+    def warm_up_detector(self, detector_backend: str = "opencv"):
+        """
+        Build a face detector by running it once on a blank image
+        
+        Args:
+            detector_backend: DeepFace detector backend
+        """
+        key = f"detector:{detector_backend}"
+        if key in self._timings or detector_backend == "skip":
+            return
+        
+        with self._lock:
+            if key in self._timings:
+                return
+            start = time.perf_counter()
+            load_deepface().extract_faces(
+                np.zeros((64, 64, 3), dtype=np.uint8),
+                detector_backend=detector_backend,
+                enforce_detection=False
+            )
+            self._timings[key] = {
+                "load_seconds": time.perf_counter() - start,
+                "warmup_seconds": 0.0
+            }
+    
+    def time_detector(self, detector_backend: str = "opencv"):
+        """
+        Time the DeepFace detector's own detect_faces calls
+        
+        DeepFace.extract_faces detects faces and then aligns each one in a
+        single call. Wrapping the cached detector instance lets callers
+        split that call into detection and alignment; see
+        start_detector_timing. The wrapper only reads the clock while this
+        thread has a sample active, so unsampled calls pay nothing. DeepFace
+        versions without a patchable detector are left alone, and
+        pop_detector_seconds then returns None.
+        
+        Args:
+            detector_backend: DeepFace detector backend
+        """
+        if detector_backend in self._timed_detectors or detector_backend == "skip":
+            return
+        
+        with self._lock:
+            if detector_backend in self._timed_detectors:
+                return
+            # Only try once, whether or not the detector can be wrapped
+            self._timed_detectors.add(detector_backend)
+            load_deepface()
+            try:
+                from deepface.modules import modeling
+                detector = modeling.build_model(task="face_detector", model_name=detector_backend)
+            except (ImportError, AttributeError, TypeError) as e:
+                print(f"Detector timing unavailable for {detector_backend}: {e}")
+                return
+            detect_faces = getattr(detector, "detect_faces", None)
+            if not callable(detect_faces):
+                return
+            
+            def timed_detect_faces(*args, **kwargs):
+                if not getattr(_detector_clock, "active", False):
+                    return detect_faces(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return detect_faces(*args, **kwargs)
+                finally:
+                    _detector_clock.seconds = time.perf_counter() - start
+            
+            try:
+                detector.detect_faces = timed_detect_faces
+            except AttributeError:
+                # e.g. a detector class with __slots__
+                pass
+    
+    def get_backend(self, backend: str = "keras", model_dir: Optional[str] = None,
+                    model_name: str = "emotion"):
+        """
+        Return a shared inference backend, loading and warming it on first use
+        
+        Args:
+            backend: Backend name (see src.backends.BACKENDS)
+            model_dir: Directory with exported models
+            model_name: Registry model name for the keras backend
+        
+        Returns:
+            EmotionBackend instance
+        """
+        key = f"backend:{backend}:{model_dir or ''}"
+        instance = self._models.get(key)
+        if instance is not None:
+            return instance
+        
+        from .backends import INPUT_SHAPE, load_backend
+        if backend == "keras":
+            # Load outside our lock; get() takes it for the model itself
+            self.get(model_name)
+        with self._lock:
+            if key not in self._models:
+                start = time.perf_counter()
+                instance = load_backend(backend, model_dir, model_name)
+                load_seconds = time.perf_counter() - start
+                
+                start = time.perf_counter()
+                instance.predict(np.zeros((2,) + INPUT_SHAPE, dtype=np.float32))
+                self._timings[key] = {
+                    "load_seconds": load_seconds,
+                    "warmup_seconds": time.perf_counter() - start
+                }
+                self._models[key] = instance
+        return self._models[key]
+    
+    def is_loaded(self, model_name: str) -> bool:
+        return canonical_model_name(model_name) in self._models
+    
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        """
+        Loading and warm-up durations per registered model
+        
+        Returns:
+            Mapping of model name to load_seconds and warmup_seconds
+        """
+        return {name: dict(timing) for name, timing in self._timings.items()}
+    
+    def _load(self, name: str, warm_up: bool):
+        start = time.perf_counter()
+        client = load_deepface().build_model(model_name=name, task=MODEL_TASKS.get(name, "facial_attribute"))
+        load_seconds = time.perf_counter() - start
+        
+        warmup_seconds = 0.0
+        if warm_up:
+            start = time.perf_counter()
+            self._warm_up(client)
+            warmup_seconds = time.perf_counter() - start
+        
+        self._timings[name] = {
+            "load_seconds": load_seconds,
+            "warmup_seconds": warmup_seconds
+        }
+        print(f"Loaded {name} model in {load_seconds:.2f}s (warm-up {warmup_seconds:.2f}s)")
+        return client
+    
+    def _warm_up(self, client):
+        # Trace both the single-image call path and the batched
+        # predict_on_batch path that DeepFace and batch_predict use
+        input_shape = tuple(dim or 1 for dim in client.model.input_shape[1:])
+        client.model(np.zeros((1,) + input_shape, dtype=np.float32), training=False)
+        client.model.predict_on_batch(np.zeros((2,) + input_shape, dtype=np.float32))
+
+_registry = None
+_registry_lock = threading.Lock()
+_detector_clock = threading.local()
+
+def start_detector_timing():
+    """
+    Time this thread's detector calls until pop_detector_seconds
+    """
+    _detector_clock.seconds = None
+    _detector_clock.active = True
+
+def pop_detector_seconds() -> Optional[float]:
+    """
+    Take the duration of this thread's last timed detector call and stop timing
+    
+    Returns:
+        Seconds spent in the detector, or None if nothing was timed
+    """
+    seconds = getattr(_detector_clock, "seconds", None)
+    _detector_clock.seconds = None
+    _detector_clock.active = False
+    return seconds
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Return the process-wide model registry
+    
+    Returns:
+        Shared ModelRegistry instance
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+def warm_up_models(model_names: Iterable[str] = ("Emotion",),
+                   detector_backends: Iterable[str] = ("opencv",)) -> Dict[str, Dict[str, float]]:
+    """
+    Load and warm up models and detectors at startup
+    
+    Args:
+        model_names: Models to load
+        detector_backends: Face detectors to build
+    
+    Returns:
+        Loading and warm-up durations per model
+    """
+    registry = get_model_registry()
+    for model_name in model_names:
+        registry.get(model_name)
+    for detector_backend in detector_backends:
+        registry.warm_up_detector(detector_backend)
+    return registry.timings()
+
+if __name__ == "__main__":
+    # Used at image build time to download weights ahead of the first request
+    for name, timing in warm_up_models().items():
+        print(f"{name}: load {timing['load_seconds']:.2f}s, warm-up {timing['warmup_seconds']:.2f}s")
@@ -6,157 +6,554 @@ predictions, and evaluation.
 """
 
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Tuple, Optional
-from deepface import DeepFace
-import cv2
-from PIL import Image
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import json
+import threading
+import time
+
+# cv2, pandas, DeepFace and the ONNX/TFLite backends are imported where
+# they are first needed, so importing this module stays cheap for pages
+# that never run inference
+from .evaluation import ConfusionMatrix
+from .insights import EmotionAggregator
+from .metrics import NULL_TIMER, PipelineMetrics, StageTimer, get_pipeline_metrics
+from .model_registry import (
+    get_model_registry, load_deepface, model_version, pop_detector_seconds, start_detector_timing
+)
+from .near_duplicates import NearDuplicateIndex
+from .prediction_batch import MODEL_EMOTION_LABELS, PredictionBatch
+from .prediction_cache import PredictionCache
+
 
 class EmotionPredictor:
     """
     Handles emotion prediction using trained models
     """
     
-    def __init__(self, model_name: str = "emotion"):
+    def __init__(self, model_name: str = "emotion", detector_backend: str = "opencv",
+                 max_batch_size: int = 32, cache: Optional[PredictionCache] = None,
+                 backend: str = "keras", model_dir: Optional[str] = None,
+                 metrics: Optional[PipelineMetrics] = None,
+                 dedup: Optional[NearDuplicateIndex] = None):
         self.model_name = model_name
+        self.detector_backend = detector_backend
+        self.max_batch_size = max_batch_size
+        self.cache = cache
+        self.dedup = dedup
+        self.backend = backend
+        self.model_dir = model_dir
+        self.metrics = metrics or get_pipeline_metrics()
         self.emotions = ['happy', 'sad', 'angry', 'surprise', 'fear', 'disgust', 'neutral']
+        self._backend = None
+        self._detector = None
+        # Per-thread count of images sent through face detection
+        self._model_work = threading.local()
         
+        if self.cache is not None:
+            self.cache.set_model_version(self._model_version())
+        if self.dedup is not None:
+            self.dedup.set_model_version(self._model_version())
+    
     def predict_emotion(self, image: np.ndarray) -> Dict:
         """
         Predict emotion from image
         
         Args:
             image: Input image as numpy array
-            
+        
         Returns:
             Emotion prediction results
         """
-        try:
-            result = DeepFace.analyze(
-                image, 
-                actions=['emotion'], 
-                enforce_detection=False
-            )
-            
-            emotions = result[0]["emotion"]
-            dominant_emotion = max(emotions, key=emotions.get)
-            
-            return {
-                "emotions": emotions,
-                "dominant_emotion": dominant_emotion,
-                "confidence": emotions[dominant_emotion],
-                "success": True
-            }
-        except Exception as e:
-            return {
-                "emotions": {},
-                "dominant_emotion": None,
-                "confidence": 0,
-                "success": False,
-                "error": str(e)
-            }
+        # Same detect -> preprocess -> forward path as batch_predict, so each
+        # stage is timed separately instead of inside one DeepFace.analyze call
+        return self.batch_predict([image])[0]
     
-    def batch_predict(self, images: List[np.ndarray]) -> List[Dict]:
+    def batch_predict(self, images: List[np.ndarray], batch_size: Optional[int] = None) -> List[Dict]:
         """
         Predict emotions for multiple images
         
+        Cached images are answered from the cache; the rest are scored in
+        one predict_batch call.
+        
         Args:
             images: List of images
-            
+            batch_size: Maximum faces per forward pass (defaults to max_batch_size)
+        
         Returns:
             List of prediction results
         """
-        results = []
-        for image in images:
-            result = self.predict_emotion(image)
-            results.append(result)
+        results: List[Optional[Dict]] = [None] * len(images)
+        cache_keys: List[Optional[str]] = [None] * len(images)
+        misses = []
+        
+        for index, image in enumerate(images):
+            try:
+                cache_keys[index] = self._cache_key(image)
+            except Exception:
+                # Unhashable input still gets its own failed result from predict_batch
+                cache_keys[index] = None
+            if cache_keys[index] is not None:
+                cached = self.cache.get(cache_keys[index])
+                if cached is not None:
+                    results[index] = cached
+                    continue
+            misses.append(index)
+        
+        if misses:
+            fresh = self.predict_batch([images[index] for index in misses], batch_size)
+            for index, prediction in zip(misses, fresh):
+                results[index] = prediction
+                if cache_keys[index] is not None and prediction["success"]:
+                    self.cache.put(cache_keys[index], prediction)
+        
         return results
     
-    def get_emotion_insights(self, predictions: List[Dict]) -> Dict:
+    def predict_batch(self, images: List[np.ndarray], batch_size: Optional[int] = None) -> PredictionBatch:
         """
-        Generate insights from emotion predictions
+        Predict emotions for multiple images into a compact PredictionBatch
+        
+        Faces are detected and cropped per image, then stacked into
+        (N, 48, 48, 1) tensors so the emotion model runs once per batch
+        instead of once per image. The cache is not consulted. With a
+        near-duplicate index, images (or their dominant face crops) that
+        look like earlier ones reuse those probabilities.
         
         Args:
-            predictions: List of prediction results
+            images: List of images
+            batch_size: Maximum faces per forward pass (defaults to max_batch_size)
+        
+        Returns:
+            PredictionBatch with one row per image
+        """
+        batch_size = batch_size or self.max_batch_size
+        timer = self.metrics.sample()
+        probabilities = np.zeros((len(images), len(MODEL_EMOTION_LABELS)), dtype=np.float32)
+        success = np.zeros(len(images), dtype=bool)
+        errors = {}
+        pending_faces = []
+        pending_indices = []
+        dedup = self.dedup
+        image_hashes, face_hashes = {}, {}
+        # Images that got past the image-level lookup / faces that were forwarded
+        detected_indices, forwarded_indices = [], []
+        detect_seconds = forward_seconds = 0.0
+        
+        def flush():
+            nonlocal forward_seconds
+            start = time.perf_counter()
+            self._flush_batch(pending_faces, pending_indices, probabilities, success, errors, timer)
+            forward_seconds += time.perf_counter() - start
+        
+        for index, image in enumerate(images):
+            try:
+                if dedup is not None:
+                    image_hashes[index] = dedup.hashes(image)
+                    reused = dedup.lookup("dominant", image_hashes[index])
+                    if reused is not None:
+                        probabilities[index], success[index] = reused, True
+                        continue
+                
+                start = time.perf_counter()
+                faces = self.detect_faces(image, timer)
+                detect_seconds += time.perf_counter() - start
+                detected_indices.append(index)
+                if dedup is not None:
+                    face_hashes[index] = dedup.hashes(faces[0]["face"])
+                    reused = dedup.lookup("face", face_hashes[index])
+                    if reused is not None:
+                        probabilities[index], success[index] = reused, True
+                        continue
+                
+                with timer.stage("preprocess"):
+                    pending_faces.append(face_to_model_input(faces[0]["face"]))
+                pending_indices.append(index)
+                forwarded_indices.append(index)
+            except Exception as e:
+                errors[index] = self._record_error(e)
+                continue
             
+            if len(pending_faces) >= batch_size:
+                flush()
+                pending_faces, pending_indices = [], []
+        
+        if pending_faces:
+            flush()
+        
+        if dedup is not None:
+            for index in forwarded_indices:
+                if success[index]:
+                    dedup.add("face", face_hashes[index], probabilities[index].copy())
+            for index in detected_indices:
+                if success[index]:
+                    dedup.add("dominant", image_hashes[index], probabilities[index].copy())
+            if forwarded_indices:
+                dedup.record_miss_cost("face", forward_seconds, len(forwarded_indices))
+                dedup.record_miss_cost("dominant", detect_seconds + forward_seconds, len(detected_indices))
+        
+        return PredictionBatch.from_probabilities(probabilities, success, errors)
+    
+    def predict_faces(self, image: np.ndarray) -> Dict:
+        """
+        Predict emotions for every face in an image
+        
+        Detection runs once and all detected faces are classified in a
+        single forward pass (chunked by max_batch_size).
+        
+        Args:
+            image: Input image as numpy array
+        
         Returns:
-            Insights and statistics
+            Per-face regions and emotion vectors plus aggregate insights
         """
-        if not predictions:
-            return {"error": "No predictions provided"}
+        return self.batch_predict_faces([image])[0]
+    
+    def batch_predict_faces(self, images: List[np.ndarray]) -> List[Dict]:
+        """
+        Predict emotions for every face in several images
+        
+        Faces from all images share the same forward passes, chunked by
+        max_batch_size. With a near-duplicate index, an image that looks
+        like an earlier one gets a copy of its result marked
+        "near_duplicate", and face crops that look like earlier ones skip
+        the model.
+        
+        Args:
+            images: List of images
         
-        # Count emotions
-        emotion_counts = {emotion: 0 for emotion in self.emotions}
-        total_confidence = 0
-        successful_predictions = 0
+        Returns:
+            List of predict_faces results in input order
+        """
+        timer = self.metrics.sample()
+        results: List[Optional[Dict]] = [None] * len(images)
+        cache_keys: List[Optional[str]] = [None] * len(images)
+        detections = {}
+        tensors = []
+        dedup = self.dedup
+        image_hashes = {}
+        # Per detected image, the reused probabilities of each face (None
+        # when the face goes through the model) and hashes of forwarded faces
+        reused_rows = {}
+        face_hashes = []
+        detect_seconds = 0.0
         
-        for pred in predictions:
-            if pred["success"]:
-                emotion_counts[pred["dominant_emotion"]] += 1
-                total_confidence += pred["confidence"]
-                successful_predictions += 1
+        for index, image in enumerate(images):
+            try:
+                cache_keys[index] = self._cache_key(image, "faces")
+                if cache_keys[index] is not None:
+                    cached = self.cache.get(cache_keys[index])
+                    if cached is not None:
+                        results[index] = cached
+                        cache_keys[index] = None
+                        continue
+                
+                if dedup is not None:
+                    image_hashes[index] = dedup.hashes(image)
+                    reused = dedup.lookup("faces", image_hashes[index])
+                    if reused is not None:
+                        # Regions belong to the earlier image; map them onto this one
+                        result = scale_face_regions(reused["result"], reused["shape"], image.shape[:2])
+                        result["near_duplicate"] = True
+                        results[index] = result
+                        continue
+                
+                start = time.perf_counter()
+                detected = [face for face in self.detect_faces(image, timer)
+                            if face["face"].shape[0] > 0 and face["face"].shape[1] > 0]
+                detect_seconds += time.perf_counter() - start
+                rows = [None] * len(detected)
+                hashes = []
+                if dedup is not None:
+                    for position, face in enumerate(detected):
+                        face_hash = dedup.hashes(face["face"])
+                        rows[position] = dedup.lookup("face", face_hash)
+                        if rows[position] is None:
+                            hashes.append(face_hash)
+                with timer.stage("preprocess"):
+                    face_tensors = [face_to_model_input(face["face"])
+                                    for face, row in zip(detected, rows) if row is None]
+            except Exception as e:
+                results[index] = self._failed_faces(e)
+                continue
+            detections[index] = detected
+            reused_rows[index] = rows
+            face_hashes.extend(hashes)
+            tensors.extend(face_tensors)
         
-        # Calculate statistics
-        avg_confidence = total_confidence / successful_predictions if successful_predictions > 0 else 0
-        most_common_emotion = max(emotion_counts, key=emotion_counts.get)
+        try:
+            forward_start = time.perf_counter()
+            batch = np.stack(tensors) if tensors else np.zeros((0, 48, 48, 1), dtype=np.float32)
+            with timer.stage("forward"):
+                probabilities = [
+                    self.predict_tensor(batch[start:start + self.max_batch_size])
+                    for start in range(0, len(batch), self.max_batch_size)
+                ]
+            probabilities = np.concatenate(probabilities) if probabilities else np.zeros((0, 7))
+            forward_seconds = time.perf_counter() - forward_start
+        except Exception as e:
+            for index in detections:
+                results[index] = self._failed_faces(e)
+            return results
+        
+        offset = 0
+        for index, detected in detections.items():
+            faces = []
+            for face, row in zip(detected, reused_rows[index]):
+                if row is None:
+                    row = probabilities[offset]
+                    offset += 1
+                prediction = self.format_prediction(row)
+                area = face["facial_area"]
+                prediction["region"] = {key: int(area[key]) for key in ("x", "y", "w", "h")}
+                prediction["face_confidence"] = float(face.get("confidence") or 0)
+                faces.append(prediction)
+            
+            results[index] = {
+                "faces": faces,
+                "face_count": len(faces),
+                "insights": self.get_emotion_insights(faces),
+                "success": True
+            }
+            if dedup is not None:
+                dedup.add("faces", image_hashes[index],
+                          {"shape": images[index].shape[:2], "result": results[index]})
+            if cache_keys[index] is not None:
+                self.cache.put(cache_keys[index], results[index])
+        
+        if dedup is not None:
+            for face_hash, row in zip(face_hashes, probabilities):
+                dedup.add("face", face_hash, row.copy())
+            if len(tensors):
+                dedup.record_miss_cost("face", forward_seconds, len(tensors))
+            if detections:
+                dedup.record_miss_cost("faces", detect_seconds + forward_seconds, len(detections))
+        
+        return results
+    
+    def model_images(self) -> int:
+        """
+        Images the calling thread has run through the model so far
+        
+        Cache and near-duplicate hits skip detection and are not counted,
+        so the difference across a call tells model work from cheap hits.
+        
+        Returns:
+            Count of images sent through face detection on this thread
+        """
+        return getattr(self._model_work, "images", 0)
+    
+    def detect_faces(self, image: np.ndarray, timer: StageTimer = NULL_TIMER) -> List[Dict]:
+        """
+        Detect and crop faces without running any attribute model
+        
+        Args:
+            image: Input image as numpy array
+            timer: Records "detect" and "align" stage timings when sampled
+        
+        Returns:
+            DeepFace face objects with uint8 crops in the input channel order
+        """
+        self._model_work.images = self.model_images() + 1
+        if self.backend != "keras" and self.detector_backend == "opencv":
+            # Same Haar cascade as DeepFace's opencv backend, without
+            # importing TensorFlow (faces are not eye-aligned)
+            if self._detector is None:
+                from .backends import OpenCVFaceDetector
+                self._detector = OpenCVFaceDetector()
+            with timer.stage("detect"):
+                return self._detector.extract_faces(image)
+        
+        deepface = load_deepface()
+        if timer.enabled:
+            get_model_registry().time_detector(self.detector_backend)
+            start_detector_timing()
+        start = time.perf_counter()
+        try:
+            faces = deepface.extract_faces(
+                image,
+                detector_backend=self.detector_backend,
+                enforce_detection=False,
+                align=True,
+                color_face="bgr",
+                normalize_face=False
+            )
+        finally:
+            # Always stop timing, so later unsampled calls stay untimed
+            detect_seconds = pop_detector_seconds()
+        if timer.enabled:
+            # extract_faces detects then aligns; whatever the detector
+            # itself did not spend is alignment and cropping
+            elapsed = time.perf_counter() - start
+            if detect_seconds is None:
+                timer.record("detect", elapsed)
+            else:
+                timer.record("detect", detect_seconds)
+                timer.record("align", max(elapsed - detect_seconds, 0.0))
+        return faces
+    
+    def predict_tensor(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run a single forward pass of the emotion model
+        
+        Args:
+            batch: Preprocessed faces of shape (N, 48, 48, 1)
+        
+        Returns:
+            Softmax probabilities of shape (N, 7) in MODEL_EMOTION_LABELS order
+        """
+        return self._get_backend().predict(batch)
+    
+    def _cache_key(self, image: np.ndarray, mode: str = "dominant") -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(image, mode, self.detector_backend, self._model_version())
+    
+    def _model_version(self) -> str:
+        return f"{model_version(self.model_name)}/{self.backend}"
+    
+    def _get_backend(self):
+        if self._backend is None:
+            self._backend = get_model_registry().get_backend(self.backend, self.model_dir, self.model_name)
+        return self._backend
+    
+    def _flush_batch(self, faces: List[np.ndarray], indices: List[int], probabilities: np.ndarray,
+                     success: np.ndarray, errors: Dict, timer: StageTimer = NULL_TIMER):
+        try:
+            with timer.stage("forward"):
+                probabilities[indices] = self.predict_tensor(np.stack(faces))
+            success[indices] = True
+        except Exception as e:
+            for index in indices:
+                errors[index] = self._record_error(e)
+    
+    def format_prediction(self, probabilities: np.ndarray) -> Dict:
+        """
+        Turn one row of model probabilities into a prediction result
+        
+        Args:
+            probabilities: Softmax output in MODEL_EMOTION_LABELS order
+        
+        Returns:
+            Prediction dict in the predict_emotion format
+        """
+        # Same percentage scaling DeepFace.analyze applies
+        total = float(np.sum(probabilities))
+        emotions = {
+            label: 100 * float(p) / total
+            for label, p in zip(MODEL_EMOTION_LABELS, probabilities)
+        }
+        dominant_emotion = max(emotions, key=emotions.get)
         
         return {
-            "total_predictions": len(predictions),
-            "successful_predictions": successful_predictions,
-            "success_rate": successful_predictions / len(predictions),
-            "emotion_distribution": emotion_counts,
-            "most_common_emotion": most_common_emotion,
-            "average_confidence": avg_confidence
+            "emotions": emotions,
+            "dominant_emotion": dominant_emotion,
+            "confidence": emotions[dominant_emotion],
+            "success": True
         }
+    
+    def _failed_faces(self, error: Exception) -> Dict:
+        self.metrics.record_error(error)
+        return {
+            "faces": [],
+            "face_count": 0,
+            "insights": {"error": str(error)},
+            "success": False,
+            "error": str(error),
+            "error_type": type(error).__name__
+        }
+    
+    def _record_error(self, error: Exception) -> Tuple[str, str]:
+        self.metrics.record_error(error)
+        return type(error).__name__, str(error)
+    
+    def get_emotion_insights(self, predictions) -> Dict:
+        """
+        Generate insights from emotion predictions
+        
+        Args:
+            predictions: List of prediction results or a PredictionBatch
+        
+        Returns:
+            Insights and statistics
+        """
+        aggregator = EmotionAggregator(self.emotions)
+        if isinstance(predictions, PredictionBatch):
+            return aggregator.update_batch(predictions).insights()
+        return aggregator.update_many(predictions).insights()
+    
+    def create_aggregator(self) -> EmotionAggregator:
+        """
+        Start an incremental aggregator over this predictor's emotions
+        
+        Returns:
+            Empty EmotionAggregator, mergeable across shards and processes
+        """
+        return EmotionAggregator(self.emotions)
 
 class ModelEvaluator:
     """
     Evaluates model performance and generates metrics
+    
+    Metrics come from a streaming ConfusionMatrix, so y_true and y_pred can
+    also be fed in chunks via confusion_matrix().update() or evaluate_chunks.
     """
     
     def __init__(self):
         self.emotions = ['happy', 'sad', 'angry', 'surprise', 'fear', 'disgust', 'neutral']
     
-    def calculate_metrics(self, y_true: List[str], y_pred: List[str]) -> Dict:
+    def confusion_matrix(self, y_true: Optional[Sequence] = None,
+                         y_pred: Optional[Sequence] = None) -> ConfusionMatrix:
+        """
+        Create a confusion matrix over self.emotions
+        
+        Args:
+            y_true: Optional first chunk of true labels
+            y_pred: Optional first chunk of predicted labels
+        
+        Returns:
+            ConfusionMatrix, mergeable across shards and processes
+        """
+        confusion = ConfusionMatrix(self.emotions)
+        if y_true is not None:
+            confusion.update(y_true, y_pred)
+        return confusion
+    
+    def evaluate_chunks(self, chunks: Iterable[Tuple[Sequence, Sequence]]) -> ConfusionMatrix:
+        """
+        Accumulate (y_true, y_pred) chunks without holding them all in memory
+        
+        Args:
+            chunks: Iterable of label pairs
+        
+        Returns:
+            ConfusionMatrix over all chunks
+        """
+        return self.confusion_matrix().update_chunks(chunks)
+    
+    def calculate_metrics(self, y_true: Sequence, y_pred: Sequence) -> Dict:
         """
         Calculate performance metrics
         
         Args:
             y_true: True labels
             y_pred: Predicted labels
-            
+        
         Returns:
             Performance metrics
         """
-        from sklearn.metrics import accuracy_score, precision_recall_fscore_support
-        
-        accuracy = accuracy_score(y_true, y_pred)
-        precision, recall, f1, support = precision_recall_fscore_support(
-            y_true, y_pred, average='weighted'
-        )
-        
-        return {
-            "accuracy": accuracy,
-            "precision": precision,
-            "recall": recall,
-            "f1_score": f1,
-            "support": support
-        }
+        return self.confusion_matrix(y_true, y_pred).metrics()
     
-    def generate_report(self, y_true: List[str], y_pred: List[str]) -> str:
+    def generate_report(self, y_true: Sequence, y_pred: Sequence) -> str:
         """
         Generate detailed classification report
         
         Args:
             y_true: True labels
             y_pred: Predicted labels
-            
+        
         Returns:
             Classification report
         """
-        from sklearn.metrics import classification_report
-        return classification_report(y_true, y_pred, target_names=self.emotions)
+        return self.confusion_matrix(y_true, y_pred).report()
 
 def preprocess_image(image: np.ndarray, target_size: Tuple[int, int] = (48, 48)) -> np.ndarray:
     """
@@ -165,10 +562,12 @@ def preprocess_image(image: np.ndarray, target_size: Tuple[int, int] = (48, 48))
     Args:
         image: Input image
         target_size: Target size for resizing
-        
+    
     Returns:
         Preprocessed image
     """
+    import cv2
+    
     # Convert to grayscale if needed
     if len(image.shape) == 3:
         image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
@@ -181,13 +580,211 @@ def preprocess_image(image: np.ndarray, target_size: Tuple[int, int] = (48, 48))
     
     return image
 
+class BatchPreprocessor:
+    """
+    Batched preprocess_image that reuses its buffers across calls
+    
+    The returned array is a view into an internal buffer and is
+    overwritten by the next call; copy it if it must outlive that.
+    """
+    
+    def __init__(self, target_size: Tuple[int, int] = (48, 48)):
+        self.target_size = target_size
+        self._buffers = {}
+    
+    def __call__(self, images, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Preprocess a batch of images
+        
+        Args:
+            images: (N, H, W[, C]) array or list of images
+            out: Optional (N, H, W) float32 output; an internal buffer otherwise
+        
+        Returns:
+            Preprocessed images, normalized to [0, 1]
+        """
+        count = len(images)
+        width, height = self.target_size
+        if out is None:
+            out = self._buffer("out", count * height * width, np.float32).reshape(count, height, width)
+        if count == 0:
+            # cv2 rejects the empty arrays the batched path would pass it
+            return out
+        
+        if isinstance(images, np.ndarray) and images.ndim in (3, 4):
+            pixels = self._resize_array(images)
+        else:
+            pixels = self._resize_list(images)
+        
+        # Cast and normalize in one pass, straight into the output
+        np.divide(pixels, np.float32(255.0), out=out)
+        return out
+    
+    def _resize_array(self, images: np.ndarray) -> np.ndarray:
+        import cv2
+        batch = images[..., 0] if images.ndim == 4 and images.shape[-1] == 1 else images
+        if batch.dtype not in (np.uint8, np.float32):
+            batch = batch.astype(np.float32)
+        
+        # Convert every row of every image to grayscale in a single call
+        if batch.ndim == 4:
+            n, h, w, c = batch.shape
+            code = cv2.COLOR_RGBA2GRAY if c == 4 else cv2.COLOR_RGB2GRAY
+            gray = self._buffer("gray", n * h * w, batch.dtype).reshape(n * h, w)
+            cv2.cvtColor(np.ascontiguousarray(batch).reshape(n * h, w, c), code, dst=gray)
+            batch = gray.reshape(n, h, w)
+        
+        width, height = self.target_size
+        if batch.shape[1:] == (height, width):
+            return batch
+        
+        resized = self._staging(len(batch), batch.dtype)
+        for index in range(len(batch)):
+            cv2.resize(batch[index], self.target_size, dst=resized[index])
+        return resized
+    
+    def _resize_list(self, images: List[np.ndarray]) -> np.ndarray:
+        import cv2
+        dtype = np.uint8 if all(image.dtype == np.uint8 for image in images) else np.float32
+        resized = self._staging(len(images), dtype)
+        for index, image in enumerate(images):
+            if image.dtype != dtype:
+                image = image.astype(dtype)
+            if image.ndim == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            cv2.resize(image, self.target_size, dst=resized[index])
+        return resized
+    
+    def _staging(self, count: int, dtype) -> np.ndarray:
+        width, height = self.target_size
+        return self._buffer(f"staging-{np.dtype(dtype).str}", count * height * width,
+                            dtype).reshape(count, height, width)
+    
+    def _buffer(self, name: str, size: int, dtype) -> np.ndarray:
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[:size]
+
+def preprocess_batch(images, target_size: Tuple[int, int] = (48, 48),
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Preprocess many images into one (N, H, W) float32 array
+    
+    Produces the same values as preprocess_image. A uint8 array batch of
+    shape (N, H, W[, C]) is converted to grayscale with one cvtColor call,
+    resized into a preallocated staging buffer and cast/normalized in a
+    single vectorized step. Use BatchPreprocessor to also reuse buffers
+    across calls.
+    
+    Args:
+        images: (N, H, W[, C]) array or list of images
+        target_size: Target size for resizing, as (width, height)
+        out: Optional preallocated (N, H, W) float32 output
+    
+    Returns:
+        Preprocessed images, normalized to [0, 1]
+    """
+    if out is None:
+        width, height = target_size
+        out = np.empty((len(images), height, width), dtype=np.float32)
+    return BatchPreprocessor(target_size)(images, out=out)
+
+def face_to_model_input(face: np.ndarray, target_size: Tuple[int, int] = (48, 48)) -> np.ndarray:
+    """
+    Convert a detected face crop into emotion model input
+    
+    Mirrors DeepFace.analyze: the crop is letterboxed to a square, converted
+    to grayscale and resized, so batched and single-image predictions agree.
+    
+    Args:
+        face: Face crop (H, W, 3) in the same channel order as the source image
+        target_size: Model input size
+    
+    Returns:
+        Preprocessed face of shape (H, W, 1), float32 in [0, 1]
+    """
+    import cv2
+    
+    height, width = face.shape[:2]
+    side = max(height, width)
+    top = (side - height) // 2
+    left = (side - width) // 2
+    square = cv2.copyMakeBorder(
+        face, top, side - height - top, left, side - width - left,
+        cv2.BORDER_CONSTANT, value=0
+    )
+    
+    if square.ndim == 3:
+        square = cv2.cvtColor(square, cv2.COLOR_BGR2GRAY)
+    square = cv2.resize(square, target_size)
+    
+    if square.dtype == np.uint8:
+        square = square.astype(np.float32) / 255.0
+    return square.astype(np.float32, copy=False)[..., np.newaxis]
+
+def scale_face_regions(result: Dict, from_shape: Tuple[int, int], to_shape: Tuple[int, int]) -> Dict:
+    """
+    Map the face regions of a predict_faces result onto an image of another size
+    
+    Args:
+        result: predict_faces result, modified in place
+        from_shape: (height, width) of the image the regions were found in
+        to_shape: (height, width) of the image they are wanted for
+    
+    Returns:
+        The same result
+    """
+    if tuple(from_shape) == tuple(to_shape):
+        return result
+    scale_y = to_shape[0] / from_shape[0]
+    scale_x = to_shape[1] / from_shape[1]
+    for face in result.get("faces", []):
+        region = face["region"]
+        face["region"] = {
+            "x": int(round(region["x"] * scale_x)),
+            "y": int(round(region["y"] * scale_y)),
+            "w": int(round(region["w"] * scale_x)),
+            "h": int(round(region["h"] * scale_y))
+        }
+    return result
+
+def draw_face_boxes(image: np.ndarray, faces: List[Dict],
+                    color: Tuple[int, int, int] = (0, 200, 0)) -> np.ndarray:
+    """
+    Draw face bounding boxes and dominant emotions onto a copy of an image
+    
+    Args:
+        image: Input image (H, W, 3)
+        faces: Face results from EmotionPredictor.predict_faces
+        color: Box color in the image's channel order
+    
+    Returns:
+        Annotated copy of the image
+    """
+    import cv2
+    
+    annotated = np.ascontiguousarray(image).copy()
+    thickness = max(2, min(annotated.shape[:2]) // 300)
+    
+    for index, face in enumerate(faces, start=1):
+        region = face["region"]
+        x, y, w, h = region["x"], region["y"], region["w"], region["h"]
+        cv2.rectangle(annotated, (x, y), (x + w, y + h), color, thickness)
+        label = f"{index}: {face['dominant_emotion']} {face['confidence']:.0f}%"
+        cv2.putText(annotated, label, (x, max(0, y - 2 * thickness)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.25 * thickness, color, thickness)
+    
+    return annotated
+
 def load_model_config(config_path: str) -> Dict:
     """
     Load model configuration from file
     
     Args:
         config_path: Path to configuration file
-        
+    
     Returns:
         Model configuration
     """
@@ -202,19 +799,27 @@ def load_model_config(config_path: str) -> Dict:
         print(f"Invalid JSON in configuration file: {config_path}")
         return {}
 
-def save_prediction_results(results: List[Dict], output_path: str):
+def save_prediction_results(results, output_path: str):
     """
     Save prediction results to file
     
     Args:
-        results: Prediction results
+        results: Prediction results (list of dicts or a PredictionBatch)
         output_path: Output file path
     """
+    import pandas as pd
+    
+    if isinstance(results, PredictionBatch):
+        if output_path.endswith(".parquet"):
+            results.to_parquet(output_path)
+            print(f"Results saved to {output_path}")
+            return
+        results = results.to_dicts()
     df = pd.DataFrame(results)
     df.to_csv(output_path, index=False)
     print(f"Results saved to {output_path}")
 
-# Example usage
+# Example usage (run as ``python -m src.model_utils``)
 if __name__ == "__main__":
     # Initialize predictor
     predictor = EmotionPredictor()
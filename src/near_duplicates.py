@@ -0,0 +1,363 @@
+"""
+Near-duplicate Detection for Emotion Recognition System
+
+This module recognises images and face crops that are perceptually the
+same as ones already scored, so their earlier results can be reused instead
+of running detection and classification again. Each image is reduced to a
+64-bit pHash (DCT) and dHash (gradient); two images match when both hashes
+are within a Hamming distance. Lookups use multi-index hashing: the pHash
+is split into max_distance + 1 chunks, and by the pigeonhole principle any
+match agrees exactly on at least one chunk, so only the entries sharing a
+chunk value are compared. Chunk tables are sorted arrays, which keeps
+lookups in the tens of microseconds at millions of hashes.
+"""
+
+import copy
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+HASH_BITS = 64
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+def _grayscale(image: np.ndarray) -> np.ndarray:
+    import cv2
+    if image.ndim == 3 and image.shape[-1] == 1:
+        return image[..., 0]
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY if image.shape[-1] == 4 else cv2.COLOR_BGR2GRAY)
+    return image
+
+def phash(image: np.ndarray) -> int:
+    """
+    64-bit DCT perceptual hash
+    
+    Args:
+        image: Grayscale or BGR image
+    
+    Returns:
+        Hash as an unsigned 64-bit integer
+    """
+    import cv2
+    small = cv2.resize(_grayscale(image), (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    # The DC term only encodes overall brightness
+    median = np.median(low.ravel()[1:])
+    return _bits_to_int(low > median)
+
+def dhash(image: np.ndarray) -> int:
+    """
+    64-bit difference hash (sign of horizontal gradients)
+    
+    Args:
+        image: Grayscale or BGR image
+    
+    Returns:
+        Hash as an unsigned 64-bit integer
+    """
+    import cv2
+    small = cv2.resize(_grayscale(image), (9, 8), interpolation=cv2.INTER_AREA)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+def image_hashes(image: np.ndarray) -> Tuple[int, int]:
+    """
+    Both perceptual hashes of an image
+    
+    Args:
+        image: Grayscale or BGR image
+    
+    Returns:
+        (pHash, dHash)
+    """
+    return phash(image), dhash(image)
+
+class HammingIndex:
+    """
+    Multi-index hash table of 64-bit codes for Hamming radius queries
+    """
+    
+    def __init__(self, max_distance: int = 4):
+        """
+        Args:
+            max_distance: Largest query radius the index guarantees to answer exactly
+        """
+        if not 0 <= max_distance < HASH_BITS:
+            raise ValueError(f"max_distance must be in [0, {HASH_BITS})")
+        self.max_distance = max_distance
+        # (shift, mask) of each of the max_distance + 1 chunks
+        chunks = max_distance + 1
+        widths = [HASH_BITS // chunks + (1 if i < HASH_BITS % chunks else 0) for i in range(chunks)]
+        shifts = np.cumsum([0] + widths[:-1])
+        self._chunks = [(np.uint64(shift), np.uint64((1 << width) - 1)) for shift, width in zip(shifts, widths)]
+        self._key_dtype = np.uint16 if max(widths) <= 16 else np.uint32
+        
+        self._codes = np.zeros(1024, dtype=np.uint64)
+        self._count = 0
+        # Sorted (chunk value, id) tables cover ids below _merged; newer
+        # ids are scanned directly until the next merge
+        self._keys = [np.zeros(0, dtype=self._key_dtype) for _ in self._chunks]
+        self._ids = [np.zeros(0, dtype=np.int64) for _ in self._chunks]
+        self._merged = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def add(self, code: int) -> int:
+        """
+        Insert a code
+        
+        Args:
+            code: 64-bit hash
+        
+        Returns:
+            Id of the new entry (insertion order, from 0)
+        """
+        if self._count == len(self._codes):
+            self._codes = np.concatenate([self._codes, np.zeros_like(self._codes)])
+        self._codes[self._count] = np.uint64(code)
+        self._count += 1
+        # Amortized: the pending tail stays within about 1/8 of the index
+        if self._count - self._merged > max(4096, self._merged // 8):
+            self._merge()
+        return self._count - 1
+    
+    def add_many(self, codes) -> np.ndarray:
+        """
+        Insert many codes at once
+        
+        Args:
+            codes: Sequence of 64-bit hashes
+        
+        Returns:
+            Ids of the new entries
+        """
+        codes = np.asarray(codes, dtype=np.uint64)
+        needed = self._count + len(codes)
+        if needed > len(self._codes):
+            grown = np.zeros(max(needed, 2 * len(self._codes)), dtype=np.uint64)
+            grown[:self._count] = self._codes[:self._count]
+            self._codes = grown
+        self._codes[self._count:needed] = codes
+        ids = np.arange(self._count, needed)
+        self._count = needed
+        self._merge()
+        return ids
+    
+    def _chunk_values(self, chunk: int, codes: np.ndarray) -> np.ndarray:
+        shift, mask = self._chunks[chunk]
+        return ((codes >> shift) & mask).astype(self._key_dtype)
+    
+    def _merge(self):
+        new_codes = self._codes[self._merged:self._count]
+        new_ids = np.arange(self._merged, self._count)
+        for chunk in range(len(self._chunks)):
+            keys = np.concatenate([self._keys[chunk], self._chunk_values(chunk, new_codes)])
+            ids = np.concatenate([self._ids[chunk], new_ids])
+            # Stable sort of small integer keys is a radix sort
+            order = np.argsort(keys, kind="stable")
+            self._keys[chunk] = keys[order]
+            self._ids[chunk] = ids[order]
+        self._merged = self._count
+    
+    def query(self, code: int, max_distance: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All entries within a Hamming distance of a code
+        
+        Args:
+            code: 64-bit hash
+            max_distance: Query radius, at most self.max_distance
+        
+        Returns:
+            (ids, distances) of the matches, ids ascending
+        """
+        radius = self.max_distance if max_distance is None else max_distance
+        if radius > self.max_distance:
+            raise ValueError(f"Index only answers radius <= {self.max_distance}")
+        
+        query = np.uint64(code)
+        candidates = [np.arange(self._merged, self._count)]
+        for chunk, (shift, mask) in enumerate(self._chunks):
+            value = self._key_dtype((query >> shift) & mask)
+            keys = self._keys[chunk]
+            low = np.searchsorted(keys, value, side="left")
+            high = np.searchsorted(keys, value, side="right")
+            candidates.append(self._ids[chunk][low:high])
+        
+        candidates = np.unique(np.concatenate(candidates))
+        distances = np.bitwise_count(self._codes[candidates] ^ query)
+        keep = distances <= radius
+        return candidates[keep], distances[keep].astype(np.int64)
+    
+    def brute_force(self, code: int, max_distance: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reference linear scan with the same result as query()
+        """
+        radius = self.max_distance if max_distance is None else max_distance
+        distances = np.bitwise_count(self._codes[:self._count] ^ np.uint64(code))
+        ids = np.flatnonzero(distances <= radius)
+        return ids, distances[ids].astype(np.int64)
+
+class _HashStore:
+    """
+    pHash index plus dHash check and payloads for one kind of result
+    """
+    
+    def __init__(self, max_distance: int):
+        self.index = HammingIndex(max_distance)
+        self.dhashes = np.zeros(1024, dtype=np.uint64)
+        self.payloads: List[Any] = []
+    
+    def find(self, hashes: Tuple[int, int], max_distance: int) -> Optional[Any]:
+        ids, distances = self.index.query(hashes[0], max_distance)
+        if not len(ids):
+            return None
+        dhash_distances = np.bitwise_count(self.dhashes[ids] ^ np.uint64(hashes[1]))
+        keep = dhash_distances <= max_distance
+        if not keep.any():
+            return None
+        combined = np.where(keep, distances + dhash_distances, np.iinfo(np.int64).max)
+        return self.payloads[int(ids[np.argmin(combined)])]
+    
+    def add(self, hashes: Tuple[int, int], payload: Any):
+        entry = self.index.add(hashes[0])
+        if entry == len(self.dhashes):
+            self.dhashes = np.concatenate([self.dhashes, np.zeros_like(self.dhashes)])
+        self.dhashes[entry] = np.uint64(hashes[1])
+        self.payloads.append(payload)
+
+class NearDuplicateIndex:
+    """
+    Reuses results for images and face crops that were already scored
+    
+    Results are kept per mode, e.g. "faces" for whole predict_faces
+    results (with the source image shape, so face regions can be rescaled
+    to a near-duplicate of another size), "dominant" for the dominant-face
+    probabilities of an image and "face" for the probabilities of a single
+    face crop.
+    """
+    
+    def __init__(self, max_distance: int = 4, model_version: str = ""):
+        """
+        Args:
+            max_distance: Largest pHash and dHash Hamming distance that
+                counts as the same image (0-63; 4 or less is conservative)
+            model_version: Identifier of the model whose results are stored
+        """
+        self.max_distance = max_distance
+        self.model_version = None
+        self._stores: Dict[str, _HashStore] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.hash_seconds = 0.0
+        self.set_model_version(model_version)
+    
+    def set_model_version(self, model_version: str):
+        """
+        Switch model version, forgetting results made by another version
+        """
+        with self._lock:
+            if model_version != self.model_version:
+                self.model_version = model_version
+                self._stores.clear()
+    
+    def hashes(self, image: np.ndarray) -> Tuple[int, int]:
+        """
+        Hash an image or face crop, timing the overhead
+        
+        Args:
+            image: Grayscale or BGR image
+        
+        Returns:
+            (pHash, dHash)
+        """
+        start = time.perf_counter()
+        hashes = image_hashes(image)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.hash_seconds += elapsed
+        return hashes
+    
+    def _mode_stats(self, mode: str) -> Dict[str, float]:
+        return self._stats.setdefault(mode, {"lookups": 0, "hits": 0, "miss_seconds": 0.0, "misses_timed": 0})
+    
+    def lookup(self, mode: str, hashes: Tuple[int, int]) -> Optional[Any]:
+        """
+        Find the result of a near-identical earlier input
+        
+        Args:
+            mode: Kind of result, e.g. "faces"
+            hashes: From hashes()
+        
+        Returns:
+            Copy of the stored result, or None
+        """
+        with self._lock:
+            stats = self._mode_stats(mode)
+            stats["lookups"] += 1
+            store = self._stores.get(mode)
+            payload = store.find(hashes, self.max_distance) if store else None
+            if payload is not None:
+                stats["hits"] += 1
+        return copy.deepcopy(payload)
+    
+    def add(self, mode: str, hashes: Tuple[int, int], payload: Any):
+        """
+        Remember a freshly computed result
+        
+        Args:
+            mode: Kind of result
+            hashes: From hashes()
+            payload: Result to hand out for near-duplicates
+        """
+        payload = copy.deepcopy(payload)
+        with self._lock:
+            if mode not in self._stores:
+                self._stores[mode] = _HashStore(self.max_distance)
+            self._stores[mode].add(hashes, payload)
+    
+    def record_miss_cost(self, mode: str, seconds: float, count: int = 1):
+        """
+        Record what computing `count` results of a mode cost, to estimate time saved
+        
+        Args:
+            mode: Kind of result
+            seconds: Time spent computing them
+            count: Number of results computed
+        """
+        with self._lock:
+            stats = self._mode_stats(mode)
+            stats["miss_seconds"] += seconds
+            stats["misses_timed"] += count
+    
+    def stats(self) -> Dict:
+        """
+        Dedup rate and estimated time saved per mode
+        
+        Returns:
+            Per-mode lookups, hits, hit_rate, entries and estimated
+            seconds_saved, plus total hashing seconds and net savings
+        """
+        with self._lock:
+            modes = {}
+            saved = 0.0
+            for mode, stats in self._stats.items():
+                mean_cost = stats["miss_seconds"] / stats["misses_timed"] if stats["misses_timed"] else 0.0
+                mode_saved = stats["hits"] * mean_cost
+                saved += mode_saved
+                modes[mode] = {
+                    "lookups": int(stats["lookups"]),
+                    "hits": int(stats["hits"]),
+                    "hit_rate": stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0,
+                    "entries": len(self._stores[mode].payloads) if mode in self._stores else 0,
+                    "seconds_saved": mode_saved
+                }
+            return {
+                "max_distance": self.max_distance,
+                "modes": modes,
+                "seconds_saved": saved,
+                "hash_seconds": self.hash_seconds,
+                "net_seconds_saved": saved - self.hash_seconds
+            }
@@ -0,0 +1,212 @@
+"""
+Process Pool Backend for Emotion Recognition System
+
+This module spreads bulk scoring across CPU cores. Each worker process
+loads the emotion model once; images reach workers through shared memory
+blocks instead of being pickled, and results come back in input order.
+
+TensorFlow is only imported inside the workers, after their thread
+settings are applied, so this module stays cheap to import.
+"""
+
+import os
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .prediction_batch import PredictionBatch
+
+Layout = List[Tuple[int, Tuple[int, ...], str]]
+
+_ALIGNMENT = 64
+
+def pack_images(images: Sequence[np.ndarray]) -> Tuple[SharedMemory, Layout]:
+    """
+    Copy images into a single shared memory block
+    
+    Args:
+        images: Images of any shape and dtype
+    
+    Returns:
+        The shared memory block and (offset, shape, dtype) per image
+    """
+    layout = []
+    offset = 0
+    arrays = [np.ascontiguousarray(image) for image in images]
+    for array in arrays:
+        layout.append((offset, array.shape, array.dtype.str))
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+    
+    shm = SharedMemory(create=True, size=max(offset, 1))
+    for (start, shape, dtype), array in zip(layout, arrays):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = array
+    return shm, layout
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """
+    Attach to a block owned by the parent process
+    
+    Spawned workers share the parent's resource tracker, so the block stays
+    registered exactly once and is unlinked only by its owner.
+    
+    Args:
+        name: Shared memory block name
+    
+    Returns:
+        Attached SharedMemory
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        return SharedMemory(name=name)
+
+def unpack_images(shm: SharedMemory, layout: Layout) -> List[np.ndarray]:
+    """
+    Zero-copy views of images packed with pack_images
+    """
+    return [np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+            for start, shape, dtype in layout]
+
+_worker_predictor = None
+
+def _init_worker(model_name: str, detector_backend: str, max_batch_size: int, tf_threads: int,
+                 backend: str = "keras", model_dir: Optional[str] = None):
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(tf_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ["OMP_NUM_THREADS"] = str(tf_threads)
+    
+    from .model_registry import get_model_registry
+    from .model_utils import EmotionPredictor
+    
+    global _worker_predictor
+    _worker_predictor = EmotionPredictor(
+        model_name=model_name,
+        detector_backend=detector_backend,
+        max_batch_size=max_batch_size,
+        backend=backend,
+        model_dir=model_dir
+    )
+    registry = get_model_registry()
+    if backend == "keras":
+        registry.get(model_name)
+    else:
+        registry.get_backend(backend, model_dir, model_name)
+    # The TF-free backends detect with plain OpenCV unless told otherwise
+    if backend == "keras" or detector_backend != "opencv":
+        registry.warm_up_detector(detector_backend)
+
+def _score_chunk(shm_name: str, layout: Layout) -> PredictionBatch:
+    shm = attach_shared_memory(shm_name)
+    images = None
+    try:
+        images = unpack_images(shm, layout)
+        # A few flat arrays pickle far smaller than one dict per image
+        return _worker_predictor.predict_batch(images)
+    except BaseException as e:
+        # The failed call's frames still reference the views
+        traceback.clear_frames(e.__traceback__)
+        raise
+    finally:
+        # Views must be released before the block can be closed, or close()
+        # raises BufferError and hides the worker's real exception
+        images = None
+        shm.close()
+
+class ProcessPoolPredictor:
+    """
+    Bulk emotion scoring across a pool of worker processes
+    """
+    
+    def __init__(self, num_workers: Optional[int] = None, tf_threads: int = 1,
+                 chunk_size: int = 64, model_name: str = "emotion",
+                 detector_backend: str = "opencv", max_batch_size: int = 32,
+                 backend: str = "keras", model_dir: Optional[str] = None):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.tf_threads = tf_threads
+        self.chunk_size = chunk_size
+        self.max_in_flight = 2 * self.num_workers
+        # TensorFlow is not fork-safe, so workers always start fresh
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, detector_backend, max_batch_size, tf_threads, backend, model_dir)
+        )
+    
+    def batch_predict(self, images: Sequence[np.ndarray]) -> List[Dict]:
+        """
+        Predict emotions for many images across all workers
+        
+        Args:
+            images: List of images
+        
+        Returns:
+            List of prediction results in input order
+        """
+        return self.predict_batch(images).to_dicts()
+    
+    def predict_batch(self, images: Sequence[np.ndarray]) -> PredictionBatch:
+        """
+        Predict emotions for many images across all workers
+        
+        Only a bounded number of chunks is packed into shared memory at a
+        time, so memory stays proportional to workers x chunk size.
+        
+        Args:
+            images: List of images
+        
+        Returns:
+            PredictionBatch in input order
+        """
+        chunks = []
+        in_flight = deque()
+        
+        try:
+            for start in range(0, len(images), self.chunk_size):
+                if len(in_flight) >= self.max_in_flight:
+                    chunks.append(self._collect(in_flight.popleft()))
+                shm, layout = pack_images(images[start:start + self.chunk_size])
+                in_flight.append((shm, self._executor.submit(_score_chunk, shm.name, layout)))
+            
+            while in_flight:
+                chunks.append(self._collect(in_flight.popleft()))
+        finally:
+            # Only reached with chunks left after an error: stop the ones not
+            # started and let running ones finish before their blocks go away
+            for _, future in in_flight:
+                future.cancel()
+            wait([future for _, future in in_flight])
+            for shm, _ in in_flight:
+                shm.close()
+                shm.unlink()
+        return PredictionBatch.concat(chunks)
+    
+    def warm_up(self):
+        """
+        Start every worker and load its model before timing-sensitive work
+        """
+        blank = np.zeros((64, 64, 3), dtype=np.uint8)
+        self.batch_predict([blank] * self.num_workers)
+    
+    def close(self):
+        self._executor.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @staticmethod
+    def _collect(entry) -> PredictionBatch:
+        shm, future = entry
+        try:
+            return future.result()
+        finally:
+            shm.close()
+            shm.unlink()
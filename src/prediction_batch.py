@@ -0,0 +1,265 @@
+"""
+Compact Prediction Results for Emotion Recognition System
+
+This module stores emotion predictions for many images as a few flat
+arrays instead of one dict per image: an (N, 7) float32 score matrix, a
+uint8 dominant-label index, a float32 confidence vector and a packed
+success bitmask, with error messages kept only for the rows that failed.
+Scores are stored column-major and the bitmask uses Arrow's bit order, so
+exporting to Arrow and Parquet shares these buffers instead of copying
+them. A dict view produces the predict_emotion format for existing code.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Output order of the DeepFace emotion model's softmax layer
+MODEL_EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+class PredictionBatch:
+    """
+    Struct-of-arrays emotion predictions for N images
+    """
+    
+    def __init__(self, scores: np.ndarray, success: np.ndarray,
+                 errors: Optional[Dict[int, Tuple[str, str]]] = None,
+                 labels: Sequence[str] = MODEL_EMOTION_LABELS):
+        """
+        Args:
+            scores: (N, len(labels)) emotion scores in percent; ignored for failed rows
+            success: (N,) bool mask of rows that were predicted
+            errors: Row index -> (error type, message) for failed rows
+            labels: Emotion label of each score column
+        """
+        success = np.asarray(success, dtype=bool)
+        # Column-major, so every emotion column is one contiguous buffer
+        self.scores = np.asfortranarray(scores, dtype=np.float32)
+        if not success.all():
+            # Copy first so the caller's array is left untouched
+            self.scores = self.scores.copy(order="F")
+            self.scores[~success] = 0.0
+        self.labels = list(labels)
+        self.errors = dict(errors or {})
+        self._length = len(success)
+        self._success_bits = np.packbits(success, bitorder="little")
+        
+        if self._length:
+            self.dominant = np.argmax(self.scores, axis=1).astype(np.uint8)
+            self.confidence = self.scores[np.arange(self._length), self.dominant]
+        else:
+            self.dominant = np.zeros(0, dtype=np.uint8)
+            self.confidence = np.zeros(0, dtype=np.float32)
+    
+    @classmethod
+    def from_probabilities(cls, probabilities: np.ndarray, success: Optional[np.ndarray] = None,
+                           errors: Optional[Dict[int, Tuple[str, str]]] = None,
+                           labels: Sequence[str] = MODEL_EMOTION_LABELS) -> "PredictionBatch":
+        """
+        Build a batch from raw model output
+        
+        Args:
+            probabilities: (N, 7) softmax output in labels order
+            success: Rows that hold real predictions (all rows when omitted)
+            errors: Row index -> (error type, message) for failed rows
+            labels: Emotion label of each column
+        
+        Returns:
+            PredictionBatch with the same percentage scaling DeepFace.analyze applies
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float32)
+        if success is None:
+            success = np.ones(len(probabilities), dtype=bool)
+        totals = probabilities.sum(axis=1, keepdims=True)
+        scores = np.divide(100 * probabilities, totals, out=np.zeros_like(probabilities), where=totals > 0)
+        return cls(scores, success, errors, labels)
+    
+    @classmethod
+    def from_predictions(cls, predictions: Iterable[Dict],
+                         labels: Sequence[str] = MODEL_EMOTION_LABELS) -> "PredictionBatch":
+        """
+        Pack predict_emotion-style dicts
+        
+        Args:
+            predictions: Prediction dicts
+            labels: Emotion label of each score column
+        
+        Returns:
+            Equivalent PredictionBatch
+        """
+        predictions = list(predictions)
+        scores = np.zeros((len(predictions), len(labels)), dtype=np.float32)
+        success = np.zeros(len(predictions), dtype=bool)
+        errors = {}
+        for index, prediction in enumerate(predictions):
+            if prediction.get("success"):
+                emotions = prediction["emotions"]
+                scores[index] = [emotions.get(label, 0.0) for label in labels]
+                success[index] = True
+            else:
+                errors[index] = (prediction.get("error_type", "Exception"), prediction.get("error", ""))
+        return cls(scores, success, errors, labels)
+    
+    @classmethod
+    def concat(cls, batches: Sequence["PredictionBatch"]) -> "PredictionBatch":
+        """
+        Join batches end to end
+        
+        Args:
+            batches: Batches with the same labels
+        
+        Returns:
+            Combined PredictionBatch
+        """
+        if not batches:
+            return cls(np.zeros((0, len(MODEL_EMOTION_LABELS)), dtype=np.float32), np.zeros(0, dtype=bool))
+        
+        errors, offset = {}, 0
+        for batch in batches:
+            errors.update({offset + index: error for index, error in batch.errors.items()})
+            offset += len(batch)
+        return cls(np.concatenate([batch.scores for batch in batches]),
+                   np.concatenate([batch.success for batch in batches]),
+                   errors, batches[0].labels)
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index: int) -> Dict:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PredictionBatch index out of range")
+        return self._row(index, bool((self._success_bits[index >> 3] >> (index & 7)) & 1))
+    
+    def __iter__(self) -> Iterator[Dict]:
+        success = self.success
+        return (self._row(index, success[index]) for index in range(self._length))
+    
+    def _row(self, index: int, success: bool) -> Dict:
+        if not success:
+            error_type, message = self.errors.get(index, ("Exception", ""))
+            return {
+                "emotions": {},
+                "dominant_emotion": None,
+                "confidence": 0,
+                "success": False,
+                "error": message,
+                "error_type": error_type
+            }
+        
+        return {
+            "emotions": dict(zip(self.labels, self.scores[index].tolist())),
+            "dominant_emotion": self.labels[self.dominant[index]],
+            "confidence": float(self.confidence[index]),
+            "success": True
+        }
+    
+    @property
+    def success(self) -> np.ndarray:
+        return np.unpackbits(self._success_bits, count=self._length, bitorder="little").astype(bool)
+    
+    @property
+    def nbytes(self) -> int:
+        return (self.scores.nbytes + self.dominant.nbytes + self.confidence.nbytes
+                + self._success_bits.nbytes + sum(len(message) for _, message in self.errors.values()))
+    
+    def to_dicts(self) -> List[Dict]:
+        """
+        Compatibility view in the predict_emotion dict format
+        
+        Returns:
+            One prediction dict per row
+        """
+        return list(self)
+    
+    def to_arrow(self):
+        """
+        Export as an Arrow table without copying the numeric columns
+        
+        Failed rows are null in dominant_emotion, confidence and the
+        emotion_<label> columns, whose validity bitmap is the success
+        bitmask itself.
+        
+        Returns:
+            pyarrow.Table with success, dominant_emotion, confidence,
+            emotion_<label>, error and error_type columns
+        """
+        import pyarrow as pa
+        
+        length = self._length
+        validity = pa.py_buffer(self._success_bits)
+        
+        def float_column(values: np.ndarray):
+            return pa.Array.from_buffers(pa.float32(), length, [validity, pa.py_buffer(values)])
+        
+        indices = pa.Array.from_buffers(pa.uint8(), length, [validity, pa.py_buffer(self.dominant)])
+        columns = {
+            "success": pa.Array.from_buffers(pa.bool_(), length, [None, validity]),
+            "dominant_emotion": pa.DictionaryArray.from_arrays(indices, pa.array(self.labels, pa.string())),
+            "confidence": float_column(self.confidence),
+        }
+        for column, label in enumerate(self.labels):
+            columns[f"emotion_{label}"] = float_column(self.scores[:, column])
+        columns["error"] = self._error_column(1)
+        columns["error_type"] = self._error_column(0)
+        return pa.table(columns)
+    
+    def to_parquet(self, path: str, **kwargs):
+        """
+        Write the batch to a Parquet file
+        
+        Args:
+            path: Output file path
+            **kwargs: Passed to pyarrow.parquet.write_table
+        """
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path, **kwargs)
+    
+    @classmethod
+    def from_arrow(cls, table) -> "PredictionBatch":
+        """
+        Rebuild a batch from a table written by to_arrow
+        
+        Args:
+            table: pyarrow.Table with emotion_<label> columns
+        
+        Returns:
+            PredictionBatch
+        """
+        labels = [name[len("emotion_"):] for name in table.column_names if name.startswith("emotion_")]
+        success = table.column("success").to_numpy(zero_copy_only=False).astype(bool)
+        scores = np.column_stack([
+            table.column(f"emotion_{label}").fill_null(0.0).to_numpy(zero_copy_only=False)
+            for label in labels
+        ]) if labels else np.zeros((len(success), 0), dtype=np.float32)
+        
+        errors = {}
+        if "error" in table.column_names:
+            messages = table.column("error").to_pylist()
+            # Tables written before error_type was exported fall back to "Exception"
+            types = (table.column("error_type").to_pylist() if "error_type" in table.column_names
+                     else [None] * len(messages))
+            errors = {index: (error_type or "Exception", message)
+                      for index, (error_type, message) in enumerate(zip(types, messages))
+                      if message is not None}
+        return cls(scores, success, errors, labels)
+    
+    def _error_column(self, field: int):
+        """
+        Error type (field 0) or message (field 1) per row, null when successful
+        """
+        import pyarrow as pa
+        
+        # Dictionary-encoded with one entry per failed row, built from
+        # arrays rather than a Python list of N mostly-None values
+        rows = np.fromiter(self.errors, dtype=np.int64, count=len(self.errors))
+        present = np.zeros(self._length, dtype=bool)
+        present[rows] = True
+        indices = np.zeros(self._length, dtype=np.int32)
+        indices[rows] = np.arange(len(rows), dtype=np.int32)
+        index_array = pa.Array.from_buffers(
+            pa.int32(), self._length,
+            [pa.py_buffer(np.packbits(present, bitorder="little")), pa.py_buffer(indices)]
+        )
+        values = pa.array([self.errors[row][field] for row in rows.tolist()], pa.string())
+        return pa.DictionaryArray.from_arrays(index_array, values)
@@ -0,0 +1,196 @@
+"""
+Prediction Cache for Emotion Recognition System
+
+This module provides a content-addressed cache for emotion predictions.
+Entries are keyed by a hash of the decoded pixel buffer plus the model and
+detector identity, kept in a bounded in-memory LRU and optionally mirrored
+to disk so they survive restarts.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+import numpy as np
+
+class PredictionCache:
+    """
+    Two-tier (memory LRU + optional disk) cache of prediction results
+    """
+    
+    VERSION_FILE = "MODEL_VERSION"
+    
+    def __init__(self, max_entries: int = 1024, disk_dir: Optional[str] = None,
+                 model_version: str = ""):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self.set_model_version(model_version)
+    
+    def make_key(self, image: np.ndarray, *identity: str) -> str:
+        """
+        Build a content-addressed key for an image
+        
+        Args:
+            image: Decoded image as numpy array
+            identity: Model, detector and version identifiers
+        
+        Returns:
+            Hex digest identifying the image and model configuration
+        """
+        image = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{image.shape}|{image.dtype.str}|".encode())
+        digest.update("|".join(identity).encode())
+        # Flat byte view: no copy, and valid for empty arrays
+        digest.update(image.reshape(-1).view(np.uint8))
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached prediction
+        
+        Args:
+            key: Key from make_key
+        
+        Returns:
+            Cached prediction, or None on a miss
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+        
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.hits += 1
+            self._insert(key, value)
+        return copy.deepcopy(value)
+    
+    def put(self, key: str, value: Dict):
+        """
+        Store a prediction in memory and, if configured, on disk
+        
+        Args:
+            key: Key from make_key
+            value: Prediction result
+        """
+        with self._lock:
+            self._insert(key, copy.deepcopy(value))
+        self._write_disk(key, value)
+    
+    def set_model_version(self, model_version: str):
+        """
+        Switch model version, dropping every entry made by another version
+        
+        Args:
+            model_version: Identifier of the model weights in use
+        """
+        with self._lock:
+            if model_version == self.model_version:
+                return
+            previous = self.model_version
+            self.model_version = model_version
+            if previous is not None and self._entries:
+                self.invalidations += len(self._entries)
+            self._entries.clear()
+        
+        if self.disk_dir:
+            version_path = os.path.join(self.disk_dir, self.VERSION_FILE)
+            stored = None
+            if os.path.exists(version_path):
+                with open(version_path, 'r') as f:
+                    stored = f.read().strip()
+            if stored != model_version:
+                self._clear_disk()
+                with open(version_path, 'w') as f:
+                    f.write(model_version)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            self._clear_disk()
+    
+    def stats(self) -> Dict:
+        """
+        Cache counters
+        
+        Returns:
+            Hit, miss, eviction and size counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "model_version": self.model_version
+            }
+    
+    def _insert(self, key: str, value: Dict):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+    
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    
+    def _write_disk(self, key: str, value: Dict):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A temp file per writer, so concurrent writers of the same key each
+        # publish a complete file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def _clear_disk(self):
+        # Only remove the two-character shard directories this cache creates
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            if len(name) == 2 and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,273 @@
+"""
+Bulk Scoring CLI for Emotion Recognition System
+
+This module scores every image in a directory tree or a zip/tar archive
+with the batched predictor and streams the results to Parquet. Images are
+read lazily, results are flushed as one Parquet part file per row group
+and a checkpoint manifest records progress, so memory stays flat and an
+interrupted run resumes where it stopped.
+
+Usage:
+    python -m src.score_dataset /data/stills results/ --row-group-size 10000
+    python -m src.score_dataset nightly.tar.gz results/ --batch-size 64
+    python -m src.score_dataset frames/ results/ --dedup-distance 4
+"""
+
+import argparse
+import json
+import os
+import tarfile
+import time
+import zipfile
+from typing import Callable, Dict, Iterator, List, Tuple
+import numpy as np
+import cv2
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .backends import BACKENDS
+from .metrics import get_pipeline_metrics, start_metrics_server
+from .model_utils import MODEL_EMOTION_LABELS, EmotionPredictor
+from .near_duplicates import NearDuplicateIndex
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+# Leading underscore keeps dataset readers from treating it as data
+MANIFEST_NAME = "_manifest.json"
+
+SCHEMA = pa.schema(
+    [("path", pa.string()), ("success", pa.bool_()), ("dominant_emotion", pa.string()),
+     ("confidence", pa.float32())]
+    + [(f"emotion_{label}", pa.float32()) for label in MODEL_EMOTION_LABELS]
+    + [("error", pa.string())]
+)
+
+def iter_images(source: str) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    """
+    Lazily yield encoded images from a directory, zip or tar archive
+    
+    Entries are yielded in a deterministic order so runs can resume by
+    position, and bytes are only read when the loader is called (before
+    advancing the iterator), so skipped entries cost nothing.
+    
+    Args:
+        source: Directory, .zip or .tar[.gz|.bz2|.xz] path
+    
+    Yields:
+        (path, load_bytes) tuples
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), lambda path=path: _read_file(path)
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    yield info.filename, lambda info=info: archive.read(info)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, 'r:*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield member.name, lambda member=member: archive.extractfile(member).read()
+                # Drop member headers already seen to keep memory flat
+                archive.members = []
+    else:
+        raise ValueError(f"Unsupported source (expected directory, zip or tar): {source}")
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+class ParquetResultWriter:
+    """
+    Buffers prediction rows and writes one Parquet part per row group
+    """
+    
+    def __init__(self, output_dir: str, row_group_size: int = 10000):
+        self.output_dir = output_dir
+        self.row_group_size = row_group_size
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self._reset_buffer()
+    
+    @property
+    def processed(self) -> int:
+        return self.manifest["processed"]
+    
+    def add(self, path: str, prediction: Dict):
+        """
+        Buffer one prediction, flushing when a row group is full
+        
+        Args:
+            path: Image path inside the source
+            prediction: Result from EmotionPredictor
+        """
+        emotions = prediction.get("emotions") or {}
+        self._paths.append(path)
+        self._success.append(bool(prediction["success"]))
+        self._dominant.append(prediction["dominant_emotion"])
+        self._errors.append(prediction.get("error"))
+        row = len(self._paths) - 1
+        self._confidence[row] = prediction["confidence"]
+        self._emotions[row] = [emotions.get(label, np.nan) for label in MODEL_EMOTION_LABELS]
+        
+        if len(self._paths) >= self.row_group_size:
+            self.flush()
+    
+    def flush(self):
+        """
+        Write buffered rows as a new part file and checkpoint progress
+        """
+        rows = len(self._paths)
+        if rows == 0:
+            return
+        
+        columns = [
+            pa.array(self._paths, pa.string()),
+            pa.array(self._success, pa.bool_()),
+            pa.array(self._dominant, pa.string()),
+            pa.array(self._confidence[:rows]),
+        ]
+        columns += [pa.array(self._emotions[:rows, i]) for i in range(len(MODEL_EMOTION_LABELS))]
+        columns.append(pa.array(self._errors, pa.string()))
+        table = pa.Table.from_arrays(columns, schema=SCHEMA)
+        
+        part_name = f"part-{len(self.manifest['parts']):05d}.parquet"
+        part_path = os.path.join(self.output_dir, part_name)
+        pq.write_table(table, f"{part_path}.tmp", row_group_size=rows)
+        os.replace(f"{part_path}.tmp", part_path)
+        
+        self.manifest["parts"].append({"file": part_name, "rows": rows, "last_path": self._paths[-1]})
+        self.manifest["processed"] += rows
+        self._save_manifest()
+        self._reset_buffer()
+    
+    def _reset_buffer(self):
+        self._paths: List[str] = []
+        self._success: List[bool] = []
+        self._dominant: List[str] = []
+        self._errors: List[str] = []
+        self._confidence = np.zeros(self.row_group_size, dtype=np.float32)
+        self._emotions = np.zeros((self.row_group_size, len(MODEL_EMOTION_LABELS)), dtype=np.float32)
+    
+    def _load_manifest(self) -> Dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        return {"processed": 0, "parts": [], "completed": False}
+    
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def complete(self):
+        self.flush()
+        self.manifest["completed"] = True
+        self._save_manifest()
+
+def score_dataset(source: str, output_dir: str, predictor: EmotionPredictor,
+                  batch_size: int = 64, row_group_size: int = 10000) -> Dict:
+    """
+    Score every image in a source and stream results to Parquet
+    
+    Args:
+        source: Directory, zip or tar archive
+        output_dir: Directory for Parquet parts and the manifest
+        predictor: Batched emotion predictor
+        batch_size: Images decoded and scored together
+        row_group_size: Rows per Parquet part file
+    
+    Returns:
+        Run summary
+    """
+    writer = ParquetResultWriter(output_dir, row_group_size)
+    if writer.manifest.get("completed"):
+        print(f"Output already complete: {writer.processed} images in {output_dir}")
+        return writer.manifest
+    
+    skip = writer.processed
+    if skip:
+        print(f"Resuming after {skip} already scored images")
+    
+    start = time.perf_counter()
+    scored = 0
+    paths, images = [], []
+    pipeline = getattr(predictor, "metrics", None) or get_pipeline_metrics()
+    
+    def score_pending():
+        decoded = [image for image in images if image is not None]
+        predictions = iter(predictor.batch_predict(decoded)) if decoded else iter(())
+        for path, image in zip(paths, images):
+            if image is None:
+                error = ValueError("Could not decode image")
+                pipeline.record_error(error)
+                writer.add(path, {"success": False, "dominant_emotion": None, "confidence": 0,
+                                  "error": str(error)})
+            else:
+                writer.add(path, next(predictions))
+    
+    for index, (path, load_bytes) in enumerate(iter_images(source)):
+        if index < skip:
+            continue
+        paths.append(path)
+        with pipeline.sample().stage("decode"):
+            images.append(cv2.imdecode(np.frombuffer(load_bytes(), dtype=np.uint8), cv2.IMREAD_COLOR))
+        
+        if len(paths) >= batch_size:
+            score_pending()
+            scored += len(paths)
+            paths, images = [], []
+            elapsed = time.perf_counter() - start
+            print(f"\rScored {skip + scored} images ({scored / elapsed:.1f} img/s)", end="", flush=True)
+    
+    if paths:
+        score_pending()
+        scored += len(paths)
+    writer.complete()
+    
+    elapsed = time.perf_counter() - start
+    print(f"\nScored {scored} new images in {elapsed:.1f}s; results in {output_dir}")
+    return writer.manifest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory, zip or tar archive of images")
+    parser.add_argument("output_dir", help="Directory for Parquet parts and the checkpoint manifest")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--row-group-size", type=int, default=10000)
+    parser.add_argument("--detector", default="opencv")
+    parser.add_argument("--backend", default="keras", choices=BACKENDS)
+    parser.add_argument("--model-dir", default=None, help="Directory holding exported ONNX/TFLite models")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus /metrics while scoring")
+    parser.add_argument("--dedup-distance", type=int, default=None,
+                        help="Reuse results for images within this perceptual-hash Hamming distance (e.g. 4)")
+    args = parser.parse_args()
+    
+    dedup = NearDuplicateIndex(args.dedup_distance) if args.dedup_distance is not None else None
+    predictor = EmotionPredictor(detector_backend=args.detector, max_batch_size=args.batch_size,
+                                 backend=args.backend, model_dir=args.model_dir, dedup=dedup)
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port, predictor.metrics.metrics)
+    score_dataset(args.source, args.output_dir, predictor, args.batch_size, args.row_group_size)
+    
+    print("Stage latency (ms):")
+    for stage, summary in predictor.metrics.snapshot()["stages"].items():
+        print(f"  {stage:<11} p50 {summary['p50'] * 1000:8.2f}  p95 {summary['p95'] * 1000:8.2f}  "
+              f"n={summary['count']}")
+    
+    if dedup is not None:
+        stats = dedup.stats()
+        print(f"Near-duplicates (distance <= {stats['max_distance']}):")
+        for mode, summary in stats["modes"].items():
+            print(f"  {mode:<11} {summary['hits']}/{summary['lookups']} reused ({summary['hit_rate']:.1%}), "
+                  f"~{summary['seconds_saved']:.1f}s saved")
+        print(f"  hashing cost {stats['hash_seconds']:.1f}s, net ~{stats['net_seconds_saved']:.1f}s saved")
+
+if __name__ == "__main__":
+    main()
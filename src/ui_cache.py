@@ -0,0 +1,216 @@
+"""
+UI Result Cache for Emotion Recognition System
+
+Streamlit reruns the whole page script on every widget interaction. This
+module provides a small LRU cache with a memory budget and per-entry TTL
+for work a page would otherwise redo on each rerun: decoded uploads and
+analysis results keyed by a hash of the upload, and rendered figures keyed
+by a hash of the data that produced them. It has no Streamlit dependency;
+app_pages.session_cache keeps one instance per browser session.
+"""
+
+import hashlib
+import io
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+
+# Streamlit downsizes and re-encodes wider images on every run
+MAX_IMAGE_WIDTH = 1460
+
+def content_key(*parts) -> str:
+    """
+    Hash arbitrary key parts into a short hex digest
+    
+    Args:
+        parts: bytes, numpy arrays, pandas objects or JSON-serialisable values
+    
+    Returns:
+        Hex digest that changes whenever any part's content changes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(b"b")
+            digest.update(part)
+        elif isinstance(part, np.ndarray):
+            digest.update(f"a{part.shape}{part.dtype.str}".encode())
+            if part.dtype.hasobject:
+                # Hash the values; the buffer only holds object pointers
+                digest.update(json.dumps(part.tolist(), default=str).encode())
+            else:
+                # Flat byte view: no copy, and valid for empty arrays
+                digest.update(np.ascontiguousarray(part).reshape(-1).view(np.uint8))
+        elif hasattr(part, "to_numpy") and hasattr(part, "columns"):
+            # DataFrame: column names and values
+            digest.update(b"d" + json.dumps([str(column) for column in part.columns]).encode())
+            for column in part.columns:
+                digest.update(content_key(part[column].to_numpy()).encode())
+        else:
+            digest.update(b"j" + json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory held by a cached value
+    
+    Args:
+        value: Cached object
+    
+    Returns:
+        Size in bytes (numpy buffers and bytes exactly, other objects roughly)
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_size(vars(value))
+    return sys.getsizeof(value)
+
+def render_figure(fig, dpi: int = 200, max_width: int = MAX_IMAGE_WIDTH) -> bytes:
+    """
+    Render a matplotlib figure to PNG bytes and close it
+    
+    Args:
+        fig: matplotlib Figure
+        dpi: Output resolution (st.pyplot also renders at 200)
+        max_width: Widest output in pixels; dpi is lowered to fit
+    
+    Returns:
+        PNG image bytes
+    """
+    import matplotlib.pyplot as plt
+    buffer = io.BytesIO()
+    try:
+        dpi = min(dpi, max_width / fig.get_figwidth())
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+class TTLCache:
+    """
+    LRU cache bounded by total bytes and entry count, with expiring entries
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: Optional[float] = 900,
+                 max_entries: int = 256):
+        """
+        Args:
+            max_bytes: Memory budget; least recently used entries are evicted
+                beyond it (0 disables caching)
+            ttl_seconds: Lifetime of an entry after it is stored (None for no expiry)
+            max_entries: Entry count limit
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (value, size, expires_at)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up an entry
+        
+        Args:
+            key: Cache key, e.g. from content_key
+        
+        Returns:
+            The stored value (not a copy), or None on a miss or expiry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: str, value: Any, size: Optional[int] = None):
+        """
+        Store an entry, evicting least recently used ones to fit
+        
+        Args:
+            key: Cache key
+            value: Value to store; callers must not mutate it afterwards
+            size: Bytes the value holds (estimated when omitted)
+        """
+        size = estimate_size(value) if size is None else size
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, expires_at)
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any], size: Optional[int] = None) -> Any:
+        """
+        Return the cached value or compute, store and return it
+        
+        Args:
+            key: Cache key
+            compute: Zero-argument function producing the value
+            size: Bytes the value holds (estimated when omitted)
+        
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value, size)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+    
+    def stats(self) -> Dict:
+        """
+        Cache counters
+        
+        Returns:
+            Hit, miss, eviction, expiry and size counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,242 @@
+"""
+Video Pipeline for Emotion Recognition System
+
+This module streams emotion predictions from video files or frame
+iterators. Frames are sampled at a configurable rate, full face detection
+only runs every few frames (or when a track is lost) and faces are followed
+in between with cheap template matching, so all tracked faces of a frame
+go through the emotion model in a single forward pass.
+"""
+
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+import cv2
+
+from .model_utils import EmotionPredictor, face_to_model_input
+
+Frame = Tuple[int, float, np.ndarray]
+
+def iter_video_frames(source: Union[str, Iterable[np.ndarray]], frame_step: int = 1,
+                      fps: Optional[float] = None) -> Iterator[Frame]:
+    """
+    Decode and sample frames from a video file or frame iterator
+    
+    Skipped frames are only grabbed, not decoded, when reading from a file.
+    
+    Args:
+        source: Video file path or iterable of frames
+        frame_step: Keep every n-th frame
+        fps: Frame rate used for timestamps of iterator sources
+    
+    Yields:
+        (frame_index, timestamp_seconds, frame) tuples
+    """
+    if not isinstance(source, str):
+        rate = fps or 30.0
+        for index, frame in enumerate(source):
+            if index % frame_step == 0:
+                yield index, index / rate, frame
+        return
+    
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {source}")
+    rate = fps or capture.get(cv2.CAP_PROP_FPS) or 30.0
+    
+    try:
+        index = 0
+        while True:
+            if index % frame_step == 0:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield index, index / rate, frame
+            elif not capture.grab():
+                break
+            index += 1
+    finally:
+        capture.release()
+
+def box_iou(a: Dict, b: Dict) -> float:
+    """
+    Intersection over union of two {x, y, w, h} boxes
+    """
+    x1, y1 = max(a["x"], b["x"]), max(a["y"], b["y"])
+    x2 = min(a["x"] + a["w"], b["x"] + b["w"])
+    y2 = min(a["y"] + a["h"], b["y"] + b["h"])
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+    union = a["w"] * a["h"] + b["w"] * b["h"] - intersection
+    return intersection / union if union > 0 else 0.0
+
+class FaceTrack:
+    """
+    A face followed across frames by template matching
+    """
+    
+    def __init__(self, track_id: int, region: Dict, gray_frame: np.ndarray):
+        self.track_id = track_id
+        self.region = region
+        self.template = self._crop(gray_frame, region)
+        self.score = 1.0
+    
+    def update(self, gray_frame: np.ndarray, search_margin: float) -> float:
+        """
+        Find the face in a new frame near its previous position
+        
+        Args:
+            gray_frame: Grayscale frame
+            search_margin: Search window padding as a fraction of the box size
+        
+        Returns:
+            Normalized match score in [-1, 1]
+        """
+        x, y, w, h = (self.region[k] for k in ("x", "y", "w", "h"))
+        pad_x, pad_y = int(w * search_margin), int(h * search_margin)
+        height, width = gray_frame.shape[:2]
+        left, top = max(0, x - pad_x), max(0, y - pad_y)
+        right, bottom = min(width, x + w + pad_x), min(height, y + h + pad_y)
+        window = gray_frame[top:bottom, left:right]
+        
+        if window.shape[0] < self.template.shape[0] or window.shape[1] < self.template.shape[1]:
+            self.score = -1.0
+            return self.score
+        
+        scores = cv2.matchTemplate(window, self.template, cv2.TM_CCOEFF_NORMED)
+        _, self.score, _, (dx, dy) = cv2.minMaxLoc(scores)
+        self.region = {"x": left + dx, "y": top + dy, "w": w, "h": h}
+        self.template = self._crop(gray_frame, self.region)
+        return self.score
+    
+    @staticmethod
+    def _crop(gray_frame: np.ndarray, region: Dict) -> np.ndarray:
+        return gray_frame[region["y"]:region["y"] + region["h"],
+                          region["x"]:region["x"] + region["w"]].copy()
+
+class VideoEmotionPipeline:
+    """
+    Generator-based video emotion analysis built on EmotionPredictor
+    """
+    
+    def __init__(self, predictor: Optional[EmotionPredictor] = None, frame_step: int = 1,
+                 detect_every: int = 10, min_track_score: float = 0.5,
+                 search_margin: float = 0.5, min_face_size: int = 24):
+        self.predictor = predictor or EmotionPredictor()
+        self.frame_step = frame_step
+        self.detect_every = detect_every
+        self.min_track_score = min_track_score
+        self.search_margin = search_margin
+        self.min_face_size = min_face_size
+        self.tracks: List[FaceTrack] = []
+        self._next_track_id = 1
+        self._redetect = False
+        self.stats = {"frames": 0, "detections": 0, "faces_classified": 0, "seconds": 0.0}
+    
+    def process(self, source: Union[str, Iterable[np.ndarray]],
+                fps: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Stream per-frame, per-track emotion results
+        
+        Args:
+            source: Video file path or iterable of frames
+            fps: Frame rate for iterator sources
+        
+        Yields:
+            Frame results with one entry per tracked face
+        """
+        self.tracks = []
+        frames_since_detection = self.detect_every
+        
+        for frame_index, timestamp, frame in iter_video_frames(source, self.frame_step, fps):
+            start = time.perf_counter()
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+            
+            lost = False
+            if frames_since_detection < self.detect_every and not self._redetect:
+                for track in self.tracks:
+                    lost |= track.update(gray, self.search_margin) < self.min_track_score
+            
+            # Frames without faces wait for the interval too; only a lost
+            # track (or a redetect() request) detects early
+            detected = frames_since_detection >= self.detect_every or lost or self._redetect
+            if detected:
+                crops = self._detect(frame, gray)
+                frames_since_detection = 0
+                self._redetect = False
+            else:
+                crops = [self._crop(frame, track.region) for track in self.tracks]
+            frames_since_detection += 1
+            
+            tracks = self._classify(crops)
+            self.stats["frames"] += 1
+            self.stats["seconds"] += time.perf_counter() - start
+            
+            yield {
+                "frame_index": frame_index,
+                "timestamp": timestamp,
+                "detected": detected,
+                "tracks": tracks
+            }
+    
+    def redetect(self):
+        """
+        Run full detection on the next frame, e.g. after the frame size changed
+        """
+        self._redetect = True
+    
+    def throughput(self) -> float:
+        """
+        Processed frames per second so far
+        """
+        return self.stats["frames"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
+    
+    def _detect(self, frame: np.ndarray, gray: np.ndarray) -> List[np.ndarray]:
+        height, width = gray.shape[:2]
+        self.stats["detections"] += 1
+        faces = []
+        for face in self.predictor.detect_faces(frame):
+            area = face["facial_area"]
+            region = {key: int(area[key]) for key in ("x", "y", "w", "h")}
+            # DeepFace falls back to the whole frame when nothing is found
+            whole_frame = region["w"] >= width - 1 and region["h"] >= height - 1
+            if whole_frame or min(region["w"], region["h"]) < self.min_face_size:
+                continue
+            faces.append((region, face["face"]))
+        
+        # Keep track ids stable by matching new boxes to existing tracks
+        tracks, crops = [], []
+        unmatched = list(self.tracks)
+        for region, crop in faces:
+            best = max(unmatched, key=lambda t: box_iou(t.region, region), default=None)
+            if best is not None and box_iou(best.region, region) > 0.3:
+                unmatched.remove(best)
+                track = FaceTrack(best.track_id, region, gray)
+            else:
+                track = FaceTrack(self._next_track_id, region, gray)
+                self._next_track_id += 1
+            tracks.append(track)
+            crops.append(crop)
+        
+        self.tracks = tracks
+        return crops
+    
+    def _classify(self, crops: List[np.ndarray]) -> List[Dict]:
+        if not crops:
+            return []
+        
+        batch = np.stack([face_to_model_input(crop) for crop in crops])
+        probabilities = self.predictor.predict_tensor(batch)
+        self.stats["faces_classified"] += len(crops)
+        
+        results = []
+        for track, row in zip(self.tracks, probabilities):
+            prediction = self.predictor.format_prediction(row)
+            prediction["track_id"] = track.track_id
+            prediction["region"] = dict(track.region)
+            prediction["track_score"] = float(track.score)
+            results.append(prediction)
+        return results
+    
+    @staticmethod
+    def _crop(frame: np.ndarray, region: Dict) -> np.ndarray:
+        return frame[region["y"]:region["y"] + region["h"], region["x"]:region["x"] + region["w"]]
@@ -0,0 +1,26 @@
+import numpy as np
+import pyarrow as pa
+
+from src.prediction_batch import MODEL_EMOTION_LABELS, PredictionBatch
+
+def _batch():
+    scores = np.tile(np.linspace(0, 100, len(MODEL_EMOTION_LABELS)), (4, 1))
+    success = np.array([True, False, True, False])
+    errors = {1: ("ValueError", "Face could not be detected"), 3: ("MemoryError", "")}
+    return PredictionBatch(scores, success, errors)
+
+def test_arrow_round_trip_keeps_error_types():
+    batch = _batch()
+    restored = PredictionBatch.from_arrow(batch.to_arrow())
+    assert restored.errors == batch.errors
+    assert restored.to_dicts() == batch.to_dicts()
+
+def test_tables_without_error_type_fall_back_to_exception():
+    table = _batch().to_arrow().drop_columns(["error_type"])
+    restored = PredictionBatch.from_arrow(table)
+    assert restored.errors == {1: ("Exception", "Face could not be detected"), 3: ("Exception", "")}
+
+def test_error_type_column_is_null_for_successful_rows():
+    column = _batch().to_arrow().column("error_type")
+    assert column.type == pa.dictionary(pa.int32(), pa.string())
+    assert column.to_pylist() == [None, "ValueError", None, "MemoryError"]
@@ -0,0 +1,24 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.ui_cache import content_key
+
+def _report_frame():
+    # Labels come back as new string objects each time, as from st.cache_data
+    labels = pickle.loads(pickle.dumps(["happy", "sad", "neutral"]))
+    return pd.DataFrame({"Emotion": labels, "Precision": [0.9, 0.7, 0.8]})
+
+def test_equal_frames_with_object_columns_have_equal_keys():
+    assert content_key("class_metrics", _report_frame()) == content_key("class_metrics", _report_frame())
+
+def test_object_values_change_the_key():
+    changed = _report_frame()
+    changed.loc[0, "Emotion"] = "angry"
+    assert content_key(_report_frame()) != content_key(changed)
+
+def test_empty_and_non_contiguous_arrays():
+    assert content_key(np.zeros((0, 3))) != content_key(np.zeros((3, 0)))
+    image = np.arange(60, dtype=np.uint8).reshape(5, 4, 3)
+    assert content_key(image[:, ::2]) == content_key(np.ascontiguousarray(image[:, ::2]))